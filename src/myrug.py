@@ -31,13 +31,26 @@ For more information see www.purplepixie.org/myrug
 """
 
 import argparse
+import fnmatch
+import gzip
+import hashlib
+import heapq
 import json
+import math
+import os
+import queue
+import random
 import sys
 import re
-from typing import Dict, List, Optional, Set, Tuple, Any
-from dataclasses import dataclass, field, asdict
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Any
+from dataclasses import dataclass, field, asdict, replace
 from enum import Enum
 from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import ExitStack
 
 try:
     import mysql.connector
@@ -63,18 +76,27 @@ class MigrationStage(Enum):
     """Enum for different stages of migration to ensure proper ordering."""
     DROP_TRIGGERS = 1
     DROP_VIEWS = 2
-    DROP_FOREIGN_KEYS = 3
-    DROP_INDEXES = 4
-    DROP_COLUMNS = 5
-    DROP_TABLES = 6
-    CREATE_TABLES = 7
-    ADD_COLUMNS = 8
-    MODIFY_COLUMNS = 9
-    CREATE_INDEXES = 10
-    CREATE_FOREIGN_KEYS = 11
-    CREATE_VIEWS = 12
-    CREATE_PROCEDURES = 13
-    CREATE_TRIGGERS = 14
+    RENAME_TABLES = 3
+    DROP_FOREIGN_KEYS = 4
+    DROP_INDEXES = 5
+    DROP_COLUMNS = 6
+    DROP_TABLES = 7
+    CREATE_TABLES = 8
+    ADD_COLUMNS = 9
+    MODIFY_COLUMNS = 10
+    CREATE_INDEXES = 11
+    CREATE_FOREIGN_KEYS = 12
+    CREATE_VIEWS = 13
+    CREATE_PROCEDURES = 14
+    CREATE_TRIGGERS = 15
+
+
+class DDLAlgorithm(Enum):
+    """How the server carries out an ALTER TABLE, from cheapest to most expensive."""
+    INSTANT = 1          # Metadata change only, no table data touched
+    INPLACE = 2          # In-place without rebuilding the table
+    INPLACE_REBUILD = 3  # In-place, but the table is rebuilt
+    COPY = 4             # Table is copied row by row
 
 
 # ============================================================================
@@ -181,6 +203,21 @@ class ForeignKey:
         )
 
 
+@dataclass
+class TableStats:
+    """
+    Data volume of a table as reported by INFORMATION_SCHEMA.TABLES.
+    
+    Attributes:
+        rows: Estimated number of rows (TABLE_ROWS)
+        data_length: Bytes used by the data, i.e. the clustered index for InnoDB
+        index_length: Bytes used by secondary indexes
+    """
+    rows: int = 0
+    data_length: int = 0
+    index_length: int = 0
+
+
 @dataclass
 class Table:
     """
@@ -196,6 +233,8 @@ class Table:
         charset: Default character set
         collation: Default collation
         comment: Table comment
+        digest: Canonical structural digest (see SchemaComparator.table_digest)
+        stats: Data volume, if extracted with statistics
     """
     name: str
     columns: List[Column] = field(default_factory=list)
@@ -206,6 +245,8 @@ class Table:
     charset: Optional[str] = None
     collation: Optional[str] = None
     comment: str = ""
+    digest: Optional[str] = field(default=None, compare=False, repr=False)
+    stats: Optional[TableStats] = field(default=None, compare=False)
 
 
 @dataclass
@@ -263,6 +304,23 @@ class Trigger:
     definition: str
 
 
+@dataclass
+class RenameHints:
+    """
+    Explicit renames recorded in a source schema.
+    
+    A hint applies when the old name exists only in the destination and the
+    new name only in the source; once the rename has been migrated both
+    sides use the new name and the hint is ignored.
+    
+    Attributes:
+        tables: Dictionary of old table name -> new table name
+        columns: Dictionary of (new) table name -> {old column name -> new column name}
+    """
+    tables: Dict[str, str] = field(default_factory=dict)
+    columns: Dict[str, Dict[str, str]] = field(default_factory=dict)
+
+
 @dataclass
 class Schema:
     """
@@ -274,12 +332,123 @@ class Schema:
         procedures: Dictionary of procedure_name -> StoredProcedure
         triggers: Dictionary of trigger_name -> Trigger
         database_name: Name of the database
+        server_version: Version string of the server the schema was read
+            from (e.g. "8.0.36" or "10.6.12-MariaDB"), if known
+        renames: Explicit rename hints, when used as a source schema
     """
     tables: Dict[str, Table] = field(default_factory=dict)
     views: Dict[str, View] = field(default_factory=dict)
     procedures: Dict[str, StoredProcedure] = field(default_factory=dict)
     triggers: Dict[str, Trigger] = field(default_factory=dict)
     database_name: str = ""
+    server_version: Optional[str] = None
+    renames: RenameHints = field(default_factory=RenameHints)
+
+
+@dataclass
+class NameFilter:
+    """
+    Include/exclude patterns for the names of one type of schema object.
+    
+    Patterns are shell-style globs (e.g. 'app_*') or, with a 're:' prefix,
+    regular expressions searched for anywhere in the name. A name is selected
+    if it matches any include pattern (or there are none) and no exclude
+    pattern. Matching is case-sensitive.
+    
+    Attributes:
+        include: Patterns of names to select
+        exclude: Patterns of names to skip
+    """
+    include: List[str] = field(default_factory=list)
+    exclude: List[str] = field(default_factory=list)
+
+    def matches(self, name: str) -> bool:
+        """Check whether a name is selected by this filter."""
+        if self.include and not any(self._pattern_matches(p, name) for p in self.include):
+            return False
+        return not any(self._pattern_matches(p, name) for p in self.exclude)
+
+    def sql(self, column: str, icu_regexp: bool = False) -> Tuple[str, tuple]:
+        """
+        Build a WHERE clause fragment selecting the names this filter matches.
+        
+        Globs become LIKE and regular expressions REGEXP. Globs with character
+        classes cannot be expressed in LIKE and are left to matches(), so the
+        fragment may select a superset of names and results should still be
+        checked with matches().
+        
+        Args:
+            column: Column holding the object name
+            icu_regexp: Whether the server's regular expressions use ICU
+                (MySQL 8.0.4+), which needs REGEXP_LIKE for case-sensitive
+                matching as it rejects binary strings
+            
+        Returns:
+            Tuple of (SQL fragment starting with ' AND ', or '', parameters)
+        """
+        clauses = []
+        params = ()
+        
+        includes = [self._pattern_sql(column, p, icu_regexp) for p in self.include]
+        if includes and all(includes):
+            clauses.append("(" + " OR ".join(sql for sql, _ in includes) + ")")
+            for _, value in includes:
+                params += (value,)
+        
+        for pattern in self.exclude:
+            exclude = self._pattern_sql(column, pattern, icu_regexp)
+            if exclude:
+                clauses.append(f"NOT {exclude[0]}")
+                params += (exclude[1],)
+        
+        return "".join(f" AND {clause}" for clause in clauses), params
+
+    @staticmethod
+    def _pattern_matches(pattern: str, name: str) -> bool:
+        """Match a single glob or 're:' pattern against a name."""
+        if pattern.startswith('re:'):
+            return re.search(pattern[3:], name) is not None
+        return fnmatch.fnmatchcase(name, pattern)
+
+    @staticmethod
+    def _pattern_sql(column: str, pattern: str, icu_regexp: bool = False) -> Optional[Tuple[str, str]]:
+        """
+        Translate a single pattern into a case-sensitive SQL condition.
+        
+        Returns:
+            Tuple of (condition, parameter), or None if it cannot be expressed
+        """
+        if pattern.startswith('re:'):
+            if icu_regexp:
+                return f"REGEXP_LIKE({column}, %s, 'c')", pattern[3:]
+            return f"(CAST({column} AS BINARY) REGEXP CAST(%s AS BINARY))", pattern[3:]
+        if '[' in pattern:
+            return None
+        like = re.sub(r'([%_\\])', r'\\\1', pattern).replace('*', '%').replace('?', '_')
+        return f"(CAST({column} AS BINARY) LIKE CAST(%s AS BINARY))", like
+
+
+@dataclass
+class SchemaFilter:
+    """
+    Name filters for every type of schema object.
+    
+    Triggers are also skipped when the table they belong to is filtered out.
+    
+    Attributes:
+        tables: Filter for table names
+        views: Filter for view names
+        procedures: Filter for procedure and function names
+        triggers: Filter for trigger names
+    """
+    tables: NameFilter = field(default_factory=NameFilter)
+    views: NameFilter = field(default_factory=NameFilter)
+    procedures: NameFilter = field(default_factory=NameFilter)
+    triggers: NameFilter = field(default_factory=NameFilter)
+
+    def includes_trigger(self, name: str, table: str) -> bool:
+        """Check whether a trigger and the table it belongs to are both selected."""
+        return self.triggers.matches(name) and self.tables.matches(table)
 
 
 @dataclass
@@ -297,6 +466,37 @@ class Warning:
     context: str = ""
 
 
+@dataclass
+class CostEstimate:
+    """
+    Estimated cost of running migration steps.
+    
+    Attributes:
+        seconds: Expected duration
+        io_bytes: Bytes read and written
+        temp_bytes: Extra disk space needed while running (for a plan:
+            the peak of its steps, as they run one at a time)
+    """
+    seconds: float = 0.0
+    io_bytes: int = 0
+    temp_bytes: int = 0
+
+
+@dataclass
+class Backfill:
+    """
+    Values to fill in for a column's NULLs, in primary key chunks.
+    
+    Attributes:
+        column: Column to fill
+        value: SQL expression for the new value (may use the row's columns)
+        primary_key: Primary key columns of the table
+    """
+    column: str
+    value: str
+    primary_key: List[str] = field(default_factory=list)
+
+
 @dataclass
 class MigrationStep:
     """
@@ -307,11 +507,39 @@ class MigrationStep:
         sql: SQL command to execute
         description: Human-readable description
         warnings: List of warnings associated with this step
+        table: Table the step changes, if any
+        alter_clauses: ALTER TABLE clauses making up the statement, for
+            steps that alter an existing table
+        algorithm: Expected online DDL algorithm, for ALTER TABLE steps
+        concurrent_dml: Whether writes to the table can continue while
+            the ALTER TABLE runs
+        estimate: Estimated cost, if table statistics were available
+        object_type: 'VIEW', 'PROCEDURE', 'FUNCTION' or 'TRIGGER', for
+            steps creating or dropping an object other than a table
+        object_name: Name of that object
+        step_id: Position of the step in the plan, starting at 1
+        depends_on: Ids of the steps that must complete before this one
+        shadow_table: Target definition of the table, for steps executed
+            as an online shadow table copy (see ShadowTableCopy) instead of
+            their ALTER TABLE
+        backfill: Values to fill in, for steps executed as chunked updates
+            instead of their single UPDATE
     """
     stage: MigrationStage
     sql: str
     description: str
     warnings: List[Warning] = field(default_factory=list)
+    table: Optional[str] = None
+    alter_clauses: List[str] = field(default_factory=list)
+    algorithm: Optional[DDLAlgorithm] = None
+    concurrent_dml: bool = True
+    estimate: Optional[CostEstimate] = None
+    object_type: Optional[str] = None
+    object_name: Optional[str] = None
+    step_id: int = 0
+    depends_on: List[int] = field(default_factory=list)
+    shadow_table: Optional[Table] = None
+    backfill: Optional[Backfill] = None
 
 
 # ============================================================================
@@ -323,7 +551,16 @@ class DatabaseConnection:
     Manages MySQL database connections and provides schema extraction methods.
     """
 
-    def __init__(self, host: str, port: int, user: str, password: str, database: str):
+    # Rows fetched per round trip by iter_query()
+    FETCH_BATCH_SIZE = 1000
+    
+    # Tables extracted per batch by iter_tables()
+    TABLE_CHUNK_SIZE = 200
+
+    def __init__(self, host: str, port: int, user: str, password: str, database: str,
+                 bulk: bool = True, cache: Optional['SchemaCache'] = None,
+                 schema_filter: Optional[SchemaFilter] = None,
+                 options: Optional[Dict[str, Any]] = None, stats: bool = False):
         """
         Initialize database connection parameters.
         
@@ -333,13 +570,28 @@ class DatabaseConnection:
             user: Database user
             password: Database password
             database: Database name
+            bulk: Whether to extract tables and routines with whole-schema
+                  INFORMATION_SCHEMA queries (True) or with per-object SHOW
+                  statements (False)
+            cache: Optional on-disk cache of previously extracted tables
+            schema_filter: Only extract objects whose names match this filter
+            options: Extra mysql.connector.connect() arguments (unix_socket,
+                     compress, use_pure and timeouts), see
+                     parse_connection_options()
+            stats: Whether to read row counts and data/index sizes of tables
         """
         self.host = host
         self.port = port
         self.user = user
         self.password = password
         self.database = database
+        self.bulk = bulk
+        self.cache = cache
+        self.schema_filter = schema_filter or SchemaFilter()
+        self.options = dict(options or {})
+        self.stats = stats
         self.connection = None
+        self._icu_regexp: Optional[bool] = None
 
     def __enter__(self):
         """Context manager entry - establish connection."""
@@ -349,7 +601,8 @@ class DatabaseConnection:
                 port=self.port,
                 user=self.user,
                 password=self.password,
-                database=self.database
+                database=self.database,
+                **self.options
             )
             return self
         except MySQLError as e:
@@ -361,6 +614,45 @@ class DatabaseConnection:
         if self.connection and self.connection.is_connected():
             self.connection.close()
 
+    def clone(self) -> 'DatabaseConnection':
+        """
+        Create an unconnected copy of this connection with the same settings.
+        
+        Returns:
+            New DatabaseConnection object
+        """
+        return DatabaseConnection(
+            self.host, self.port, self.user, self.password, self.database,
+            bulk=self.bulk, schema_filter=self.schema_filter, options=self.options,
+            stats=self.stats
+        )
+
+    def start_snapshot(self):
+        """Start a read-only transaction with a consistent snapshot."""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY")
+        finally:
+            cursor.close()
+
+    def server_version(self) -> str:
+        """
+        Return the server's version string (e.g. "8.0.36" or "10.6.12-MariaDB").
+        
+        Returns:
+            Version string, without the "5.5.5-" prefix MariaDB reports to clients
+        """
+        return re.sub(r'^5\.5\.5-', '', self.connection.get_server_info())
+
+    def icu_regexp(self) -> bool:
+        """Check (once) whether REGEXP uses ICU (MySQL 8.0.4+), which rejects binary strings."""
+        if self._icu_regexp is None:
+            version = self.server_version()
+            match = re.match(r'(\d+)\.(\d+)\.(\d+)', version)
+            self._icu_regexp = bool(match) and 'mariadb' not in version.lower() and (
+                tuple(int(part) for part in match.groups()) >= (8, 0, 4))
+        return self._icu_regexp
+
     def execute_query(self, query: str, params: Optional[tuple] = None) -> List[tuple]:
         """
         Execute a query and return results.
@@ -379,19 +671,88 @@ class DatabaseConnection:
         finally:
             cursor.close()
 
-    def extract_tables(self) -> Dict[str, Table]:
+    def execute_statement(self, statement: str, params: Optional[tuple] = None) -> int:
+        """
+        Execute a statement that returns no rows.
+        
+        Args:
+            statement: SQL statement to execute
+            params: Optional statement parameters
+            
+        Returns:
+            Number of affected rows
+        """
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(statement, params or ())
+            return cursor.rowcount
+        finally:
+            cursor.close()
+
+    def iter_query(self, query: str, params: Optional[tuple] = None,
+                   batch_size: Optional[int] = None) -> Iterator[tuple]:
+        """
+        Execute a query and yield result rows as they arrive from the server.
+        
+        Uses an unbuffered cursor and fetches rows in batches, so large
+        catalogue queries are processed without holding the whole result in
+        memory. No other query may be run on this connection until the
+        iterator is exhausted or closed; any unread rows are discarded when
+        it is closed.
+        
+        Args:
+            query: SQL query to execute
+            params: Optional query parameters
+            batch_size: Rows per fetch (default: FETCH_BATCH_SIZE)
+            
+        Yields:
+            Result tuples
+        """
+        cursor = self.connection.cursor(buffered=False)
+        try:
+            cursor.execute(query, params or ())
+            while True:
+                rows = cursor.fetchmany(batch_size or self.FETCH_BATCH_SIZE)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            if self.connection.unread_result:
+                self.connection.consume_results()
+            cursor.close()
+
+    def list_tables(self) -> List[str]:
+        """
+        List the names of all tables in the database selected by the table filter.
+        
+        Returns:
+            List of table names in SHOW TABLES order
+        """
+        return [
+            row[0] for row in self.execute_query("SHOW TABLES")
+            if self.schema_filter.tables.matches(row[0])
+        ]
+
+    def extract_tables(self, table_names: Optional[List[str]] = None) -> Dict[str, Table]:
         """
         Extract all tables from the database.
         
+        Args:
+            table_names: Only extract these tables (default: all tables)
+        
         Returns:
             Dictionary mapping table names to Table objects
         """
+        if self.bulk:
+            return self._extract_tables_bulk(table_names)
+        
         tables = {}
         
         # Get list of all tables
-        table_names = self.execute_query("SHOW TABLES")
+        if table_names is None:
+            table_names = self.list_tables()
         
-        for (table_name,) in table_names:
+        for table_name in table_names:
             table = Table(name=table_name)
             
             # Extract table metadata
@@ -429,32 +790,52 @@ class DatabaseConnection:
         Returns:
             List of Column objects
         """
-        columns = []
-        
         # Use SHOW FULL COLUMNS to get complete column information
         query = f"SHOW FULL COLUMNS FROM `{table_name}`"
         rows = self.execute_query(query)
         
-        for row in rows:
-            # Parse the column information
-            # Format: Field, Type, Collation, Null, Key, Default, Extra, Privileges, Comment
-            column = Column(
-                name=row[0],
-                data_type=row[1],
-                is_nullable=(row[3] == 'YES'),
-                default=row[5],
-                extra=row[6] or "",
-                collation=row[2],
-                comment=row[8] or ""
-            )
-            
-            # Extract character set from collation if present
-            if column.collation:
-                column.character_set = column.collation.split('_')[0]
+        # Format: Field, Type, Collation, Null, Key, Default, Extra, Privileges, Comment
+        return [
+            self._column_from_row(row[0], row[1], row[2], row[3], row[5], row[6], row[8])
+            for row in rows
+        ]
+
+    @staticmethod
+    def _column_from_row(name: str, data_type: str, collation: Optional[str], nullable: str,
+                         default: Optional[str], extra: Optional[str], comment: Optional[str]) -> Column:
+        """
+        Build a Column from raw metadata values.
+        
+        Shared by the per-table and bulk extraction paths so that both produce
+        identical Column objects.
+        
+        Args:
+            name: Column name
+            data_type: Full column type (e.g. 'varchar(255)')
+            collation: Column collation (None for non-string columns)
+            nullable: 'YES' if the column allows NULL
+            default: Default value
+            extra: Extra attributes
+            comment: Column comment
             
-            columns.append(column)
+        Returns:
+            Column object
+        """
+        column = Column(
+            name=name,
+            data_type=data_type,
+            is_nullable=(nullable == 'YES'),
+            default=default,
+            extra=extra or "",
+            collation=collation,
+            comment=comment or ""
+        )
         
-        return columns
+        # Extract character set from collation if present
+        if column.collation:
+            column.character_set = column.collation.split('_')[0]
+        
+        return column
 
     def _extract_primary_key(self, table_name: str) -> List[str]:
         """
@@ -488,15 +869,30 @@ class DatabaseConnection:
         Returns:
             List of Index objects
         """
-        indexes = {}
-        
         # Get index information
         query = f"SHOW INDEX FROM `{table_name}`"
         rows = self.execute_query(query)
         
-        for row in rows:
-            index_name = row[2]
+        # Key_name, Non_unique, Seq_in_index, Column_name, Index_type
+        return self._indexes_from_rows(
+            (row[2], row[1], row[3], row[4], row[10]) for row in rows
+        )
+
+    @staticmethod
+    def _indexes_from_rows(rows) -> List[Index]:
+        """
+        Assemble Index objects (excluding the primary key) from index rows.
+        
+        Args:
+            rows: Iterable of (index_name, non_unique, seq_in_index, column_name,
+                  index_type) tuples for a single table
             
+        Returns:
+            List of Index objects in the order they were first seen
+        """
+        indexes = {}
+        
+        for index_name, non_unique, seq, column_name, index_type in rows:
             # Skip primary key as it's handled separately
             if index_name == 'PRIMARY':
                 continue
@@ -505,18 +901,18 @@ class DatabaseConnection:
             if index_name not in indexes:
                 indexes[index_name] = {
                     'columns': [],
-                    'is_unique': not bool(row[1]),  # Non_unique column
-                    'index_type': row[10]  # Index_type column
+                    'is_unique': not bool(non_unique),
+                    'index_type': index_type
                 }
             
-            # Add column to index (maintaining order)
-            indexes[index_name]['columns'].append(row[4])  # Column_name
+            # Add column to index (sorted by position below)
+            indexes[index_name]['columns'].append((int(seq), column_name))
         
         # Convert to Index objects
         return [
             Index(
                 name=name,
-                columns=data['columns'],
+                columns=[col for _, col in sorted(data['columns'], key=lambda c: c[0])],
                 is_unique=data['is_unique'],
                 index_type=data['index_type']
             )
@@ -554,6 +950,23 @@ class DatabaseConnection:
         """
         rows = self.execute_query(query, (self.database, table_name))
         
+        return self._foreign_keys_from_rows(rows)
+
+    @staticmethod
+    def _foreign_keys_from_rows(rows) -> List[ForeignKey]:
+        """
+        Assemble ForeignKey objects from KEY_COLUMN_USAGE/REFERENTIAL_CONSTRAINTS rows.
+        
+        Args:
+            rows: Iterable of (constraint_name, column_name, referenced_table,
+                  referenced_column, update_rule, delete_rule) tuples for a
+                  single table, ordered by constraint and ordinal position
+            
+        Returns:
+            List of ForeignKey objects
+        """
+        foreign_keys = {}
+        
         for row in rows:
             constraint_name = row[0]
             
@@ -584,949 +997,5790 @@ class DatabaseConnection:
             for name, data in foreign_keys.items()
         ]
 
-    def extract_views(self) -> Dict[str, View]:
+    @staticmethod
+    def _in_list(column: str, values: List[str]) -> Tuple[str, tuple]:
         """
-        Extract all views from the database.
+        Build a "column IN (...)" condition for metadata queries.
         
+        Args:
+            column: Column to test
+            values: Values to match
+            
         Returns:
-            Dictionary mapping view names to View objects
+            Tuple of (SQL fragment, parameters)
+        """
+        placeholders = ", ".join(["%s"] * len(values))
+        return f"{column} IN ({placeholders})", tuple(values)
+
+    @classmethod
+    def _table_name_filter(cls, column: str, table_names: Optional[List[str]]) -> Tuple[str, tuple]:
         """
-        views = {}
+        Build an optional "AND column IN (...)" restriction for metadata queries.
         
-        query = """
-            SELECT
-                TABLE_NAME,
-                VIEW_DEFINITION,
-                CHECK_OPTION,
-                SECURITY_TYPE
-            FROM INFORMATION_SCHEMA.VIEWS
-            WHERE TABLE_SCHEMA = %s
+        Args:
+            column: Column holding the table name
+            table_names: Table names to restrict to (None for no restriction)
+            
+        Returns:
+            Tuple of (SQL fragment, parameters)
+        """
+        if table_names is None:
+            return "", ()
+        condition, params = cls._in_list(column, table_names)
+        return f"AND {condition}", params
+
+    def _extract_tables_bulk(self, table_names: Optional[List[str]] = None) -> Dict[str, Table]:
         """
-        rows = self.execute_query(query, (self.database,))
+        Extract all tables using a fixed number of INFORMATION_SCHEMA queries.
         
-        for row in rows:
-            views[row[0]] = View(
-                name=row[0],
-                definition=row[1],
-                check_option=row[2] or "NONE",
-                security_type=row[3]
-            )
+        Args:
+            table_names: Only extract these tables (default: all tables)
         
-        return views
+        Returns:
+            Dictionary mapping table names to Table objects
+        """
+        return self._extract_tables_bulk_multi([self.database], table_names).get(self.database, {})
 
-    def extract_procedures(self) -> Dict[str, StoredProcedure]:
+    def _extract_tables_bulk_multi(self, schemas: List[str],
+                                   table_names: Optional[List[str]] = None) -> Dict[str, Dict[str, Table]]:
         """
-        Extract all stored procedures and functions from the database.
+        Extract tables from one or more schemas with a fixed number of queries.
+        
+        Each catalogue view is read once for all requested schemas and the
+        Table objects are assembled client-side, so the number of round trips
+        grows with neither the number of tables nor the number of schemas. The
+        result is identical to the per-table extraction path.
+        
+        Args:
+            schemas: Schema (database) names to extract
+            table_names: Only extract these tables (default: all tables)
         
         Returns:
-            Dictionary mapping procedure names to StoredProcedure objects
+            Dictionary mapping schema names to dictionaries of Table objects
         """
-        procedures = {}
+        result = {name: {} for name in schemas}
+        
+        if not schemas or (table_names is not None and not table_names):
+            return result
+        
+        schema_filter, schema_params = self._in_list('TABLE_SCHEMA', schemas)
+        name_filter, filter_params = self._table_name_filter('TABLE_NAME', table_names)
+        table_filter, table_filter_params = self.schema_filter.tables.sql('TABLE_NAME', self.icu_regexp())
+        name_filter += table_filter
+        params = schema_params + filter_params + table_filter_params
+        
+        # Table metadata (equivalent to SHOW TABLES + SHOW TABLE STATUS)
+        query = f"""
+            SELECT TABLE_SCHEMA, TABLE_NAME, ENGINE, TABLE_COLLATION, TABLE_COMMENT
+            FROM INFORMATION_SCHEMA.TABLES
+            WHERE {schema_filter}
+              {name_filter}
+            ORDER BY TABLE_SCHEMA, TABLE_NAME
+        """
+        for row in self.iter_query(query, params):
+            if not self.schema_filter.tables.matches(row[1]):
+                continue
+            result[row[0]][row[1]] = Table(
+                name=row[1],
+                engine=row[2] or "InnoDB",
+                charset=row[3],
+                collation=row[3],  # SHOW TABLE STATUS only reports the collation
+                comment=row[4] or ""
+            )
         
-        # Get procedures and functions
-        query = """
+        def table_for(row) -> Optional[Table]:
+            """Look up the Table a (schema, table, ...) row belongs to."""
+            return result.get(row[0], {}).get(row[1])
+        
+        # Columns (equivalent to SHOW FULL COLUMNS)
+        query = f"""
             SELECT
-                ROUTINE_NAME,
-                ROUTINE_TYPE,
-                DTD_IDENTIFIER
-            FROM INFORMATION_SCHEMA.ROUTINES
-            WHERE ROUTINE_SCHEMA = %s
+                TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, COLLATION_NAME,
+                IS_NULLABLE, COLUMN_DEFAULT, EXTRA, COLUMN_COMMENT
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE {schema_filter}
+              {name_filter}
+            ORDER BY TABLE_SCHEMA, TABLE_NAME, ORDINAL_POSITION
+        """
+        for row in self.iter_query(query, params):
+            table = table_for(row)
+            if table:
+                table.columns.append(self._column_from_row(*row[2:]))
+        
+        # Primary keys
+        query = f"""
+            SELECT TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME
+            FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE
+            WHERE {schema_filter}
+              AND CONSTRAINT_NAME = 'PRIMARY'
+              {name_filter}
+            ORDER BY TABLE_SCHEMA, TABLE_NAME, ORDINAL_POSITION
+        """
+        for row in self.iter_query(query, params):
+            table = table_for(row)
+            if table:
+                table.primary_key.append(row[2])
+        
+        # Indexes (equivalent to SHOW INDEX); rows are grouped per table here
+        # and columns are ordered by SEQ_IN_INDEX during assembly
+        query = f"""
+            SELECT TABLE_SCHEMA, TABLE_NAME, INDEX_NAME, NON_UNIQUE, SEQ_IN_INDEX, COLUMN_NAME, INDEX_TYPE
+            FROM INFORMATION_SCHEMA.STATISTICS
+            WHERE {schema_filter}
+              {name_filter}
+        """
+        index_rows = defaultdict(list)
+        for row in self.iter_query(query, params):
+            index_rows[row[:2]].append(row[2:])
+        for key, rows in index_rows.items():
+            table = table_for(key)
+            if table:
+                table.indexes = self._indexes_from_rows(rows)
+        
+        # Foreign keys
+        fk_schema_filter, _ = self._in_list('kcu.TABLE_SCHEMA', schemas)
+        fk_filter, _ = self._table_name_filter('kcu.TABLE_NAME', table_names)
+        fk_filter += self.schema_filter.tables.sql('kcu.TABLE_NAME', self.icu_regexp())[0]
+        query = f"""
+            SELECT
+                kcu.TABLE_SCHEMA,
+                kcu.TABLE_NAME,
+                kcu.CONSTRAINT_NAME,
+                kcu.COLUMN_NAME,
+                kcu.REFERENCED_TABLE_NAME,
+                kcu.REFERENCED_COLUMN_NAME,
+                rc.UPDATE_RULE,
+                rc.DELETE_RULE
+            FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE kcu
+            JOIN INFORMATION_SCHEMA.REFERENTIAL_CONSTRAINTS rc
+                ON kcu.CONSTRAINT_NAME = rc.CONSTRAINT_NAME
+                AND kcu.TABLE_SCHEMA = rc.CONSTRAINT_SCHEMA
+            WHERE {fk_schema_filter}
+              AND kcu.REFERENCED_TABLE_NAME IS NOT NULL
+              {fk_filter}
+            ORDER BY kcu.TABLE_SCHEMA, kcu.TABLE_NAME, kcu.CONSTRAINT_NAME, kcu.ORDINAL_POSITION
+        """
+        fk_rows = defaultdict(list)
+        for row in self.iter_query(query, params):
+            fk_rows[row[:2]].append(row[2:])
+        for key, rows in fk_rows.items():
+            table = table_for(key)
+            if table:
+                table.foreign_keys = self._foreign_keys_from_rows(rows)
+        
+        return result
+
+    @staticmethod
+    def _checksum_sql(*columns: str) -> str:
         """
-        rows = self.execute_query(query, (self.database,))
+        Build an order-independent checksum expression over a group of rows.
         
-        for row in rows:
-            routine_name = row[0]
-            routine_type = row[1]  # PROCEDURE or FUNCTION
-            returns = row[2] if routine_type == 'FUNCTION' else None
-            
-            # Get the full definition
-            show_query = f"SHOW CREATE {routine_type} `{routine_name}`"
-            try:
-                result = self.execute_query(show_query)
-                if result:
-                    definition = result[0][2]  # CREATE statement
-                    
-                    procedures[routine_name] = StoredProcedure(
-                        name=routine_name,
-                        type=routine_type,
-                        definition=definition,
-                        returns=returns
-                    )
-            except MySQLError:
-                # Skip if we can't access the procedure definition
-                pass
+        Values are cast to binary so that catalogue columns with differing
+        collations can be concatenated safely.
         
-        return procedures
+        Args:
+            columns: Column expressions to include in each row's checksum
+            
+        Returns:
+            SQL aggregate expression
+        """
+        parts = ", ".join(f"IFNULL(CAST({column} AS BINARY), 0x00)" for column in columns)
+        return f"SUM(CRC32(CONCAT_WS(0x7C, {parts})))"
 
-    def extract_triggers(self) -> Dict[str, Trigger]:
+    def table_fingerprints(self) -> Dict[str, str]:
         """
-        Extract all triggers from the database.
+        Compute a cheap structural fingerprint for every selected table in one query.
+        
+        The fingerprint combines CREATE_TIME, engine, collation and comment
+        from INFORMATION_SCHEMA.TABLES with the column count and checksums of
+        the COLUMNS, STATISTICS and KEY_COLUMN_USAGE rows for the table, so it
+        changes whenever anything extract_tables() reads changes.
         
         Returns:
-            Dictionary mapping trigger names to Trigger objects
+            Dictionary mapping table names (in name order) to fingerprints
         """
-        triggers = {}
-        
-        query = """
-            SELECT
-                TRIGGER_NAME,
-                EVENT_OBJECT_TABLE,
-                ACTION_TIMING,
-                EVENT_MANIPULATION,
-                ACTION_STATEMENT
-            FROM INFORMATION_SCHEMA.TRIGGERS
-            WHERE TRIGGER_SCHEMA = %s
+        column_checksum = self._checksum_sql(
+            'ORDINAL_POSITION', 'COLUMN_NAME', 'COLUMN_TYPE', 'COLLATION_NAME',
+            'IS_NULLABLE', 'COLUMN_DEFAULT', 'EXTRA', 'COLUMN_COMMENT'
+        )
+        index_checksum = self._checksum_sql(
+            'INDEX_NAME', 'NON_UNIQUE', 'SEQ_IN_INDEX', 'COLUMN_NAME', 'INDEX_TYPE'
+        )
+        key_checksum = self._checksum_sql(
+            'kcu.CONSTRAINT_NAME', 'kcu.ORDINAL_POSITION', 'kcu.COLUMN_NAME',
+            'kcu.REFERENCED_TABLE_NAME', 'kcu.REFERENCED_COLUMN_NAME',
+            'rc.UPDATE_RULE', 'rc.DELETE_RULE'
+        )
+        table_filter, filter_params = self.schema_filter.tables.sql('TABLE_NAME', self.icu_regexp())
+        kcu_filter, _ = self.schema_filter.tables.sql('kcu.TABLE_NAME', self.icu_regexp())
+        outer_filter, _ = self.schema_filter.tables.sql('t.TABLE_NAME', self.icu_regexp())
+        query = f"""
+            SELECT
+                t.TABLE_NAME, t.CREATE_TIME, t.ENGINE, t.TABLE_COLLATION, t.TABLE_COMMENT,
+                c.column_count, c.column_checksum, s.index_checksum, k.key_checksum
+            FROM INFORMATION_SCHEMA.TABLES t
+            LEFT JOIN (
+                SELECT TABLE_NAME, COUNT(*) AS column_count, {column_checksum} AS column_checksum
+                FROM INFORMATION_SCHEMA.COLUMNS
+                WHERE TABLE_SCHEMA = %s{table_filter}
+                GROUP BY TABLE_NAME
+            ) c ON c.TABLE_NAME = t.TABLE_NAME
+            LEFT JOIN (
+                SELECT TABLE_NAME, {index_checksum} AS index_checksum
+                FROM INFORMATION_SCHEMA.STATISTICS
+                WHERE TABLE_SCHEMA = %s{table_filter}
+                GROUP BY TABLE_NAME
+            ) s ON s.TABLE_NAME = t.TABLE_NAME
+            LEFT JOIN (
+                SELECT kcu.TABLE_NAME, {key_checksum} AS key_checksum
+                FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE kcu
+                LEFT JOIN INFORMATION_SCHEMA.REFERENTIAL_CONSTRAINTS rc
+                    ON kcu.CONSTRAINT_NAME = rc.CONSTRAINT_NAME
+                    AND kcu.TABLE_SCHEMA = rc.CONSTRAINT_SCHEMA
+                WHERE kcu.TABLE_SCHEMA = %s{kcu_filter}
+                GROUP BY kcu.TABLE_NAME
+            ) k ON k.TABLE_NAME = t.TABLE_NAME
+            WHERE t.TABLE_SCHEMA = %s{outer_filter}
+            ORDER BY t.TABLE_NAME
         """
-        rows = self.execute_query(query, (self.database,))
+        rows = self.iter_query(query, ((self.database,) + filter_params) * 4)
         
-        for row in rows:
-            triggers[row[0]] = Trigger(
-                name=row[0],
-                table=row[1],
-                timing=row[2],  # BEFORE or AFTER
-                event=row[3],   # INSERT, UPDATE, or DELETE
-                definition=row[4]
-            )
+        return {
+            row[0]: hashlib.sha1("|".join(str(value) for value in row[1:]).encode('utf-8')).hexdigest()
+            for row in rows
+            if self.schema_filter.tables.matches(row[0])
+        }
+
+    def _find_stale_tables(self) -> Tuple[Dict[str, str], Dict[str, Tuple[str, Table]], List[str]]:
+        """
+        Compare current table fingerprints against the cache.
         
-        return triggers
+        Returns:
+            Tuple of (current fingerprints, cached entries, names of tables
+            that must be re-extracted)
+        """
+        fingerprints = self.table_fingerprints()
+        cached = self.cache.load(self.host, self.port, self.database)
+        stale = [
+            name for name, fingerprint in fingerprints.items()
+            if name not in cached or cached[name][0] != fingerprint
+        ]
+        return fingerprints, cached, stale
 
-    def extract_schema(self, include_tables: bool = True, include_views: bool = True,
-                      include_procedures: bool = True, include_triggers: bool = True) -> Schema:
+    def _merge_cached_tables(self, fingerprints: Dict[str, str], cached: Dict[str, Tuple[str, Table]],
+                             fresh: Dict[str, Table]) -> Dict[str, Table]:
         """
-        Extract the complete database schema.
+        Combine freshly extracted tables with unchanged cached ones and update the cache.
         
         Args:
-            include_tables: Whether to include tables
-            include_views: Whether to include views
-            include_procedures: Whether to include stored procedures
-            include_triggers: Whether to include triggers
+            fingerprints: Current table fingerprints
+            cached: Entries loaded from the cache
+            fresh: Tables re-extracted because their fingerprint changed
             
         Returns:
-            Complete Schema object
+            Dictionary mapping table names to Table objects
         """
-        schema = Schema(database_name=self.database)
+        tables = {}
+        entries = {}
         
-        if include_tables:
-            schema.tables = self.extract_tables()
+        for name, fingerprint in fingerprints.items():
+            if name in fresh:
+                table = fresh[name]
+            elif name in cached and cached[name][0] == fingerprint:
+                table = cached[name][1]
+            else:
+                # Table disappeared between fingerprinting and extraction
+                continue
+            tables[name] = table
+            entries[name] = (fingerprint, table)
         
-        if include_views:
-            schema.views = self.extract_views()
+        # Keep cached tables that were filtered out of this run
+        for name, entry in cached.items():
+            if name not in entries and not self.schema_filter.tables.matches(name):
+                entries[name] = entry
         
-        if include_procedures:
-            schema.procedures = self.extract_procedures()
+        self.cache.store(self.host, self.port, self.database, entries)
+        return tables
+
+    def iter_tables(self, chunk_size: Optional[int] = None) -> Iterator[Table]:
+        """
+        Extract tables in chunks, yielding each table as soon as its chunk is read.
         
-        if include_triggers:
-            schema.triggers = self.extract_triggers()
+        Unchanged tables from the cache (if any) are yielded first, without
+        touching the server beyond the fingerprint query; the cache is updated
+        once the iterator is exhausted.
         
-        return schema
-
-
-# ============================================================================
-# SCHEMA VALIDATION AND WARNING GENERATION
-# ============================================================================
+        Args:
+            chunk_size: Tables per extraction batch (default: TABLE_CHUNK_SIZE)
+            
+        Yields:
+            Table objects
+        """
+        chunk_size = chunk_size or self.TABLE_CHUNK_SIZE
+        stats = self.extract_table_stats() if self.stats else {}
+        
+        if self.cache:
+            fingerprints, cached, stale = self._find_stale_tables()
+            stale_names = set(stale)
+            for name in fingerprints:
+                if name not in stale_names:
+                    table = cached[name][1]
+                    table.stats = stats.get(name)
+                    yield table
+            names = stale
+        else:
+            names = self.list_tables()
+        
+        fresh = {}
+        for start in range(0, len(names), chunk_size):
+            tables = self.extract_tables(names[start:start + chunk_size])
+            self._attach_table_stats(tables, stats)
+            fresh.update(tables)
+            yield from tables.values()
+        
+        if self.cache:
+            self._merge_cached_tables(fingerprints, cached, fresh)
 
-class SchemaValidator:
-    """
-    Validates schemas and generates warnings for potential issues.
-    """
+    def extract_table_stats(self) -> Dict[str, TableStats]:
+        """
+        Read the row count and data/index sizes of every table.
+        
+        The figures are the server's estimates from INFORMATION_SCHEMA.TABLES
+        (on MySQL 8.0 they may be up to information_schema_stats_expiry
+        seconds old). They are never cached.
+        
+        Returns:
+            Dictionary mapping table names to TableStats objects
+        """
+        return self._extract_table_stats_multi([self.database]).get(self.database, {})
 
-    @staticmethod
-    def validate_schema(schema: Schema) -> List[Warning]:
+    def _extract_table_stats_multi(self, schemas: List[str]) -> Dict[str, Dict[str, TableStats]]:
         """
-        Validate a schema and return any warnings found.
+        Read table statistics from one or more schemas in a single query.
         
         Args:
-            schema: Schema to validate
+            schemas: Schema (database) names to read
             
         Returns:
-            List of Warning objects
+            Dictionary mapping schema names to dictionaries of TableStats objects
         """
-        warnings = []
+        stats = {name: {} for name in schemas}
+        if not schemas:
+            return stats
         
-        for table_name, table in schema.tables.items():
-            warnings.extend(SchemaValidator._validate_table(table))
+        schema_filter, params = self._in_list('TABLE_SCHEMA', schemas)
+        table_filter, table_params = self.schema_filter.tables.sql('TABLE_NAME', self.icu_regexp())
+        query = f"""
+            SELECT
+                TABLE_SCHEMA,
+                TABLE_NAME,
+                TABLE_ROWS,
+                DATA_LENGTH,
+                INDEX_LENGTH
+            FROM INFORMATION_SCHEMA.TABLES
+            WHERE {schema_filter}{table_filter}
+                AND TABLE_TYPE = 'BASE TABLE'
+        """
+        for row in self.iter_query(query, params + table_params):
+            stats[row[0]][row[1]] = TableStats(
+                rows=int(row[2] or 0),
+                data_length=int(row[3] or 0),
+                index_length=int(row[4] or 0)
+            )
         
-        return warnings
+        return stats
 
     @staticmethod
-    def _validate_table(table: Table) -> List[Warning]:
+    def _attach_table_stats(tables: Dict[str, Table], stats: Dict[str, TableStats]):
+        """Set the statistics of each table (None for tables without any)."""
+        for name, table in tables.items():
+            table.stats = stats.get(name)
+
+    def extract_views(self) -> Dict[str, View]:
         """
-        Validate a single table.
+        Extract all views from the database.
+        
+        Returns:
+            Dictionary mapping view names to View objects
+        """
+        return self._extract_views_multi([self.database]).get(self.database, {})
+
+    def _extract_views_multi(self, schemas: List[str]) -> Dict[str, Dict[str, View]]:
+        """
+        Extract views from one or more schemas in a single query.
         
         Args:
-            table: Table to validate
+            schemas: Schema (database) names to extract
             
         Returns:
-            List of warnings for this table
+            Dictionary mapping schema names to dictionaries of View objects
         """
-        warnings = []
-        
-        # Check for columns that cannot be null without a default
-        for column in table.columns:
-            if not column.is_nullable and column.default is None and 'auto_increment' not in column.extra.lower():
-                warnings.append(Warning(
-                    level=WarningLevel.WARNING,
-                    message=f"Column '{column.name}' cannot be NULL and has no default value. "
-                           f"Adding this column to a table with existing data will fail.",
-                    context=f"Table: {table.name}"
-                ))
+        views = {name: {} for name in schemas}
+        if not schemas:
+            return views
         
-        # Check for missing primary key
-        if not table.primary_key:
-            warnings.append(Warning(
-                level=WarningLevel.INFO,
-                message="Table has no primary key defined.",
-                context=f"Table: {table.name}"
-            ))
+        schema_filter, params = self._in_list('TABLE_SCHEMA', schemas)
+        view_filter, view_params = self.schema_filter.views.sql('TABLE_NAME', self.icu_regexp())
+        query = f"""
+            SELECT
+                TABLE_SCHEMA,
+                TABLE_NAME,
+                VIEW_DEFINITION,
+                CHECK_OPTION,
+                SECURITY_TYPE
+            FROM INFORMATION_SCHEMA.VIEWS
+            WHERE {schema_filter}{view_filter}
+        """
+        rows = self.iter_query(query, params + view_params)
         
-        # Check for foreign keys referencing non-existent columns
-        for fk in table.foreign_keys:
-            if len(fk.columns) != len(fk.referenced_columns):
-                warnings.append(Warning(
-                    level=WarningLevel.ERROR,
-                    message=f"Foreign key '{fk.name}' has mismatched column counts.",
-                    context=f"Table: {table.name}"
-                ))
+        for row in rows:
+            if not self.schema_filter.views.matches(row[1]):
+                continue
+            views[row[0]][row[1]] = View(
+                name=row[1],
+                definition=row[2],
+                check_option=row[3] or "NONE",
+                security_type=row[4]
+            )
         
-        return warnings
-
-
-# ============================================================================
-# SCHEMA COMPARISON AND MIGRATION PLAN GENERATION
-# ============================================================================
-
-class SchemaComparator:
-    """
-    Compares two schemas and generates migration steps.
-    """
+        return views
 
-    def __init__(self, source: Schema, destination: Schema, destructive: bool = False):
+    def extract_procedures(self) -> Dict[str, StoredProcedure]:
         """
-        Initialize the schema comparator.
+        Extract all stored procedures and functions from the database.
         
-        Args:
-            source: Source schema (target state)
-            destination: Destination schema (current state)
-            destructive: Whether to generate destructive operations
+        Returns:
+            Dictionary mapping procedure names to StoredProcedure objects
         """
-        self.source = source
-        self.destination = destination
-        self.destructive = destructive
-        self.migration_steps: List[MigrationStep] = []
-        self.warnings: List[Warning] = []
+        return self._extract_procedures_multi([self.database]).get(self.database, {})
 
-    def generate_migration_plan(self, include_tables: bool = True, include_views: bool = True,
-                                include_procedures: bool = True, include_triggers: bool = True) -> List[MigrationStep]:
+    def _extract_procedures_multi(self, schemas: List[str]) -> Dict[str, Dict[str, StoredProcedure]]:
         """
-        Generate a complete migration plan.
+        Extract stored procedures and functions from one or more schemas.
         
         Args:
-            include_tables: Whether to include table migrations
-            include_views: Whether to include view migrations
-            include_procedures: Whether to include procedure migrations
-            include_triggers: Whether to include trigger migrations
+            schemas: Schema (database) names to extract
             
         Returns:
-            List of MigrationStep objects in execution order
+            Dictionary mapping schema names to dictionaries of StoredProcedure objects
         """
-        self.migration_steps = []
-        self.warnings = []
-        
-        if include_triggers:
-            self._compare_triggers()
-        
-        if include_views:
-            self._compare_views()
+        if self.bulk:
+            return self._extract_procedures_bulk(schemas)
         
-        if include_tables:
-            self._compare_tables()
+        procedures = {name: {} for name in schemas}
+        if not schemas:
+            return procedures
         
-        if include_procedures:
-            self._compare_procedures()
+        # Get procedures and functions
+        schema_filter, params = self._in_list('ROUTINE_SCHEMA', schemas)
+        routine_filter, routine_params = self.schema_filter.procedures.sql('ROUTINE_NAME', self.icu_regexp())
+        query = f"""
+            SELECT
+                ROUTINE_SCHEMA,
+                ROUTINE_NAME,
+                ROUTINE_TYPE,
+                DTD_IDENTIFIER
+            FROM INFORMATION_SCHEMA.ROUTINES
+            WHERE {schema_filter}{routine_filter}
+        """
+        rows = self.execute_query(query, params + routine_params)
         
-        # Sort steps by stage to ensure proper execution order
-        self.migration_steps.sort(key=lambda step: step.stage.value)
+        for row in rows:
+            if not self.schema_filter.procedures.matches(row[1]):
+                continue
+            schema_name = row[0]
+            routine_name = row[1]
+            routine_type = row[2]  # PROCEDURE or FUNCTION
+            returns = row[3] if routine_type == 'FUNCTION' else None
+            
+            # Get the full definition
+            show_query = f"SHOW CREATE {routine_type} `{schema_name}`.`{routine_name}`"
+            try:
+                result = self.execute_query(show_query)
+                if result:
+                    definition = result[0][2]  # CREATE statement
+                    
+                    procedures[schema_name][routine_name] = StoredProcedure(
+                        name=routine_name,
+                        type=routine_type,
+                        definition=definition,
+                        returns=returns
+                    )
+            except MySQLError:
+                # Skip if we can't access the procedure definition
+                pass
         
-        return self.migration_steps
+        return procedures
 
-    def _compare_tables(self):
-        """Compare tables between source and destination schemas."""
-        source_tables = set(self.source.tables.keys())
-        dest_tables = set(self.destination.tables.keys())
-        
-        # Tables to drop (exist in destination but not in source)
-        if self.destructive:
-            for table_name in dest_tables - source_tables:
-                self._generate_drop_table(table_name)
+    def _extract_procedures_bulk(self, schemas: List[str]) -> Dict[str, Dict[str, StoredProcedure]]:
+        """
+        Extract routines by reconstructing their CREATE statements from the catalogue.
         
-        # Tables to create (exist in source but not in destination)
-        for table_name in source_tables - dest_tables:
-            self._generate_create_table(self.source.tables[table_name])
+        INFORMATION_SCHEMA.ROUTINES and INFORMATION_SCHEMA.PARAMETERS are each
+        read once, and the CREATE statement is rebuilt in SHOW CREATE layout
+        from the definer, parameter list, return type, characteristics and
+        body. SHOW CREATE is only issued for routines whose body or definer is
+        not visible in the catalogue (e.g. routines the user does not own).
         
-        # Tables to modify (exist in both)
-        for table_name in source_tables & dest_tables:
-            self._compare_table_structure(
-                self.source.tables[table_name],
-                self.destination.tables[table_name]
+        Args:
+            schemas: Schema (database) names to extract
+            
+        Returns:
+            Dictionary mapping schema names to dictionaries of StoredProcedure objects
+        """
+        procedures = {name: {} for name in schemas}
+        if not schemas:
+            return procedures
+        
+        # Parameters: ordinal position 0 is a function's return value
+        schema_filter, params = self._in_list('SPECIFIC_SCHEMA', schemas)
+        routine_filter, routine_params = self.schema_filter.procedures.sql('SPECIFIC_NAME', self.icu_regexp())
+        query = f"""
+            SELECT
+                SPECIFIC_SCHEMA,
+                SPECIFIC_NAME,
+                ROUTINE_TYPE,
+                PARAMETER_MODE,
+                PARAMETER_NAME,
+                DTD_IDENTIFIER,
+                CHARACTER_SET_NAME
+            FROM INFORMATION_SCHEMA.PARAMETERS
+            WHERE {schema_filter}{routine_filter}
+              AND ORDINAL_POSITION > 0
+            ORDER BY SPECIFIC_SCHEMA, SPECIFIC_NAME, ROUTINE_TYPE, ORDINAL_POSITION
+        """
+        parameters = defaultdict(list)
+        # MySQL's SHOW CREATE names the character set of string parameters
+        show_charsets = 'mariadb' not in self.server_version().lower()
+        for row in self.iter_query(query, params + routine_params):
+            mode = f"{row[3]} " if row[2] == 'PROCEDURE' and row[3] else ""
+            charset = f" CHARSET {row[6]}" if row[6] and show_charsets else ""
+            parameters[row[:3]].append(f"{mode}{self._quote_identifier(row[4])} {row[5]}{charset}")
+        
+        schema_filter, params = self._in_list('ROUTINE_SCHEMA', schemas)
+        routine_filter, routine_params = self.schema_filter.procedures.sql('ROUTINE_NAME', self.icu_regexp())
+        query = f"""
+            SELECT
+                ROUTINE_SCHEMA,
+                ROUTINE_NAME,
+                ROUTINE_TYPE,
+                DTD_IDENTIFIER,
+                CHARACTER_SET_NAME,
+                ROUTINE_DEFINITION,
+                IS_DETERMINISTIC,
+                SQL_DATA_ACCESS,
+                SECURITY_TYPE,
+                DEFINER,
+                ROUTINE_COMMENT
+            FROM INFORMATION_SCHEMA.ROUTINES
+            WHERE {schema_filter}{routine_filter}
+        """
+        routines = []
+        for row in self.iter_query(query, params + routine_params):
+            (schema_name, routine_name, routine_type, returns, charset, body,
+             deterministic, data_access, security, definer, comment) = row
+            if not self.schema_filter.procedures.matches(routine_name):
+                continue
+            returns = returns if routine_type == 'FUNCTION' else None
+            parameter_list = ", ".join(parameters.get((schema_name, routine_name, routine_type), []))
+            
+            definition = None
+            if body is not None and definer:
+                definition = self._build_routine_definition(
+                    routine_name, routine_type, parameter_list, returns, charset, body,
+                    deterministic, data_access, security, definer, comment
+                )
+            routines.append((schema_name, routine_name, routine_type, parameter_list, returns, definition))
+        
+        # SHOW CREATE can only run once the ROUTINES result has been read
+        for schema_name, routine_name, routine_type, parameter_list, returns, definition in routines:
+            if definition is None:
+                # Body or definer not visible in the catalogue - ask the server
+                show_query = f"SHOW CREATE {routine_type} `{schema_name}`.`{routine_name}`"
+                try:
+                    result = self.execute_query(show_query)
+                except MySQLError:
+                    # Skip if we can't access the procedure definition
+                    continue
+                if not result or result[0][2] is None:
+                    continue
+                definition = result[0][2]  # CREATE statement
+            
+            procedures[schema_name][routine_name] = StoredProcedure(
+                name=routine_name,
+                type=routine_type,
+                definition=definition,
+                parameters=parameter_list,
+                returns=returns
             )
+        
+        return procedures
 
-    def _generate_drop_table(self, table_name: str):
-        """Generate step to drop a table."""
-        step = MigrationStep(
-            stage=MigrationStage.DROP_TABLES,
-            sql=f"DROP TABLE IF EXISTS `{table_name}`;",
-            description=f"Drop table '{table_name}'"
-        )
-        step.warnings.append(Warning(
-            level=WarningLevel.WARNING,
-            message=f"Dropping table '{table_name}' will delete all its data.",
-            context=f"Table: {table_name}"
-        ))
-        self.migration_steps.append(step)
+    @staticmethod
+    def _quote_identifier(name: str) -> str:
+        """Quote an identifier with backticks."""
+        return "`" + name.replace("`", "``") + "`"
 
-    def _generate_create_table(self, table: Table):
+    @classmethod
+    def _build_routine_definition(cls, name: str, routine_type: str, parameter_list: str,
+                                  returns: Optional[str], charset: Optional[str], body: str,
+                                  deterministic: str, data_access: str, security: str,
+                                  definer: str, comment: Optional[str]) -> str:
         """
-        Generate step to create a table.
+        Rebuild a routine's CREATE statement in the layout used by SHOW CREATE.
         
         Args:
-            table: Table object to create
+            name: Routine name
+            routine_type: 'PROCEDURE' or 'FUNCTION'
+            parameter_list: Comma-separated parameter definitions
+            returns: Return type (functions only)
+            charset: Character set of a string return type
+            body: Routine body (ROUTINE_DEFINITION)
+            deterministic: IS_DETERMINISTIC ('YES' or 'NO')
+            data_access: SQL_DATA_ACCESS (e.g. 'READS SQL DATA')
+            security: SECURITY_TYPE ('DEFINER' or 'INVOKER')
+            definer: DEFINER in user@host form
+            comment: Routine comment
+            
+        Returns:
+            CREATE PROCEDURE/FUNCTION statement
         """
-        sql_parts = [f"CREATE TABLE `{table.name}` ("]
+        user, _, host = definer.rpartition('@')
+        header = (
+            f"CREATE DEFINER={cls._quote_identifier(user)}@{cls._quote_identifier(host)} "
+            f"{routine_type} {cls._quote_identifier(name)}({parameter_list})"
+        )
+        if routine_type == 'FUNCTION' and returns:
+            header += f" RETURNS {returns}"
+            if charset:
+                header += f" CHARSET {charset}"
+        
+        # Only non-default characteristics are shown, as SHOW CREATE does
+        lines = [header]
+        if data_access and data_access != 'CONTAINS SQL':
+            lines.append(f"    {data_access}")
+        if deterministic == 'YES':
+            lines.append("    DETERMINISTIC")
+        if security == 'INVOKER':
+            lines.append("    SQL SECURITY INVOKER")
+        if comment:
+            escaped = comment.replace("\\", "\\\\").replace("'", "\\'")
+            lines.append(f"    COMMENT '{escaped}'")
+        lines.append(body)
+        
+        return "\n".join(lines)
+
+    def extract_triggers(self) -> Dict[str, Trigger]:
+        """
+        Extract all triggers from the database.
         
-        # Add column definitions
-        column_defs = []
-        for column in table.columns:
-            col_def = f"  `{column.name}` {column.data_type}"
-            
-            if column.character_set:
-                col_def += f" CHARACTER SET {column.character_set}"
-            
-            if column.collation:
-                col_def += f" COLLATE {column.collation}"
-            
-            if not column.is_nullable:
-                col_def += " NOT NULL"
-            else:
-                col_def += " NULL"
-            
-            if column.default is not None:
-                col_def += f" DEFAULT {column.default}"
-            
-            if column.extra:
-                col_def += f" {column.extra}"
-            
-            if column.comment:
-                col_def += f" COMMENT '{column.comment}'"
-            
-            column_defs.append(col_def)
-        
-        sql_parts.append(",\n".join(column_defs))
-        
-        # Add primary key
-        if table.primary_key:
-            pk_cols = ", ".join(f"`{col}`" for col in table.primary_key)
-            sql_parts.append(f",\n  PRIMARY KEY ({pk_cols})")
-        
-        # Add indexes
-        for index in table.indexes:
-            idx_cols = ", ".join(f"`{col}`" for col in index.columns)
-            unique = "UNIQUE " if index.is_unique else ""
-            sql_parts.append(f",\n  {unique}INDEX `{index.name}` ({idx_cols}) USING {index.index_type}")
-        
-        # Add foreign keys
-        for fk in table.foreign_keys:
-            fk_cols = ", ".join(f"`{col}`" for col in fk.columns)
-            ref_cols = ", ".join(f"`{col}`" for col in fk.referenced_columns)
-            sql_parts.append(
-                f",\n  CONSTRAINT `{fk.name}` FOREIGN KEY ({fk_cols}) "
-                f"REFERENCES `{fk.referenced_table}` ({ref_cols}) "
-                f"ON DELETE {fk.on_delete} ON UPDATE {fk.on_update}"
-            )
-        
-        sql_parts.append("\n)")
-        
-        # Add engine and charset
-        sql_parts.append(f" ENGINE={table.engine}")
-        if table.charset:
-            sql_parts.append(f" DEFAULT CHARSET={table.charset}")
-        if table.collation:
-            sql_parts.append(f" COLLATE={table.collation}")
-        if table.comment:
-            sql_parts.append(f" COMMENT='{table.comment}'")
-        
-        sql_parts.append(";")
-        
-        step = MigrationStep(
-            stage=MigrationStage.CREATE_TABLES,
-            sql="".join(sql_parts),
-            description=f"Create table '{table.name}'"
-        )
-        
-        # Validate the table and attach warnings
-        step.warnings.extend(SchemaValidator._validate_table(table))
-        
-        self.migration_steps.append(step)
+        Returns:
+            Dictionary mapping trigger names to Trigger objects
+        """
+        return self._extract_triggers_multi([self.database]).get(self.database, {})
 
-    def _compare_table_structure(self, source_table: Table, dest_table: Table):
+    def _extract_triggers_multi(self, schemas: List[str]) -> Dict[str, Dict[str, Trigger]]:
         """
-        Compare the structure of two tables and generate modification steps.
+        Extract triggers from one or more schemas in a single query.
         
         Args:
-            source_table: Source table (target state)
-            dest_table: Destination table (current state)
+            schemas: Schema (database) names to extract
+            
+        Returns:
+            Dictionary mapping schema names to dictionaries of Trigger objects
         """
-        # First, handle foreign keys that need to be dropped
-        self._compare_foreign_keys(source_table, dest_table)
-        
-        # Then compare indexes
-        self._compare_indexes(source_table, dest_table)
+        triggers = {name: {} for name in schemas}
+        if not schemas:
+            return triggers
+        
+        schema_filter, params = self._in_list('TRIGGER_SCHEMA', schemas)
+        trigger_filter, trigger_params = self.schema_filter.triggers.sql('TRIGGER_NAME', self.icu_regexp())
+        table_filter, table_params = self.schema_filter.tables.sql('EVENT_OBJECT_TABLE', self.icu_regexp())
+        query = f"""
+            SELECT
+                TRIGGER_SCHEMA,
+                TRIGGER_NAME,
+                EVENT_OBJECT_TABLE,
+                ACTION_TIMING,
+                EVENT_MANIPULATION,
+                ACTION_STATEMENT
+            FROM INFORMATION_SCHEMA.TRIGGERS
+            WHERE {schema_filter}{trigger_filter}{table_filter}
+        """
+        rows = self.iter_query(query, params + trigger_params + table_params)
         
-        # Then compare columns
-        self._compare_columns(source_table, dest_table)
+        for row in rows:
+            if not self.schema_filter.includes_trigger(row[1], row[2]):
+                continue
+            triggers[row[0]][row[1]] = Trigger(
+                name=row[1],
+                table=row[2],
+                timing=row[3],  # BEFORE or AFTER
+                event=row[4],   # INSERT, UPDATE, or DELETE
+                definition=row[5]
+            )
         
-        # Update table options if needed
-        self._compare_table_options(source_table, dest_table)
+        return triggers
 
-    def _compare_columns(self, source_table: Table, dest_table: Table):
-        """Compare columns between two tables."""
-        source_cols = {col.name: col for col in source_table.columns}
-        dest_cols = {col.name: col for col in dest_table.columns}
-        
-        source_col_names = set(source_cols.keys())
-        dest_col_names = set(dest_cols.keys())
-        
-        # Columns to drop
-        if self.destructive:
-            for col_name in dest_col_names - source_col_names:
-                step = MigrationStep(
-                    stage=MigrationStage.DROP_COLUMNS,
-                    sql=f"ALTER TABLE `{source_table.name}` DROP COLUMN `{col_name}`;",
-                    description=f"Drop column '{col_name}' from table '{source_table.name}'"
-                )
-                step.warnings.append(Warning(
-                    level=WarningLevel.WARNING,
-                    message=f"Dropping column '{col_name}' will delete all its data.",
-                    context=f"Table: {source_table.name}"
-                ))
-                self.migration_steps.append(step)
+    def resolve_schemas(self, specs: List[str]) -> List[str]:
+        """
+        Resolve database names and LIKE patterns to existing schema names.
         
-        # Columns to add
-        for col_name in source_col_names - dest_col_names:
-            column = source_cols[col_name]
-            self._generate_add_column(source_table.name, column)
+        Entries containing '%' are treated as LIKE patterns (in which '_' also
+        matches any single character); all other entries must match exactly.
         
-        # Columns to modify
-        for col_name in source_col_names & dest_col_names:
-            source_col = source_cols[col_name]
-            dest_col = dest_cols[col_name]
+        Args:
+            specs: Database names and/or LIKE patterns
             
-            if source_col != dest_col:
-                self._generate_modify_column(source_table.name, source_col, dest_col)
+        Returns:
+            Sorted list of matching schema names
+        """
+        exact = [spec for spec in specs if '%' not in spec]
+        patterns = [spec for spec in specs if '%' in spec]
+        
+        conditions = []
+        params = ()
+        if exact:
+            condition, params = self._in_list('SCHEMA_NAME', exact)
+            conditions.append(condition)
+        for pattern in patterns:
+            conditions.append("SCHEMA_NAME LIKE %s")
+            params += (pattern,)
+        
+        if not conditions:
+            return []
+        
+        query = f"""
+            SELECT SCHEMA_NAME
+            FROM INFORMATION_SCHEMA.SCHEMATA
+            WHERE {' OR '.join(conditions)}
+            ORDER BY SCHEMA_NAME
+        """
+        return [row[0] for row in self.execute_query(query, params)]
 
-    def _generate_add_column(self, table_name: str, column: Column):
-        """Generate step to add a column."""
-        col_def = f"`{column.name}` {column.data_type}"
-        
-        if column.character_set:
-            col_def += f" CHARACTER SET {column.character_set}"
-        
-        if column.collation:
-            col_def += f" COLLATE {column.collation}"
+    def extract_schemas(self, databases: List[str], include_tables: bool = True,
+                        include_views: bool = True, include_procedures: bool = True,
+                        include_triggers: bool = True) -> Dict[str, Schema]:
+        """
+        Extract many schemas on this server in a single pass.
         
-        if not column.is_nullable:
-            col_def += " NOT NULL"
-        else:
-            col_def += " NULL"
+        Metadata for every matching schema is read with TABLE_SCHEMA IN (...)
+        bulk queries over this one connection, so the number of queries does
+        not grow with the number of databases. The schema cache and parallel
+        extraction are not used in this mode.
         
-        if column.default is not None:
-            col_def += f" DEFAULT {column.default}"
+        Args:
+            databases: Database names and/or LIKE patterns (see resolve_schemas)
+            include_tables: Whether to include tables
+            include_views: Whether to include views
+            include_procedures: Whether to include stored procedures
+            include_triggers: Whether to include triggers
+            
+        Returns:
+            Dictionary mapping database names to Schema objects
+        """
+        names = self.resolve_schemas(databases)
+        server_version = self.server_version()
+        schemas = {name: Schema(database_name=name, server_version=server_version) for name in names}
         
-        if column.extra:
-            col_def += f" {column.extra}"
+        if include_tables:
+            for name, tables in self._extract_tables_bulk_multi(names).items():
+                schemas[name].tables = tables
+            if self.stats:
+                for name, stats in self._extract_table_stats_multi(names).items():
+                    self._attach_table_stats(schemas[name].tables, stats)
         
-        if column.comment:
-            col_def += f" COMMENT '{column.comment}'"
+        if include_views:
+            for name, views in self._extract_views_multi(names).items():
+                schemas[name].views = views
         
-        step = MigrationStep(
-            stage=MigrationStage.ADD_COLUMNS,
-            sql=f"ALTER TABLE `{table_name}` ADD COLUMN {col_def};",
-            description=f"Add column '{column.name}' to table '{table_name}'"
-        )
+        if include_procedures:
+            for name, procedures in self._extract_procedures_multi(names).items():
+                schemas[name].procedures = procedures
         
-        # Check for potential issues
-        if not column.is_nullable and column.default is None and 'auto_increment' not in column.extra.lower():
-            step.warnings.append(Warning(
-                level=WarningLevel.WARNING,
-                message=f"Adding NOT NULL column '{column.name}' without a default value "
-                       f"will fail if the table contains data.",
-                context=f"Table: {table_name}"
-            ))
+        if include_triggers:
+            for name, triggers in self._extract_triggers_multi(names).items():
+                schemas[name].triggers = triggers
         
-        self.migration_steps.append(step)
+        return schemas
 
-    def _generate_modify_column(self, table_name: str, source_col: Column, dest_col: Column):
-        """Generate step to modify a column."""
-        col_def = f"`{source_col.name}` {source_col.data_type}"
-        
-        if source_col.character_set:
-            col_def += f" CHARACTER SET {source_col.character_set}"
-        
-        if source_col.collation:
-            col_def += f" COLLATE {source_col.collation}"
-        
-        if not source_col.is_nullable:
-            col_def += " NOT NULL"
-        else:
-            col_def += " NULL"
+    def extract_schema(self, include_tables: bool = True, include_views: bool = True,
+                      include_procedures: bool = True, include_triggers: bool = True,
+                      jobs: int = 1) -> Schema:
+        """
+        Extract the complete database schema.
         
-        if source_col.default is not None:
-            col_def += f" DEFAULT {source_col.default}"
+        Args:
+            include_tables: Whether to include tables
+            include_views: Whether to include views
+            include_procedures: Whether to include stored procedures
+            include_triggers: Whether to include triggers
+            jobs: Number of connections to extract with in parallel
+            
+        Returns:
+            Complete Schema object
+        """
+        if jobs > 1:
+            return self._extract_schema_parallel(
+                jobs, include_tables, include_views, include_procedures, include_triggers
+            )
         
-        if source_col.extra:
-            col_def += f" {source_col.extra}"
+        schema = Schema(database_name=self.database, server_version=self.server_version())
         
-        if source_col.comment:
-            col_def += f" COMMENT '{source_col.comment}'"
+        if include_tables:
+            if self.cache:
+                fingerprints, cached, stale = self._find_stale_tables()
+                fresh = self.extract_tables(stale)
+                schema.tables = self._merge_cached_tables(fingerprints, cached, fresh)
+            else:
+                schema.tables = self.extract_tables()
+            if self.stats:
+                self._attach_table_stats(schema.tables, self.extract_table_stats())
         
-        step = MigrationStep(
-            stage=MigrationStage.MODIFY_COLUMNS,
-            sql=f"ALTER TABLE `{table_name}` MODIFY COLUMN {col_def};",
-            description=f"Modify column '{source_col.name}' in table '{table_name}'"
-        )
+        if include_views:
+            schema.views = self.extract_views()
         
-        # Check for potential data loss
-        if self._is_lossy_column_change(dest_col, source_col):
-            step.warnings.append(Warning(
-                level=WarningLevel.WARNING,
-                message=f"Changing column '{source_col.name}' from {dest_col.data_type} "
-                       f"to {source_col.data_type} may cause data loss.",
-                context=f"Table: {table_name}"
-            ))
+        if include_procedures:
+            schema.procedures = self.extract_procedures()
         
-        # Check for nullable to not-nullable change
-        if dest_col.is_nullable and not source_col.is_nullable:
-            step.warnings.append(Warning(
-                level=WarningLevel.WARNING,
-                message=f"Changing column '{source_col.name}' from NULL to NOT NULL "
-                       f"will fail if NULL values exist.",
-                context=f"Table: {table_name}"
-            ))
+        if include_triggers:
+            schema.triggers = self.extract_triggers()
         
-        self.migration_steps.append(step)
+        return schema
 
-    def _is_lossy_column_change(self, old_col: Column, new_col: Column) -> bool:
+    def _extract_schema_parallel(self, jobs: int, include_tables: bool, include_views: bool,
+                                 include_procedures: bool, include_triggers: bool) -> Schema:
         """
-        Check if a column type change might cause data loss.
+        Extract the schema over a pool of connections in a thread pool.
+        
+        Tables are split into shards (one shard per connection in bulk mode,
+        one table per task otherwise) and the view, routine and trigger queries
+        run as separate tasks, so wall time approaches the latency of the
+        slowest shard rather than the sum of all queries. Every connection
+        opens a read-only consistent snapshot before any metadata is read so
+        that the merged Schema is coherent.
         
         Args:
-            old_col: Current column definition
-            new_col: New column definition
+            jobs: Number of connections (including this one)
+            include_tables: Whether to include tables
+            include_views: Whether to include views
+            include_procedures: Whether to include stored procedures
+            include_triggers: Whether to include triggers
             
         Returns:
-            True if the change might be lossy
+            Complete Schema object
         """
-        # Extract base types and sizes
-        old_type = old_col.data_type.upper()
-        new_type = new_col.data_type.upper()
-        
-        # Check for VARCHAR/CHAR size reduction
-        varchar_pattern = r'(VAR)?CHAR\((\d+)\)'
-        old_match = re.match(varchar_pattern, old_type)
-        new_match = re.match(varchar_pattern, new_type)
-        
-        if old_match and new_match:
-            old_size = int(old_match.group(2))
-            new_size = int(new_match.group(2))
-            if new_size < old_size:
-                return True
-        
-        # Check for numeric precision reduction
-        decimal_pattern = r'DECIMAL\((\d+),(\d+)\)'
-        old_match = re.match(decimal_pattern, old_type)
-        new_match = re.match(decimal_pattern, new_type)
-        
-        if old_match and new_match:
-            old_precision = int(old_match.group(1))
-            new_precision = int(new_match.group(1))
-            if new_precision < old_precision:
-                return True
+        schema = Schema(database_name=self.database, server_version=self.server_version())
         
-        # Check for type conversions that might lose data
-        lossy_conversions = {
-            'TEXT': ['VARCHAR', 'CHAR'],
-            'BIGINT': ['INT', 'MEDIUMINT', 'SMALLINT', 'TINYINT'],
-            'INT': ['MEDIUMINT', 'SMALLINT', 'TINYINT'],
-            'FLOAT': ['DECIMAL'],
-            'DOUBLE': ['FLOAT', 'DECIMAL'],
-        }
+        with ExitStack() as stack:
+            workers = [self] + [stack.enter_context(self.clone()) for _ in range(jobs - 1)]
+            for worker in workers:
+                worker.start_snapshot()
+            
+            # Work out which tables to read before the pool starts using this connection
+            if include_tables:
+                if self.cache:
+                    fingerprints, cached, table_names = self._find_stale_tables()
+                else:
+                    table_names = self.list_tables()
+            
+            pool = queue.Queue()
+            for worker in workers:
+                pool.put(worker)
+            
+            def run(method, *args):
+                """Run a DatabaseConnection method on the next free connection."""
+                db = pool.get()
+                try:
+                    return getattr(db, method)(*args)
+                finally:
+                    pool.put(db)
+            
+            try:
+                with ThreadPoolExecutor(max_workers=jobs) as executor:
+                    table_futures = []
+                    if include_tables:
+                        shard_size = math.ceil(len(table_names) / jobs) if self.bulk else 1
+                        for i in range(0, len(table_names), max(shard_size, 1)):
+                            table_futures.append(executor.submit(
+                                run, 'extract_tables', table_names[i:i + shard_size]
+                            ))
+                    
+                    views = executor.submit(run, 'extract_views') if include_views else None
+                    procedures = executor.submit(run, 'extract_procedures') if include_procedures else None
+                    triggers = executor.submit(run, 'extract_triggers') if include_triggers else None
+                    
+                    if include_tables:
+                        shard_tables = {}
+                        for future in table_futures:
+                            shard_tables.update(future.result())
+                        if self.cache:
+                            schema.tables = self._merge_cached_tables(fingerprints, cached, shard_tables)
+                        else:
+                            # Preserve SHOW TABLES ordering across shards
+                            schema.tables = {
+                                name: shard_tables[name] for name in table_names if name in shard_tables
+                            }
+                    if views:
+                        schema.views = views.result()
+                    if procedures:
+                        schema.procedures = procedures.result()
+                    if triggers:
+                        schema.triggers = triggers.result()
+            finally:
+                for worker in workers:
+                    if worker.connection and worker.connection.is_connected():
+                        worker.connection.rollback()
         
-        for from_type, to_types in lossy_conversions.items():
-            if from_type in old_type:
-                for to_type in to_types:
-                    if to_type in new_type:
-                        return True
+        if include_tables and self.stats:
+            self._attach_table_stats(schema.tables, self.extract_table_stats())
         
-        return False
+        return schema
+
+
+# ============================================================================
+# DUMP FILE PARSING
+# ============================================================================
+
+class DumpParser:
+    """
+    Builds a Schema from a `mysqldump --no-data` file without a MySQL server.
+
+    The file is read line by line and split into statements as it streams,
+    so only one statement is held in memory at a time. Versioned comments
+    (/*!50001 ... */) are unwrapped, DELIMITER changes are honoured and
+    everything except CREATE/DROP of tables, views, triggers, procedures and
+    functions is ignored.
+
+    Objects are built to match what DatabaseConnection extracts from the same
+    schema: column collations are inherited from the table default, defaults
+    are stored unquoted and EXTRA is synthesised the way the server reports
+    it. View definitions are kept as dumped, i.e. without the schema
+    qualification INFORMATION_SCHEMA adds. Only the first database in a dump
+    made with --databases/--all-databases is read.
+    """
+
+    IDENTIFIER = r'(?:`(?:[^`]|``)+`|[\w$]+)'
+    QUALIFIED_IDENTIFIER = rf'(?:{IDENTIFIER}\s*\.\s*)?({IDENTIFIER})'
+    DEFINER = r'(?:DEFINER\s*=\s*\S+\s+)?'
+
+    # Column types that carry a character set and collation
+    STRING_TYPES = {'char', 'varchar', 'tinytext', 'text', 'mediumtext', 'longtext', 'enum', 'set'}
+
+    # Default collation of each character set, for dumps that only give DEFAULT CHARSET
+    DEFAULT_COLLATIONS = {
+        'ascii': 'ascii_general_ci',
+        'big5': 'big5_chinese_ci',
+        'binary': 'binary',
+        'cp1250': 'cp1250_general_ci',
+        'cp1251': 'cp1251_general_ci',
+        'cp1256': 'cp1256_general_ci',
+        'cp1257': 'cp1257_general_ci',
+        'cp850': 'cp850_general_ci',
+        'gbk': 'gbk_chinese_ci',
+        'greek': 'greek_general_ci',
+        'hebrew': 'hebrew_general_ci',
+        'koi8r': 'koi8r_general_ci',
+        'latin1': 'latin1_swedish_ci',
+        'latin2': 'latin2_general_ci',
+        'sjis': 'sjis_japanese_ci',
+        'ucs2': 'ucs2_general_ci',
+        'ujis': 'ujis_japanese_ci',
+        'utf16': 'utf16_general_ci',
+        'utf32': 'utf32_general_ci',
+        'utf8': 'utf8_general_ci',
+        'utf8mb3': 'utf8mb3_general_ci',
+        'utf8mb4': 'utf8mb4_general_ci',
+    }
+
+    _STRUCTURE = re.compile(r"[(),'\"`]")
+    _STRING = r"'(?:[^'\\]|\\.|'')*'"
+    _VALUE = re.compile(
+        rf"\s*({_STRING}|\"(?:[^\"\\]|\\.|\"\")*\"|[\w.+-]+(?:{_STRING}|\([^()]*\))?)", re.S
+    )
+    _COLUMN_ATTRIBUTE = re.compile(
+        r'\s*(CHARACTER\s+SET|CHARSET|COLLATE|NOT\s+NULL|NULL|DEFAULT|AUTO_INCREMENT|'
+        r'ON\s+UPDATE|COMMENT|GENERATED\s+ALWAYS\s+AS|AS|VIRTUAL|STORED|INVISIBLE|VISIBLE|'
+        r'PRIMARY\s+KEY|UNIQUE\s+KEY|UNIQUE|KEY|SRID|COLUMN_FORMAT|STORAGE)\b',
+        re.I
+    )
+    _TABLE_OPTION = re.compile(
+        rf"(ENGINE|(?:DEFAULT\s+)?(?:CHARSET|CHARACTER\s+SET)|(?:DEFAULT\s+)?COLLATE|COMMENT)"
+        rf"\s*=?\s*({_STRING}|\w+)",
+        re.I
+    )
+    _ESCAPES = {'0': '\0', 'b': '\b', 'n': '\n', 'r': '\r', 't': '\t', 'Z': '\x1a'}
+
+    def __init__(self, include_tables: bool = True, include_views: bool = True,
+                 include_procedures: bool = True, include_triggers: bool = True,
+                 server_version: Optional[Tuple[int, ...]] = None,
+                 schema_filter: Optional[SchemaFilter] = None):
+        """
+        Initialize the parser.
+
+        Args:
+            include_tables: Whether to build tables
+            include_views: Whether to build views
+            include_procedures: Whether to build procedures and functions
+            include_triggers: Whether to build triggers
+            server_version: Version of the server the dump came from
+                            (default: read from the dump header, else 8.0)
+            schema_filter: Only build objects whose names match this filter
+        """
+        self.include_tables = include_tables
+        self.include_views = include_views
+        self.include_procedures = include_procedures
+        self.include_triggers = include_triggers
+        self.server_version = server_version
+        self.schema_filter = schema_filter or SchemaFilter()
+        self.mariadb = False
+        self.header_database = ""
+        self.delimiter = ";"
+        self._active = True
+
+    def parse_file(self, path: str) -> Schema:
+        """
+        Parse a dump file (optionally gzip-compressed) into a Schema.
+
+        Args:
+            path: Path to a .sql or .sql.gz file
+
+        Returns:
+            Schema object
+        """
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+            return self.parse_lines(f)
+
+    def parse_lines(self, lines: Iterable[str]) -> Schema:
+        """
+        Parse dump text, supplied as an iterable of lines, into a Schema.
+
+        Args:
+            lines: Lines of the dump, including line endings
+
+        Returns:
+            Schema object
+        """
+        schema = Schema()
+        self.delimiter = ";"
+        self._active = True
+
+        for statement in self.iter_statements(lines):
+            if not schema.database_name and self.header_database:
+                schema.database_name = self.header_database
+            self._apply_statement(schema, statement)
+
+        if not schema.database_name:
+            schema.database_name = self.header_database
+        if self.server_version:
+            schema.server_version = '.'.join(str(part) for part in self.server_version)
+            if self.mariadb:
+                schema.server_version += '-MariaDB'
+
+        return schema
+
+    def iter_statements(self, lines: Iterable[str]) -> Iterator[str]:
+        """
+        Split dump text into statements without reading it all into memory.
+
+        Quoted strings and identifiers, comments and the current DELIMITER are
+        tracked across lines. Versioned comments are unwrapped so that their
+        contents become part of the statement; other comments inside a
+        statement are kept as-is. Header comments are inspected for the
+        server version and database name.
+
+        Args:
+            lines: Lines of the dump, including line endings
+
+        Yields:
+            Statement text without the trailing delimiter
+        """
+        buffer = []
+        quote = None        # Quote character of an open string or identifier
+        comment = None      # 'keep' or 'skip' inside a plain /* ... */ comment
+        versioned = False   # Inside an unwrapped /*!NNNNN ... */ comment
+        token = None
+        token_delimiter = None
+
+        for line in lines:
+            if not buffer and quote is None and not comment:
+                stripped = line.strip()
+                if not stripped:
+                    continue
+                if stripped.startswith(('--', '#')):
+                    self._read_header_comment(stripped)
+                    continue
+                if re.match(r'DELIMITER(\s|$)', stripped, re.I):
+                    parts = stripped.split()
+                    if len(parts) > 1:
+                        self.delimiter = parts[1]
+                    continue
+
+            if token_delimiter != self.delimiter:
+                token_delimiter = self.delimiter
+                token = re.compile(
+                    re.escape(self.delimiter) + r"""|['"`]|/\*!\d*|/\*|\*/|--(?=\s|$)|#"""
+                )
+
+            pos = 0
+            length = len(line)
+            while pos < length:
+                if quote:
+                    end = self._find_quote_end(line, pos, quote)
+                    if end < 0:
+                        buffer.append(line[pos:])
+                        break
+                    buffer.append(line[pos:end + 1])
+                    pos = end + 1
+                    quote = None
+                    continue
+
+                if comment:
+                    end = line.find('*/', pos)
+                    if end < 0:
+                        if comment == 'keep':
+                            buffer.append(line[pos:])
+                        break
+                    if comment == 'keep':
+                        buffer.append(line[pos:end + 2])
+                    pos = end + 2
+                    comment = None
+                    continue
+
+                match = token.search(line, pos)
+                if not match:
+                    if buffer or line[pos:].strip():
+                        buffer.append(line[pos:])
+                    break
+
+                text = match.group()
+                start = match.start()
+                if buffer or line[pos:start].strip():
+                    buffer.append(line[pos:start])
+                pos = match.end()
+
+                if text == self.delimiter:
+                    statement = ''.join(buffer).strip()
+                    buffer = []
+                    if statement:
+                        yield statement
+                elif text in ('"', "'", '`'):
+                    buffer.append(text)
+                    quote = text
+                elif text.startswith('/*!'):
+                    versioned = True
+                elif text == '/*':
+                    # Comments between statements are dropped, those inside kept
+                    comment = 'keep' if buffer else 'skip'
+                    if buffer:
+                        buffer.append(text)
+                elif text == '*/':
+                    if versioned:
+                        versioned = False
+                    else:
+                        buffer.append(text)
+                else:
+                    # -- or # comment: runs to the end of the line
+                    if buffer:
+                        buffer.append(line[start:])
+                    break
+
+        statement = ''.join(buffer).strip()
+        if statement:
+            yield statement
+
+    @staticmethod
+    def _find_quote_end(text: str, pos: int, quote: str) -> int:
+        """
+        Find the closing quote of a string or identifier.
+
+        A doubled quote is found as a close immediately followed by a new
+        open, which the callers handle naturally.
+
+        Args:
+            text: Text to search
+            pos: Position just after the opening quote
+            quote: Quote character
+
+        Returns:
+            Index of the closing quote, or -1 if it is not in the text
+        """
+        while True:
+            end = text.find(quote, pos)
+            if quote == '`':
+                return end
+            backslash = text.find('\\', pos, end if end >= 0 else len(text))
+            if backslash < 0:
+                return end
+            pos = backslash + 2
+
+    def _read_header_comment(self, text: str):
+        """
+        Pick the server version and database name out of a dump header comment.
+
+        Args:
+            text: Comment line
+        """
+        match = re.match(r'--\s*Server version\s+(\d+)\.(\d+)\.(\d+)(\S*)', text)
+        if match:
+            if self.server_version is None:
+                self.server_version = tuple(int(part) for part in match.groups()[:3])
+            self.mariadb = 'mariadb' in match.group(4).lower()
+            return
+
+        match = re.match(r'--\s*Host:.*\bDatabase:\s*(\S+)', text)
+        if match and not self.header_database:
+            self.header_database = match.group(1)
+
+    def _server_at_least(self, *version: int) -> bool:
+        """Check the dump's server version (unknown versions count as current MySQL)."""
+        if self.mariadb:
+            return False
+        return self.server_version is None or tuple(self.server_version) >= version
+
+    def _apply_statement(self, schema: Schema, statement: str):
+        """
+        Apply one statement to the schema being built.
+
+        Args:
+            schema: Schema being built
+            statement: Statement text
+        """
+        # Drop leading plain comments left in front of the statement
+        statement = re.sub(r'^(?:\s+|/\*.*?\*/|(?:--|#)[^\n]*)+', '', statement, flags=re.S)
+        keyword = statement[:6].upper()
+
+        if keyword.startswith('USE'):
+            match = re.match(rf'USE\s+({self.IDENTIFIER})', statement, re.I)
+            if match:
+                database = self._unquote(match.group(1))
+                if not schema.database_name:
+                    schema.database_name = database
+                self._active = (database == schema.database_name)
+            return
+
+        if not self._active or keyword not in ('CREATE', 'DROP T', 'DROP V'):
+            return
+
+        match = re.match(r'DROP\s+(TABLE|VIEW)\s+(?:IF\s+EXISTS\s+)?(.*)$', statement, re.I | re.S)
+        if match:
+            objects = schema.tables if match.group(1).upper() == 'TABLE' else schema.views
+            for name in re.findall(self.QUALIFIED_IDENTIFIER, match.group(2)):
+                objects.pop(self._unquote(name), None)
+            return
+
+        match = re.match(
+            rf'CREATE\s+(?:TEMPORARY\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?{self.QUALIFIED_IDENTIFIER}\s*\(',
+            statement, re.I
+        )
+        if match:
+            name = self._unquote(match.group(1))
+            if self.include_tables and self.schema_filter.tables.matches(name):
+                table = self._parse_table(name, statement, match.end() - 1)
+                if table:
+                    schema.tables[table.name] = table
+            return
+
+        match = re.match(
+            rf'CREATE\s+(?:OR\s+REPLACE\s+)?(?:ALGORITHM\s*=\s*\w+\s+)?{self.DEFINER}'
+            rf'(?:SQL\s+SECURITY\s+(\w+)\s+)?VIEW\s+{self.QUALIFIED_IDENTIFIER}'
+            rf'(?:\s*\([^)]*\))?\s+AS\s+(.*)$',
+            statement, re.I | re.S
+        )
+        if match:
+            name = self._unquote(match.group(2))
+            if self.include_views and self.schema_filter.views.matches(name):
+                schema.views[name] = self._parse_view(name, match.group(1), match.group(3))
+            return
+
+        match = re.match(
+            rf'CREATE\s+{self.DEFINER}TRIGGER\s+{self.QUALIFIED_IDENTIFIER}\s+(BEFORE|AFTER)\s+'
+            rf'(INSERT|UPDATE|DELETE)\s+ON\s+{self.QUALIFIED_IDENTIFIER}\s+FOR\s+EACH\s+ROW\s+'
+            rf'(?:(?:FOLLOWS|PRECEDES)\s+{self.IDENTIFIER}\s+)?(.*)$',
+            statement, re.I | re.S
+        )
+        if match:
+            name = self._unquote(match.group(1))
+            table = self._unquote(match.group(4))
+            if self.include_triggers and self.schema_filter.includes_trigger(name, table):
+                schema.triggers[name] = Trigger(
+                    name=name,
+                    table=table,
+                    timing=match.group(2).upper(),
+                    event=match.group(3).upper(),
+                    definition=match.group(5).strip()
+                )
+            return
+
+        match = re.match(
+            rf'CREATE\s+(DEFINER\s*=\s*\S+\s+)?(PROCEDURE|FUNCTION)\s+{self.QUALIFIED_IDENTIFIER}\s*\(',
+            statement, re.I
+        )
+        if match:
+            if self.include_procedures and self.schema_filter.procedures.matches(self._unquote(match.group(3))):
+                procedure = self._parse_routine(statement, match)
+                if procedure:
+                    schema.procedures[procedure.name] = procedure
+
+    def _parse_table(self, name: str, statement: str, open_paren: int) -> Optional[Table]:
+        """
+        Build a Table from a CREATE TABLE statement.
+
+        Args:
+            name: Table name
+            statement: CREATE TABLE statement
+            open_paren: Index of the parenthesis opening the definition list
+
+        Returns:
+            Table object, or None if the statement is truncated
+        """
+        close_paren = self._matching_paren(statement, open_paren)
+        if close_paren < 0:
+            return None
+
+        options = self._parse_table_options(statement[close_paren + 1:])
+        collation = options.get('COLLATE') or self._default_collation(options.get('CHARSET'))
+        table = Table(
+            name=name,
+            engine=options.get('ENGINE') or "InnoDB",
+            charset=collation,
+            collation=collation,  # Matches extraction, which only sees the collation
+            comment=options.get('COMMENT', "")
+        )
+
+        index_rows = []
+        fk_rows = []
+        for definition in self._split_top_level(statement[open_paren + 1:close_paren]):
+            keyword = re.match(r'(\w+(?:\s+\w+)?)', definition)
+            keyword = re.sub(r'\s+', ' ', keyword.group(1).upper()) if keyword else ""
+
+            if definition.startswith('`') or keyword.split(' ')[0] not in (
+                'PRIMARY', 'UNIQUE', 'KEY', 'INDEX', 'FULLTEXT', 'SPATIAL',
+                'CONSTRAINT', 'FOREIGN', 'CHECK'
+            ):
+                column, inline_key = self._parse_column(definition, table.collation)
+                if column:
+                    table.columns.append(column)
+                    if inline_key == 'PRIMARY':
+                        table.primary_key.append(column.name)
+                    elif inline_key == 'UNIQUE':
+                        index_rows.append((column.name, 0, 1, column.name, 'BTREE'))
+            elif keyword.startswith('PRIMARY'):
+                table.primary_key = [part for part in self._key_parts(definition) if part]
+            elif keyword.startswith(('CONSTRAINT', 'FOREIGN')):
+                fk_rows.extend(self._parse_foreign_key(definition))
+            elif not keyword.startswith('CHECK'):
+                index_rows.extend(self._parse_index(definition))
+
+        table.indexes = DatabaseConnection._indexes_from_rows(index_rows)
+        table.foreign_keys = DatabaseConnection._foreign_keys_from_rows(fk_rows)
+
+        return table
+
+    def _parse_table_options(self, text: str) -> Dict[str, str]:
+        """
+        Read ENGINE, CHARSET, COLLATE and COMMENT from the text after a table definition.
+
+        Args:
+            text: Table options (anything after PARTITION BY is ignored)
+
+        Returns:
+            Dictionary of option name to value
+        """
+        text = re.split(r'\bPARTITION\s+BY\b', text, maxsplit=1, flags=re.I)[0]
+        options = {}
+        for match in self._TABLE_OPTION.finditer(text):
+            option = match.group(1).upper().split()[-1]
+            if option == 'SET':
+                option = 'CHARSET'
+            value = match.group(2)
+            options.setdefault(option, self._unquote_string(value) if option == 'COMMENT' else value)
+        return options
+
+    def _default_collation(self, charset: Optional[str]) -> Optional[str]:
+        """
+        Get the server's default collation for a character set.
+
+        Args:
+            charset: Character set name
+
+        Returns:
+            Collation name, or None if no character set was given
+        """
+        if not charset:
+            return None
+        charset = charset.lower()
+        if charset == 'utf8mb4' and self._server_at_least(8, 0, 0):
+            return 'utf8mb4_0900_ai_ci'
+        if charset == 'utf8' and self._server_at_least(8, 0, 30):
+            return 'utf8mb3_general_ci'
+        return self.DEFAULT_COLLATIONS.get(charset, f"{charset}_general_ci")
+
+    def _parse_column(self, definition: str, table_collation: Optional[str]) -> Tuple[Optional[Column], Optional[str]]:
+        """
+        Build a Column from a column definition.
+
+        Args:
+            definition: Column definition from a CREATE TABLE statement
+            table_collation: Table default collation, inherited by string columns
+
+        Returns:
+            Tuple of (Column or None, 'PRIMARY'/'UNIQUE' for an inline key or None)
+        """
+        match = re.match(rf'({self.IDENTIFIER})\s+(\w+)', definition)
+        if not match:
+            return None, None
+
+        name = self._unquote(match.group(1))
+        base_type = match.group(2).lower()
+        pos = match.end()
+
+        # Type arguments, e.g. varchar(255) or enum('a','b')
+        if definition[pos:pos + 1] == '(':
+            close_paren = self._matching_paren(definition, pos)
+            if close_paren < 0:
+                return None, None
+            pos = close_paren + 1
+        modifiers = re.match(r'(?:\s+(?:unsigned|signed|zerofill)\b)*', definition[pos:], re.I)
+        pos += modifiers.end()
+        data_type = definition[match.start(2):pos]
+
+        charset = None
+        collation = None
+        nullable = True
+        default = None
+        default_is_expression = False
+        on_update = None
+        generated = None
+        invisible = False
+        auto_increment = False
+        inline_key = None
+        comment = ""
+
+        while True:
+            attribute = self._COLUMN_ATTRIBUTE.match(definition, pos)
+            if not attribute:
+                break
+            keyword = re.sub(r'\s+', ' ', attribute.group(1).upper())
+            pos = attribute.end()
+
+            if keyword in ('CHARACTER SET', 'CHARSET'):
+                charset, pos = self._read_value(definition, pos)
+            elif keyword == 'COLLATE':
+                collation, pos = self._read_value(definition, pos)
+            elif keyword == 'NOT NULL':
+                nullable = False
+            elif keyword == 'NULL':
+                nullable = True
+            elif keyword == 'DEFAULT':
+                value, pos = self._read_value(definition, pos)
+                default, default_is_expression = self._column_default(value)
+            elif keyword == 'AUTO_INCREMENT':
+                auto_increment = True
+            elif keyword == 'ON UPDATE':
+                value, pos = self._read_value(definition, pos)
+                on_update, _ = self._column_default(value)
+            elif keyword == 'COMMENT':
+                value, pos = self._read_value(definition, pos)
+                comment = self._unquote_string(value)
+            elif keyword in ('AS', 'GENERATED ALWAYS AS'):
+                _, pos = self._read_value(definition, pos)
+                generated = 'VIRTUAL'
+            elif keyword in ('VIRTUAL', 'STORED'):
+                generated = keyword
+            elif keyword == 'INVISIBLE':
+                invisible = True
+            elif keyword == 'PRIMARY KEY':
+                inline_key = 'PRIMARY'
+                nullable = False
+            elif keyword in ('UNIQUE', 'UNIQUE KEY'):
+                inline_key = 'UNIQUE'
+            elif keyword in ('SRID', 'COLUMN_FORMAT', 'STORAGE'):
+                _, pos = self._read_value(definition, pos)
+
+        if base_type in self.STRING_TYPES:
+            if not collation:
+                collation = self._default_collation(charset) if charset else table_collation
+        else:
+            collation = None
+
+        # EXTRA as reported by the server
+        extra = []
+        if auto_increment:
+            extra.append('auto_increment')
+        if default_is_expression and self._server_at_least(8, 0, 13):
+            extra.append('DEFAULT_GENERATED')
+        if on_update:
+            extra.append(f"on update {on_update}")
+        if generated:
+            extra.append(f"{generated} GENERATED")
+        if invisible:
+            extra.append('INVISIBLE')
+
+        column = DatabaseConnection._column_from_row(
+            name, data_type, collation, 'YES' if nullable else 'NO',
+            default, ' '.join(extra), comment
+        )
+        return column, inline_key
+
+    def _read_value(self, text: str, pos: int) -> Tuple[str, int]:
+        """
+        Read one value (word, string, function call or parenthesised expression).
+
+        Args:
+            text: Definition text
+            pos: Position to start reading at
+
+        Returns:
+            Tuple of (value text, position after the value)
+        """
+        stripped = len(text) - len(text[pos:].lstrip())
+        if text[stripped:stripped + 1] == '(':
+            close_paren = self._matching_paren(text, stripped)
+            if close_paren < 0:
+                return text[stripped:], len(text)
+            return text[stripped:close_paren + 1], close_paren + 1
+
+        match = self._VALUE.match(text, pos)
+        if not match:
+            return "", pos
+        return match.group(1), match.end()
+
+    def _column_default(self, value: str) -> Tuple[Optional[str], bool]:
+        """
+        Convert a dumped DEFAULT clause value into the form the server reports.
+
+        Args:
+            value: Value text as dumped
+
+        Returns:
+            Tuple of (default value, whether it is an expression default)
+        """
+        upper = value.upper()
+        if upper == 'NULL':
+            return None, False
+        if value.startswith('('):
+            return value[1:-1].strip(), True
+        if upper.startswith(('CURRENT_TIMESTAMP', 'NOW(', 'LOCALTIME')):
+            precision = re.search(r'\((\d+)\)', value)
+            return 'CURRENT_TIMESTAMP' + (f"({precision.group(1)})" if precision else ""), True
+        if value.startswith(("'", '"')):
+            return self._unquote_string(value), False
+
+        # Character set introducer, e.g. _utf8mb4'abc'
+        match = re.match(r"_\w+('.*')$", value, re.S)
+        if match:
+            return self._unquote_string(match.group(1)), False
+
+        return value, False
+
+    def _parse_index(self, definition: str) -> List[tuple]:
+        """
+        Build index rows from a KEY/INDEX/UNIQUE/FULLTEXT/SPATIAL definition.
+
+        Args:
+            definition: Key definition from a CREATE TABLE statement
+
+        Returns:
+            List of (index_name, non_unique, seq_in_index, column_name, index_type) tuples
+        """
+        match = re.match(
+            rf'(UNIQUE|FULLTEXT|SPATIAL)?\s*(?:KEY|INDEX)?\s*({self.IDENTIFIER})?\s*\(',
+            definition, re.I
+        )
+        if not match:
+            return []
+
+        kind = (match.group(1) or "").upper()
+        columns = self._key_parts(definition)
+        name = self._unquote(match.group(2)) if match.group(2) else (columns[0] or "")
+
+        if kind in ('FULLTEXT', 'SPATIAL'):
+            index_type = kind
+        else:
+            using = re.search(r'\bUSING\s+(\w+)', definition[self._matching_paren(definition, match.end() - 1):], re.I)
+            index_type = using.group(1).upper() if using else "BTREE"
+
+        return [
+            (name, 0 if kind == 'UNIQUE' else 1, seq, column, index_type)
+            for seq, column in enumerate(columns, 1)
+        ]
+
+    def _parse_foreign_key(self, definition: str) -> List[tuple]:
+        """
+        Build foreign key rows from a CONSTRAINT ... FOREIGN KEY definition.
+
+        Args:
+            definition: Constraint definition from a CREATE TABLE statement
+
+        Returns:
+            List of (constraint_name, column_name, referenced_table,
+            referenced_column, update_rule, delete_rule) tuples
+        """
+        match = re.match(
+            rf'(?:CONSTRAINT\s+({self.IDENTIFIER})\s+)?FOREIGN\s+KEY\s*(?:{self.IDENTIFIER}\s*)?\(',
+            definition, re.I
+        )
+        if not match:
+            return []
+
+        close_paren = self._matching_paren(definition, match.end() - 1)
+        columns = self._key_parts(definition[match.end() - 1:close_paren + 1])
+
+        references = re.compile(rf'\s*REFERENCES\s+{self.QUALIFIED_IDENTIFIER}\s*\(', re.I)
+        reference = references.match(definition, close_paren + 1)
+        if not reference:
+            return []
+        ref_close = self._matching_paren(definition, reference.end() - 1)
+        referenced_columns = self._key_parts(definition[reference.end() - 1:ref_close + 1])
+
+        # Omitted rules are reported as the server default
+        default_rule = 'NO ACTION' if self._server_at_least(8, 0, 0) else 'RESTRICT'
+        rules = {'DELETE': default_rule, 'UPDATE': default_rule}
+        for rule in re.finditer(r'ON\s+(DELETE|UPDATE)\s+(RESTRICT|CASCADE|SET\s+NULL|SET\s+DEFAULT|NO\s+ACTION)',
+                                definition[ref_close:], re.I):
+            rules[rule.group(1).upper()] = re.sub(r'\s+', ' ', rule.group(2).upper())
+
+        name = self._unquote(match.group(1)) if match.group(1) else ""
+        referenced_table = self._unquote(reference.group(1))
+        return [
+            (name, column, referenced_table, referenced_column, rules['UPDATE'], rules['DELETE'])
+            for column, referenced_column in zip(columns, referenced_columns)
+        ]
+
+    def _key_parts(self, definition: str) -> List[Optional[str]]:
+        """
+        Get the column names of the first parenthesised key part list.
+
+        Args:
+            definition: Key definition
+
+        Returns:
+            Column names, with None for functional key parts
+        """
+        open_paren = definition.find('(')
+        close_paren = self._matching_paren(definition, open_paren)
+        columns = []
+        for part in self._split_top_level(definition[open_paren + 1:close_paren]):
+            match = re.match(self.IDENTIFIER, part)
+            columns.append(self._unquote(match.group()) if match and not part.startswith('(') else None)
+        return columns
+
+    def _parse_view(self, name: str, security: Optional[str], body: str) -> View:
+        """
+        Build a View from the parts of a CREATE VIEW statement.
+
+        Args:
+            name: View name
+            security: SQL SECURITY value, if given
+            body: Text after AS
+
+        Returns:
+            View object
+        """
+        check_option = "NONE"
+        match = re.search(r'\s+WITH\s+(?:(CASCADED|LOCAL)\s+)?CHECK\s+OPTION\s*$', body, re.I)
+        if match:
+            check_option = (match.group(1) or 'CASCADED').upper()
+            body = body[:match.start()]
+
+        return View(
+            name=name,
+            definition=body.strip(),
+            check_option=check_option,
+            security_type=(security or 'DEFINER').upper()
+        )
+
+    def _parse_routine(self, statement: str, match) -> Optional[StoredProcedure]:
+        """
+        Build a StoredProcedure from a CREATE PROCEDURE/FUNCTION statement.
+
+        Args:
+            statement: Routine statement
+            match: Match of the statement header (definer, type, name)
+
+        Returns:
+            StoredProcedure object, or None if the statement is truncated
+        """
+        close_paren = self._matching_paren(statement, match.end() - 1)
+        if close_paren < 0:
+            return None
+
+        routine_type = match.group(2).upper()
+        returns = None
+        if routine_type == 'FUNCTION':
+            returns_match = re.match(
+                r'\s*RETURNS\s+(\w+(?:\([^)]*\))?(?:\s+(?:unsigned|signed|zerofill)\b)*)',
+                statement[close_paren + 1:], re.I
+            )
+            if returns_match:
+                returns = returns_match.group(1)
+
+        # Versioned comments leave extra spaces in the header; SHOW CREATE has single spaces
+        definer = f"DEFINER={match.group(1).split('=', 1)[1].strip()} " if match.group(1) else ""
+        definition = f"CREATE {definer}{routine_type} {statement[match.start(3):].rstrip()}"
+
+        return StoredProcedure(
+            name=self._unquote(match.group(3)),
+            type=routine_type,
+            definition=definition,
+            parameters=statement[match.end():close_paren].strip(),
+            returns=returns
+        )
+
+    @classmethod
+    def _structural_chars(cls, text: str, pos: int = 0) -> Iterator[Tuple[int, str]]:
+        """
+        Iterate over parentheses and commas that are not inside quotes.
+
+        Args:
+            text: Text to scan
+            pos: Position to start at
+
+        Yields:
+            Tuples of (index, character)
+        """
+        while True:
+            match = cls._STRUCTURE.search(text, pos)
+            if not match:
+                return
+            char = match.group()
+            if char in ('"', "'", '`'):
+                end = cls._find_quote_end(text, match.end(), char)
+                if end < 0:
+                    return
+                pos = end + 1
+                continue
+            yield match.start(), char
+            pos = match.end()
+
+    @classmethod
+    def _matching_paren(cls, text: str, start: int) -> int:
+        """
+        Find the parenthesis closing the one at text[start].
+
+        Args:
+            text: Text to scan
+            start: Index of an opening parenthesis
+
+        Returns:
+            Index of the closing parenthesis, or -1 if it is missing
+        """
+        depth = 0
+        for index, char in cls._structural_chars(text, start):
+            if char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+                if depth == 0:
+                    return index
+        return -1
+
+    @classmethod
+    def _split_top_level(cls, text: str) -> List[str]:
+        """
+        Split text on commas that are outside parentheses and quotes.
+
+        Args:
+            text: Text to split
+
+        Returns:
+            List of non-empty, stripped parts
+        """
+        parts = []
+        depth = 0
+        last = 0
+        for index, char in cls._structural_chars(text):
+            if char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+            elif depth == 0:
+                parts.append(text[last:index].strip())
+                last = index + 1
+        parts.append(text[last:].strip())
+        return [part for part in parts if part]
+
+    @staticmethod
+    def _unquote(identifier: str) -> str:
+        """Remove backticks from an identifier."""
+        if identifier.startswith('`') and identifier.endswith('`'):
+            return identifier[1:-1].replace('``', '`')
+        return identifier
+
+    @classmethod
+    def _unquote_string(cls, literal: str) -> str:
+        """
+        Decode a quoted SQL string literal.
+
+        Args:
+            literal: String literal including its quotes
+
+        Returns:
+            Decoded string (the input unchanged if it is not quoted)
+        """
+        if len(literal) < 2 or literal[0] not in ('"', "'") or literal[-1] != literal[0]:
+            return literal
+        quote = literal[0]
+        return re.sub(
+            r"\\(.)|" + quote * 2,
+            lambda m: cls._ESCAPES.get(m.group(1), m.group(1)) if m.group(1) is not None else quote,
+            literal[1:-1],
+            flags=re.S
+        )
+
+
+# ============================================================================
+# SCHEMA VALIDATION AND WARNING GENERATION
+# ============================================================================
+
+class SchemaValidator:
+    """
+    Validates schemas and generates warnings for potential issues.
+    """
+
+    @staticmethod
+    def validate_schema(schema: Schema) -> List[Warning]:
+        """
+        Validate a schema and return any warnings found.
+        
+        Args:
+            schema: Schema to validate
+            
+        Returns:
+            List of Warning objects
+        """
+        warnings = []
+        
+        for table_name, table in schema.tables.items():
+            warnings.extend(SchemaValidator._validate_table(table))
+        
+        return warnings
+
+    @staticmethod
+    def _validate_table(table: Table) -> List[Warning]:
+        """
+        Validate a single table.
+        
+        Args:
+            table: Table to validate
+            
+        Returns:
+            List of warnings for this table
+        """
+        warnings = []
+        
+        # Check for columns that cannot be null without a default
+        for column in table.columns:
+            if not column.is_nullable and column.default is None and 'auto_increment' not in column.extra.lower():
+                warnings.append(Warning(
+                    level=WarningLevel.WARNING,
+                    message=f"Column '{column.name}' cannot be NULL and has no default value. "
+                           f"Adding this column to a table with existing data will fail.",
+                    context=f"Table: {table.name}"
+                ))
+        
+        # Check for missing primary key
+        if not table.primary_key:
+            warnings.append(Warning(
+                level=WarningLevel.INFO,
+                message="Table has no primary key defined.",
+                context=f"Table: {table.name}"
+            ))
+        
+        # Check for foreign keys referencing non-existent columns
+        for fk in table.foreign_keys:
+            if len(fk.columns) != len(fk.referenced_columns):
+                warnings.append(Warning(
+                    level=WarningLevel.ERROR,
+                    message=f"Foreign key '{fk.name}' has mismatched column counts.",
+                    context=f"Table: {table.name}"
+                ))
+        
+        return warnings
+
+
+# ============================================================================
+# ONLINE DDL CLASSIFICATION
+# ============================================================================
+
+# Result of classifying an ALTER TABLE clause: (algorithm, concurrent DML allowed)
+DDLClass = Tuple[DDLAlgorithm, bool]
+
+
+class OnlineDDLClassifier:
+    """
+    Predicts how the target server will carry out each ALTER TABLE clause.
+
+    The rules follow the InnoDB online DDL operation tables of the MySQL and
+    MariaDB manuals for the target version. When the version is unknown, 5.7
+    is assumed so that nothing is reported as INSTANT that may not be.
+    Tables that do not use InnoDB are always copied with writes blocked.
+    """
+
+    # Minimum (MySQL, MariaDB) versions of each online DDL feature
+    ONLINE_DDL = ((5, 6, 0), (10, 0, 0))
+    INPLACE_VARCHAR_EXTEND = ((5, 7, 0), (10, 2, 2))
+    INSTANT_METADATA = ((8, 0, 12), (10, 3, 2))
+    INSTANT_ADD_COLUMN = ((8, 0, 12), (10, 3, 2))
+    INSTANT_DROP_COLUMN = ((8, 0, 29), (10, 4, 0))
+    INSTANT_RENAME_COLUMN = ((8, 0, 28), (10, 3, 2))
+    RENAME_COLUMN_SYNTAX = ((8, 0, 3), (10, 5, 2))
+    RENAME_INDEX_SYNTAX = ((5, 7, 0), (10, 5, 2))
+
+    # Maximum bytes per character (other character sets are assumed to need 4)
+    CHARSET_MAXLEN = {
+        'ascii': 1, 'binary': 1, 'latin1': 1, 'latin2': 1, 'cp1250': 1, 'cp1251': 1,
+        'cp1256': 1, 'cp1257': 1, 'ucs2': 2, 'utf8': 3, 'utf8mb3': 3,
+        'utf16': 4, 'utf32': 4, 'utf8mb4': 4,
+    }
+
+    def __init__(self, server_version: Optional[str] = None):
+        """
+        Initialize the classifier.
+
+        Args:
+            server_version: Target server version string (e.g. "8.0.36" or
+                "10.6.12-MariaDB"); None assumes MySQL 5.7
+        """
+        match = re.match(r'(\d+)\.(\d+)\.(\d+)', server_version or '')
+        self.version = tuple(int(part) for part in match.groups()) if match else (5, 7, 0)
+        self.version_known = match is not None
+        self.mariadb = 'mariadb' in (server_version or '').lower()
+
+    def describe(self) -> str:
+        """Return the target version as used for classification."""
+        version = '.'.join(str(part) for part in self.version)
+        description = f"MariaDB {version}" if self.mariadb else f"MySQL {version}"
+        return description if self.version_known else f"{description} (version unknown)"
+
+    def supports(self, feature: Tuple[Tuple[int, ...], Tuple[int, ...]]) -> bool:
+        """
+        Check whether the target version has an online DDL feature.
+
+        Args:
+            feature: (MySQL, MariaDB) minimum versions, e.g. INSTANT_ADD_COLUMN
+
+        Returns:
+            True if the target version is at least the minimum
+        """
+        return self.version >= feature[1 if self.mariadb else 0]
+
+    def _online(self, table: Optional[Table]) -> bool:
+        """Check whether a table can be altered online at all."""
+        engine = table.engine if table is not None else 'InnoDB'
+        return (engine or '').lower() == 'innodb' and self.supports(self.ONLINE_DDL)
+
+    def _instant_or_inplace(self) -> DDLClass:
+        """Classify a metadata-only change."""
+        if self.supports(self.INSTANT_METADATA):
+            return DDLAlgorithm.INSTANT, True
+        return DDLAlgorithm.INPLACE, True
+
+    @staticmethod
+    def _has_fulltext(table: Table) -> bool:
+        return any(index.index_type.upper() == 'FULLTEXT' for index in table.indexes)
+
+    def add_column(self, table: Table, column: Column) -> DDLClass:
+        """Classify ADD COLUMN (always appended as the last column)."""
+        if not self._online(table):
+            return DDLAlgorithm.COPY, False
+        extra = column.extra.lower()
+        if 'stored generated' in extra:
+            return DDLAlgorithm.COPY, False
+        if 'virtual generated' in extra:
+            return self._instant_or_inplace()
+        if 'auto_increment' in extra:
+            return DDLAlgorithm.INPLACE_REBUILD, False
+        if self.supports(self.INSTANT_ADD_COLUMN) and not self._has_fulltext(table):
+            return DDLAlgorithm.INSTANT, True
+        return DDLAlgorithm.INPLACE_REBUILD, True
+
+    def drop_column(self, table: Table, column: Column) -> DDLClass:
+        """Classify DROP COLUMN."""
+        if not self._online(table):
+            return DDLAlgorithm.COPY, False
+        if 'virtual generated' in column.extra.lower():
+            return self._instant_or_inplace()
+        if self.supports(self.INSTANT_DROP_COLUMN) and not self._has_fulltext(table):
+            return DDLAlgorithm.INSTANT, True
+        return DDLAlgorithm.INPLACE_REBUILD, True
+
+    def modify_column(self, table: Table, old: Column, new: Column) -> DDLClass:
+        """
+        Classify MODIFY COLUMN from the old to the new definition.
+
+        Default changes and ENUM/SET members appended without changing the
+        storage size are metadata-only, VARCHAR extensions that keep the
+        length prefix size are in-place, nullability changes rebuild in
+        place and any other type, character set or attribute change copies.
+        """
+        if not self._online(table):
+            return DDLAlgorithm.COPY, False
+        if (old.character_set != new.character_set or old.collation != new.collation
+                or old.extra.lower() != new.extra.lower()):
+            return DDLAlgorithm.COPY, False
+
+        old_type = re.sub(r'\s+', ' ', old.data_type.strip().lower())
+        new_type = re.sub(r'\s+', ' ', new.data_type.strip().lower())
+        if old_type == new_type:
+            if old.is_nullable != new.is_nullable:
+                return DDLAlgorithm.INPLACE_REBUILD, True
+            return self._instant_or_inplace()
+
+        if old.is_nullable != new.is_nullable:
+            return DDLAlgorithm.COPY, False
+        if self._is_varchar_extension(table, old_type, new_type, new.character_set):
+            return DDLAlgorithm.INPLACE, True
+        if self._is_member_extension(old_type, new_type):
+            return self._instant_or_inplace()
+        return DDLAlgorithm.COPY, False
+
+    def _is_varchar_extension(self, table: Table, old_type: str, new_type: str,
+                              charset: Optional[str]) -> bool:
+        """Check for a VARCHAR lengthening that keeps a 1- or 2-byte length prefix."""
+        old_match = re.fullmatch(r'varchar\((\d+)\)', old_type)
+        new_match = re.fullmatch(r'varchar\((\d+)\)', new_type)
+        if not (old_match and new_match) or not self.supports(self.INPLACE_VARCHAR_EXTEND):
+            return False
+        old_length, new_length = int(old_match.group(1)), int(new_match.group(1))
+        maxlen = self.CHARSET_MAXLEN.get((charset or table.charset or '').lower(), 4)
+        return new_length >= old_length and (old_length * maxlen > 255) == (new_length * maxlen > 255)
+
+    @staticmethod
+    def _is_member_extension(old_type: str, new_type: str) -> bool:
+        """Check for ENUM/SET members appended without changing the storage size."""
+        old_match = re.fullmatch(r'(enum|set)\((.*)\)', old_type)
+        new_match = re.fullmatch(r'(enum|set)\((.*)\)', new_type)
+        if not (old_match and new_match) or old_match.group(1) != new_match.group(1):
+            return False
+        old_members = DumpParser._split_top_level(old_match.group(2))
+        new_members = DumpParser._split_top_level(new_match.group(2))
+        if new_members[:len(old_members)] != old_members:
+            return False
+        if old_match.group(1) == 'enum':
+            return (len(old_members) > 255) == (len(new_members) > 255)
+        return (len(old_members) + 7) // 8 == (len(new_members) + 7) // 8
+
+    def alter_default(self, table: Table) -> DDLClass:
+        """Classify ALTER COLUMN ... SET/DROP DEFAULT."""
+        if not self._online(table):
+            return DDLAlgorithm.COPY, False
+        return self._instant_or_inplace()
+
+    def rename_column(self, table: Table) -> DDLClass:
+        """Classify renaming a column without changing its definition."""
+        if not self._online(table):
+            return DDLAlgorithm.COPY, False
+        if self.supports(self.INSTANT_RENAME_COLUMN):
+            return DDLAlgorithm.INSTANT, True
+        return DDLAlgorithm.INPLACE, True
+
+    def rename_index(self, table: Table) -> DDLClass:
+        """Classify RENAME INDEX."""
+        if not self._online(table):
+            return DDLAlgorithm.COPY, False
+        return self._instant_or_inplace()
+
+    def add_index(self, table: Table, index: Index) -> DDLClass:
+        """Classify ADD INDEX."""
+        if not self._online(table):
+            return DDLAlgorithm.COPY, False
+        index_type = index.index_type.upper()
+        if index_type == 'FULLTEXT':
+            # The first FULLTEXT index adds a hidden FTS_DOC_ID column
+            if self._has_fulltext(table):
+                return DDLAlgorithm.INPLACE, False
+            return DDLAlgorithm.INPLACE_REBUILD, False
+        if index_type == 'SPATIAL':
+            return DDLAlgorithm.INPLACE, False
+        return DDLAlgorithm.INPLACE, True
+
+    def drop_index(self, table: Table) -> DDLClass:
+        """Classify DROP INDEX."""
+        if not self._online(table):
+            return DDLAlgorithm.COPY, False
+        return DDLAlgorithm.INPLACE, True
+
+    def add_foreign_key(self, table: Table) -> DDLClass:
+        """Classify ADD FOREIGN KEY (in place only with foreign_key_checks disabled)."""
+        return DDLAlgorithm.COPY, False
+
+    def drop_foreign_key(self, table: Table) -> DDLClass:
+        """Classify DROP FOREIGN KEY."""
+        if not self._online(table):
+            return DDLAlgorithm.COPY, False
+        return DDLAlgorithm.INPLACE, True
+
+    def table_options(self, source_table: Table, dest_table: Table) -> DDLClass:
+        """Classify changing ENGINE, the default character set/collation or COMMENT."""
+        if (source_table.engine or '').lower() != (dest_table.engine or '').lower():
+            return DDLAlgorithm.COPY, False
+        if not self._online(dest_table):
+            return DDLAlgorithm.COPY, False
+        if ((source_table.charset and source_table.charset != dest_table.charset)
+                or (source_table.collation and source_table.collation != dest_table.collation)):
+            return DDLAlgorithm.INPLACE_REBUILD, False
+        return DDLAlgorithm.INPLACE, True
+
+    def algorithm_clauses(self, algorithm: DDLAlgorithm, concurrent_dml: bool) -> List[str]:
+        """
+        Return the ALGORITHM/LOCK clauses requesting a classification explicitly.
+
+        The server then fails with an error instead of silently falling back
+        to a more expensive algorithm. LOCK cannot be combined with INSTANT.
+        Servers before online DDL get no clauses.
+
+        Args:
+            algorithm: Expected algorithm
+            concurrent_dml: Whether concurrent DML is expected to be allowed
+
+        Returns:
+            List of clauses to append to the ALTER TABLE
+        """
+        if not self.supports(self.ONLINE_DDL):
+            return []
+        if algorithm == DDLAlgorithm.INSTANT:
+            return ["ALGORITHM=INSTANT"]
+        name = 'COPY' if algorithm == DDLAlgorithm.COPY else 'INPLACE'
+        return [f"ALGORITHM={name}", f"LOCK={'NONE' if concurrent_dml else 'SHARED'}"]
+
+
+# ============================================================================
+# MIGRATION COST ESTIMATION
+# ============================================================================
+
+class CostModel:
+    """
+    Estimates the duration, I/O and temporary disk use of migration steps.
+
+    Each ALTER TABLE step is costed from its online DDL class and the
+    destination table's statistics: INSTANT and other metadata-only changes
+    take a fixed time, building secondary indexes reads the table once per
+    index, and rebuilds and copies rewrite the whole table (data and
+    indexes) into a new copy alongside the old one. Throughputs come from a
+    calibration profile, ideally measured with the calibrate command on the
+    hardware being migrated; the defaults are deliberately modest.
+    """
+
+    DEFAULT_PROFILE = {
+        'metadata_seconds': 0.5,                          # Fixed cost of any DDL statement
+        'rebuild_bytes_per_second': 50 * 1024 * 1024,     # In-place table rebuild
+        'index_build_bytes_per_second': 100 * 1024 * 1024,  # Secondary index build (bytes of table data)
+        'copy_rows_per_second': 100000.0,                 # ALGORITHM=COPY row copy
+    }
+
+    ADD_INDEX_PATTERN = re.compile(r'ADD\s+(?:UNIQUE\s+|FULLTEXT\s+|SPATIAL\s+)?(?:INDEX|KEY)\b', re.IGNORECASE)
+
+    def __init__(self, profile: Optional[Dict[str, float]] = None):
+        """
+        Initialize the cost model.
+
+        Args:
+            profile: Throughput figures overriding DEFAULT_PROFILE
+
+        Raises:
+            ValueError: If the profile has unknown keys or non-positive values
+        """
+        self.profile = dict(self.DEFAULT_PROFILE)
+        for key, value in (profile or {}).items():
+            if key not in self.DEFAULT_PROFILE:
+                raise ValueError(f"unknown cost profile setting '{key}'")
+            if not isinstance(value, (int, float)) or value <= 0:
+                raise ValueError(f"cost profile setting '{key}' must be a positive number")
+            self.profile[key] = float(value)
+
+    @classmethod
+    def load(cls, path: str) -> 'CostModel':
+        """
+        Load a cost model from a calibration profile (JSON) file.
+
+        Args:
+            path: Profile file, as written by the calibrate command
+
+        Returns:
+            CostModel object
+
+        Raises:
+            ValueError: If the file is not a valid profile
+        """
+        with open(path, 'r') as f:
+            profile = json.load(f)
+        if not isinstance(profile, dict):
+            raise ValueError("cost profile must be a JSON object")
+        return cls(profile)
+
+    def estimate_step(self, step: MigrationStep, table: Optional[Table]) -> Optional[CostEstimate]:
+        """
+        Estimate the cost of one migration step.
+
+        Args:
+            step: Migration step
+            table: Destination table the step alters, if any
+
+        Returns:
+            CostEstimate, or None for an ALTER TABLE or backfill on a table
+            without statistics
+        """
+        metadata = CostEstimate(seconds=self.profile['metadata_seconds'])
+        if step.backfill:
+            if table is None or table.stats is None:
+                return None
+            # Every row is read in primary key chunks; the NULLs are updated
+            # in place, writing undo and redo but no temporary copy
+            return CostEstimate(
+                seconds=metadata.seconds + table.stats.rows / self.profile['copy_rows_per_second'],
+                io_bytes=table.stats.data_length * 2
+            )
+        if step.algorithm is None or step.algorithm == DDLAlgorithm.INSTANT:
+            return metadata
+        if table is None or table.stats is None:
+            return None
+
+        stats = table.stats
+        size = stats.data_length + stats.index_length
+        if step.algorithm == DDLAlgorithm.INPLACE:
+            new_indexes = sum(1 for clause in step.alter_clauses if self.ADD_INDEX_PATTERN.match(clause))
+            if not new_indexes:
+                return metadata
+            # Each index scans the table and sorts its keys (bounded by the data size)
+            return CostEstimate(
+                seconds=metadata.seconds
+                + new_indexes * stats.data_length / self.profile['index_build_bytes_per_second'],
+                io_bytes=new_indexes * stats.data_length * 2,
+                temp_bytes=stats.data_length
+            )
+
+        if step.algorithm == DDLAlgorithm.COPY:
+            seconds = max(stats.rows / self.profile['copy_rows_per_second'],
+                          size / self.profile['rebuild_bytes_per_second'])
+        else:
+            seconds = size / self.profile['rebuild_bytes_per_second']
+        return CostEstimate(
+            seconds=metadata.seconds + seconds,
+            io_bytes=size * 2,
+            temp_bytes=size
+        )
+
+    def estimate_plan(self, steps: List[MigrationStep], destination: Schema) -> Optional[CostEstimate]:
+        """
+        Estimate every step of a plan (setting MigrationStep.estimate) and the total.
+
+        Args:
+            steps: Migration steps
+            destination: Destination schema, with table statistics
+
+        Returns:
+            Total cost (durations and I/O summed, peak temporary disk), or
+            None if any step could not be estimated
+        """
+        for step in steps:
+            step.estimate = self.estimate_step(step, destination.tables.get(step.table or ''))
+        return self.total(steps)
+
+    @staticmethod
+    def total(steps: List[MigrationStep]) -> Optional[CostEstimate]:
+        """
+        Add up the estimates of steps that run one after another.
+
+        Args:
+            steps: Estimated migration steps
+
+        Returns:
+            Total cost (durations and I/O summed, peak temporary disk), or
+            None if any step has no estimate
+        """
+        total = CostEstimate()
+        for step in steps:
+            if step.estimate is None:
+                return None
+            total.seconds += step.estimate.seconds
+            total.io_bytes += step.estimate.io_bytes
+            total.temp_bytes = max(total.temp_bytes, step.estimate.temp_bytes)
+        return total
+
+
+# ============================================================================
+# SCHEMA COMPARISON AND MIGRATION PLAN GENERATION
+# ============================================================================
+
+class SchemaComparator:
+    """
+    Compares two schemas and generates migration steps.
+    """
+
+    # Clauses ignored in the header of CREATE statements when comparing
+    # view, routine and trigger definitions (up to the object's keyword)
+    CREATE_HEADER_PATTERN = re.compile(
+        r"\s*CREATE\s+(?:OR\s+REPLACE\s+)?(?:(?:ALGORITHM\s*=\s*\w+|SQL\s+SECURITY\s+\w+|"
+        r"DEFINER\s*=\s*(?:CURRENT_USER(?:\s*\(\s*\))?|(?:`[^`]*`|'[^']*'|[^\s@]+)\s*@\s*(?:`[^`]*`|'[^']*'|[^\s]+)))\s+)*"
+        r"(?=(?:VIEW|PROCEDURE|FUNCTION|AGGREGATE\s+FUNCTION|TRIGGER|EVENT)\b)",
+        re.I
+    )
+
+    # Minimum similarity for guessing that a column was renamed (identical
+    # type 3, same position 2, nullability 1, default 1, other attributes 1,
+    # same index membership 2, same foreign key membership 2)
+    COLUMN_RENAME_THRESHOLD = 6
+    # Minimum share of (name, type) columns two tables have in common for
+    # guessing that a table was renamed
+    TABLE_RENAME_THRESHOLD = 0.75
+
+    def __init__(self, source: Schema, destination: Schema, destructive: bool = False,
+                 coalesce: bool = False, target_version: Optional[str] = None,
+                 explicit_algorithm: bool = False, shadow_copy: bool = False,
+                 backfill: Optional[Dict[str, str]] = None):
+        """
+        Initialize the schema comparator.
+        
+        Args:
+            source: Source schema (target state)
+            destination: Destination schema (current state)
+            destructive: Whether to generate destructive operations
+            coalesce: Whether to merge each table's changes into as few
+                ALTER TABLE statements as possible (see coalesce_alter_steps)
+            target_version: Server version to classify online DDL for
+                (default: the destination schema's server version)
+            explicit_algorithm: Whether to add ALGORITHM=/LOCK= clauses
+                requiring the expected online DDL behaviour
+            shadow_copy: Whether to change tables whose ALTER TABLE would
+                block writes through an online shadow table copy instead
+                (see use_shadow_copies)
+            backfill: If given, columns becoming NOT NULL are filled in
+                chunks before they are tightened (see _generate_backfill);
+                maps "table.column" to the SQL expression to fill in
+        """
+        self.source = source
+        self.destination = destination
+        self.destructive = destructive
+        self.coalesce = coalesce
+        self.target_version = target_version
+        self.explicit_algorithm = explicit_algorithm
+        self.shadow_copy = shadow_copy
+        self.backfill = backfill
+        self.migration_steps: List[MigrationStep] = []
+        self.warnings: List[Warning] = []
+        
+        # Tables already compared by compare_table_early() and their steps
+        self._early_tables: Set[str] = set()
+        self._early_steps: List[MigrationStep] = []
+
+    @property
+    def online_ddl(self) -> OnlineDDLClassifier:
+        """Online DDL classifier for the target server version."""
+        return OnlineDDLClassifier(self.target_version or self.destination.server_version)
+
+    @staticmethod
+    def table_digest(table: Table) -> str:
+        """
+        Return the canonical structural digest of a table.
+        
+        The digest covers every structural field of the table (columns in
+        order, keys, options and comments, but not statistics), so it is at
+        least as strict as the structural comparison: equal digests mean no
+        migration steps for the pair. It is computed once and kept on the
+        table.
+        
+        Args:
+            table: Table to digest
+            
+        Returns:
+            Hex digest string
+        """
+        if table.digest is None:
+            data = asdict(table)
+            del data['digest']
+            del data['stats']
+            canonical = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+            table.digest = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+        return table.digest
+
+    def compare_table_early(self, source_table: Table, dest_table: Table):
+        """
+        Compare a table present in both schemas ahead of generate_migration_plan().
+        
+        Lets callers diff tables while the rest of the schemas are still being
+        extracted. The steps are kept and included in the next plan, and the
+        table is not compared again. A table whose foreign keys reference
+        different tables in the two schemas is left for the plan, as the
+        referenced tables may be renamed (see _rename_tables) and its
+        foreign keys would otherwise be dropped and re-added.
+        
+        Args:
+            source_table: Source table (target state)
+            dest_table: Destination table (current state)
+        """
+        if ({fk.referenced_table for fk in source_table.foreign_keys}
+                != {fk.referenced_table for fk in dest_table.foreign_keys}):
+            return
+        steps = self.migration_steps
+        self.migration_steps = []
+        try:
+            self._compare_table_structure(source_table, dest_table)
+            self._early_steps.extend(self.migration_steps)
+            self._early_tables.add(source_table.name)
+        finally:
+            self.migration_steps = steps
+
+    def generate_migration_plan(self, include_tables: bool = True, include_views: bool = True,
+                                include_procedures: bool = True, include_triggers: bool = True) -> List[MigrationStep]:
+        """
+        Generate a complete migration plan.
+        
+        Args:
+            include_tables: Whether to include table migrations
+            include_views: Whether to include view migrations
+            include_procedures: Whether to include procedure migrations
+            include_triggers: Whether to include trigger migrations
+            
+        Returns:
+            List of MigrationStep objects in execution order
+        """
+        self.migration_steps = list(self._early_steps) if include_tables else []
+        self.warnings = []
+        
+        if include_tables:
+            self._rename_tables()
+        
+        if include_triggers:
+            self._compare_triggers()
+        
+        if include_views:
+            self._compare_views()
+        
+        if include_tables:
+            self._compare_tables()
+        
+        if include_procedures:
+            self._compare_procedures()
+        
+        if self.coalesce:
+            self.migration_steps = self.coalesce_alter_steps(self.migration_steps)
+        
+        if self.explicit_algorithm:
+            online_ddl = self.online_ddl
+            for step in self.migration_steps:
+                if step.algorithm is not None:
+                    clauses = online_ddl.algorithm_clauses(step.algorithm, step.concurrent_dml)
+                    step.sql = self._alter_sql(step.table, step.alter_clauses + clauses)
+        
+        if self.shadow_copy:
+            self.migration_steps = self.use_shadow_copies(self.migration_steps)
+        
+        # Order steps by their dependencies, using the stage as a tiebreaker
+        self.migration_steps = self.order_steps(self.migration_steps)
+        
+        return self.migration_steps
+
+    def coalesce_alter_steps(self, steps: List[MigrationStep]) -> List[MigrationStep]:
+        """
+        Merge the ALTER TABLE steps of each table into as few statements as possible.
+        
+        Every ALTER TABLE on a large InnoDB table can rebuild it and takes its
+        own metadata lock, so each table gets one statement for its index,
+        column and option changes. A few changes are kept apart because
+        merging them would break the plan:
+        
+        - Foreign keys being dropped stay in a separate, earlier statement
+          when the table has a foreign key to another table that the plan
+          changes or drops, since that table's changes may depend on it.
+        - Foreign keys being added stay in a separate statement in the
+          CREATE_FOREIGN_KEYS stage: the tables and indexes they need may
+          only exist by then, and adding a foreign key forces the copy
+          algorithm on whatever statement it is part of.
+        - Columns being made NOT NULL after a backfill stay in a separate
+          statement, which runs after the backfill.
+        - Columns that can be added or dropped INSTANTly stay apart from
+          changes that cannot, which would otherwise turn them into a table
+          rebuild. Added columns go first and dropped ones last, so the
+          other changes can use the former and drop indexes on the latter.
+        
+        Args:
+            steps: Migration steps, as produced by generate_migration_plan()
+            
+        Returns:
+            New list of steps with the ALTER TABLE steps merged per table
+        """
+        affected = {step.table for step in steps if step.table}
+        by_table: Dict[str, List[MigrationStep]] = {}
+        result = []
+        for step in steps:
+            if step.alter_clauses:
+                by_table.setdefault(step.table, []).append(step)
+            else:
+                result.append(step)
+        
+        backfilled = {(step.table, step.backfill.column) for step in steps if step.backfill}
+        
+        for table_name, table_steps in by_table.items():
+            table_steps.sort(key=lambda step: step.stage.value)
+            fk_drops, changes, fk_adds = [], [], []
+            instant_adds, instant_drops, tightening = [], [], []
+            for step in table_steps:
+                if any((table_name, column) in backfilled for column in self._modified_columns(step)):
+                    tightening.append(step)
+                elif step.stage == MigrationStage.DROP_FOREIGN_KEYS:
+                    fk_drops.append(step)
+                elif step.stage == MigrationStage.CREATE_FOREIGN_KEYS:
+                    fk_adds.append(step)
+                elif step.algorithm == DDLAlgorithm.INSTANT and step.stage == MigrationStage.ADD_COLUMNS:
+                    instant_adds.append(step)
+                elif step.algorithm == DDLAlgorithm.INSTANT and step.stage == MigrationStage.DROP_COLUMNS:
+                    instant_drops.append(step)
+                else:
+                    changes.append(step)
+            
+            all_instant = all(step.algorithm == DDLAlgorithm.INSTANT for step in changes)
+            if all_instant:
+                changes = sorted(instant_drops + changes + instant_adds, key=lambda step: step.stage.value)
+                instant_adds, instant_drops = [], []
+            if instant_adds:
+                stage = min(instant_adds[0].stage, changes[0].stage, key=lambda stage: stage.value)
+                result.append(self._merge_alter_steps(table_name, instant_adds, stage))
+            
+            dest_table = self.destination.tables.get(table_name)
+            fk_drops_separate = dest_table is not None and any(
+                fk.referenced_table != table_name and fk.referenced_table in affected
+                for fk in dest_table.foreign_keys
+            )
+            if changes and not fk_drops_separate and not all_instant:
+                # Runs where the table's first other change would have run
+                result.append(self._merge_alter_steps(table_name, fk_drops + changes, changes[0].stage))
+            else:
+                result.append(self._merge_alter_steps(table_name, fk_drops))
+                result.append(self._merge_alter_steps(table_name, changes))
+            result.append(self._merge_alter_steps(table_name, tightening))
+            if instant_drops:
+                stage = max(instant_drops[0].stage, changes[-1].stage, key=lambda stage: stage.value)
+                result.append(self._merge_alter_steps(table_name, instant_drops, stage))
+            result.append(self._merge_alter_steps(table_name, fk_adds))
+        
+        return [step for step in result if step is not None]
+
+    @staticmethod
+    def _modified_columns(step: MigrationStep) -> List[str]:
+        """Return the columns a step changes with MODIFY COLUMN."""
+        return [match.group(1) for match in
+                (re.match(r'MODIFY COLUMN `([^`]+)`', clause) for clause in step.alter_clauses) if match]
+
+    def _merge_alter_steps(self, table_name: str, steps: List[MigrationStep],
+                           stage: Optional[MigrationStage] = None) -> Optional[MigrationStep]:
+        """
+        Combine ALTER TABLE steps on one table into a single step.
+        
+        Args:
+            table_name: Table the steps alter
+            steps: Steps to combine, in clause order
+            stage: Stage of the combined step (default: stage of the first step)
+            
+        Returns:
+            The combined step, the only step if there is one, or None if there are none
+        """
+        if not steps:
+            return None
+        if len(steps) == 1:
+            if stage is not None:
+                steps[0].stage = stage
+            return steps[0]
+        
+        clauses = [clause for step in steps for clause in step.alter_clauses]
+        merged = MigrationStep(
+            stage=stage or steps[0].stage,
+            sql=self._alter_sql(table_name, clauses),
+            description="; ".join(step.description for step in steps),
+            table=table_name,
+            alter_clauses=clauses,
+            algorithm=max((step.algorithm for step in steps), key=lambda algorithm: algorithm.value),
+            concurrent_dml=all(step.concurrent_dml for step in steps)
+        )
+        for step in steps:
+            merged.warnings.extend(step.warnings)
+        return merged
+
+    def use_shadow_copies(self, steps: List[MigrationStep]) -> List[MigrationStep]:
+        """
+        Replace the ALTER TABLE steps of write-blocking tables with shadow table copies.
+        
+        A table qualifies when one of its ALTER TABLE steps does not allow
+        concurrent DML (e.g. a column type or character set change) and the
+        copy can reproduce the change safely (see _shadow_copy_blocker). All
+        of the table's ALTER TABLE steps are then replaced by one step that
+        builds the source definition as a new table and swaps it in (see
+        ShadowTableCopy). The step's SQL is the equivalent ALTER TABLE, so a
+        --plan script still applies the same change.
+        
+        Args:
+            steps: Migration steps
+            
+        Returns:
+            New list of steps
+        """
+        by_table: Dict[str, List[MigrationStep]] = {}
+        for step in steps:
+            if step.alter_clauses:
+                by_table.setdefault(step.table, []).append(step)
+        
+        shadowed = {}
+        for table_name, table_steps in by_table.items():
+            if all(step.concurrent_dml for step in table_steps):
+                continue
+            if self._shadow_copy_blocker(table_name, table_steps, steps) is not None:
+                continue
+            table_steps.sort(key=lambda step: step.stage.value)
+            clauses = [clause for step in table_steps for clause in step.alter_clauses]
+            shadow = MigrationStep(
+                stage=table_steps[0].stage,
+                sql=self._alter_sql(table_name, clauses),
+                description=f"Rebuild table '{table_name}' online through a shadow copy: "
+                            + "; ".join(step.description for step in table_steps),
+                table=table_name,
+                alter_clauses=clauses,
+                algorithm=DDLAlgorithm.COPY,
+                shadow_table=self.source.tables[table_name]
+            )
+            for step in table_steps:
+                shadow.warnings.extend(step.warnings)
+            shadowed[table_name] = shadow
+        
+        result = []
+        for step in steps:
+            if step.alter_clauses and step.table in shadowed:
+                if shadowed[step.table] is not None:
+                    result.append(shadowed[step.table])
+                    shadowed[step.table] = None
+            else:
+                result.append(step)
+        return result
+
+    def _shadow_copy_blocker(self, table_name: str, table_steps: List[MigrationStep],
+                             steps: List[MigrationStep]) -> Optional[str]:
+        """
+        Explain why a table cannot be changed through a shadow table copy.
+        
+        Args:
+            table_name: Table to change
+            table_steps: The table's ALTER TABLE steps
+            steps: Every step of the plan
+            
+        Returns:
+            Reason, or None if the table can be copied
+        """
+        source_table = self.source.tables.get(table_name)
+        dest_table = self.destination.tables.get(table_name)
+        if source_table is None or dest_table is None:
+            return "not in both schemas"
+        if len(table_name) > ShadowTableCopy.MAX_NAME_LENGTH:
+            return "name too long for the shadow table names"
+        if not dest_table.primary_key or source_table.primary_key != dest_table.primary_key:
+            return "no primary key, or the primary key changes"
+        if (source_table.engine or '').lower() != 'innodb' or (dest_table.engine or '').lower() != 'innodb':
+            return "not an InnoDB table"
+        if any(clause.upper().startswith(('RENAME COLUMN', 'CHANGE COLUMN'))
+               for step in table_steps for clause in step.alter_clauses):
+            return "columns are renamed"
+        # Without --destructive, columns and indexes missing from the source
+        # must be kept, which the copy (built from the source) would not do
+        source_columns = {column.name for column in source_table.columns}
+        source_indexes = {(tuple(index.columns), index.is_unique, index.index_type.upper())
+                          for index in source_table.indexes}
+        if not self.destructive and (
+                any(column.name not in source_columns for column in dest_table.columns)
+                or any((tuple(index.columns), index.is_unique, index.index_type.upper()) not in source_indexes
+                       for index in dest_table.indexes)):
+            return "has columns or indexes that are not in the source"
+        # The REPLACE triggers would silently delete rows conflicting on a
+        # new or changed unique key (and the copy would skip them)
+        dest_unique = {tuple(index.columns) for index in dest_table.indexes if index.is_unique}
+        dest_columns = {column.name: column for column in dest_table.columns}
+        for index in source_table.indexes:
+            if not index.is_unique:
+                continue
+            if tuple(index.columns) not in dest_unique:
+                return "unique keys are added or changed"
+            for column in source_table.columns:
+                current = dest_columns.get(column.name)
+                if column.name in index.columns and current is not None and (
+                        column.data_type.upper() != current.data_type.upper()
+                        or column.collation != current.collation):
+                    return "unique keys are added or changed"
+        # Foreign keys would have to be moved to the copy (or point at the
+        # old table after the swap)
+        for schema in (self.source, self.destination):
+            for table in schema.tables.values():
+                if any(fk.referenced_table == table_name or table.name == table_name
+                       for fk in table.foreign_keys):
+                    return "has or is referenced by foreign keys"
+        if any(step.backfill and step.table == table_name for step in steps):
+            return "columns are backfilled"
+        # The copy is kept in sync by triggers of its own
+        dropped = {step.object_name for step in steps
+                   if step.object_type == 'TRIGGER' and step.stage == MigrationStage.DROP_TRIGGERS}
+        if any(trigger.table == table_name and name not in dropped
+               for name, trigger in self.destination.triggers.items()):
+            return "has triggers"
+        return None
+
+    def order_steps(self, steps: List[MigrationStep]) -> List[MigrationStep]:
+        """
+        Order migration steps by the dependencies between them.
+        
+        Builds a dependency graph between the steps and sorts it
+        topologically, taking the step with the earliest stage (then the
+        earliest generated) whenever several are ready. A step depends on:
+        
+        - The earlier steps on the same table, view, trigger or routine
+          (tables and views share one namespace).
+        - For a foreign key being added (by ALTER TABLE or CREATE TABLE),
+          the steps creating or changing the table it references.
+        - For a table change or drop, the steps dropping foreign keys that
+          reference the table, including drops of the referencing table.
+        - For a view being created, the steps on the tables and views its
+          definition names and on the stored functions it calls.
+        - For a trigger being created, the steps on its table; for a table
+          change, the steps dropping the table's triggers.
+        
+        Sets step_id and depends_on on every step. Steps with no path
+        between them are independent and may run in either order. If the
+        dependencies are circular (e.g. two new tables referencing each
+        other), the cycle is broken by stage order and a warning added.
+        
+        Args:
+            steps: Migration steps
+            
+        Returns:
+            The steps in execution order
+        """
+        # Steps per object; tables and views are both keyed as relations
+        by_object: Dict[Tuple[str, str], List[int]] = {}
+        for i, step in enumerate(steps):
+            if step.table:
+                key = ('RELATION', step.table)
+            elif step.object_type == 'VIEW':
+                key = ('RELATION', step.object_name)
+            else:
+                key = (step.object_type, step.object_name)
+            by_object.setdefault(key, []).append(i)
+        
+        def table_steps(name: str) -> List[int]:
+            return [i for i in by_object.get(('RELATION', name), []) if steps[i].table]
+        
+        predecessors: List[Set[int]] = [set() for _ in steps]
+        for indexes in by_object.values():
+            indexes.sort(key=lambda i: (steps[i].stage.value, i))
+            for before, after in zip(indexes, indexes[1:]):
+                predecessors[after].add(before)
+        
+        for i, step in enumerate(steps):
+            if step.table:
+                for referenced in self._added_references(step):
+                    for j in table_steps(referenced):
+                        if not self._references_only(steps[j]):
+                            predecessors[i].add(j)
+                for referenced in self._dropped_references(step):
+                    for j in table_steps(referenced):
+                        if not self._references_only(steps[j]):
+                            predecessors[j].add(i)
+            elif step.object_type == 'VIEW' and step.object_name in self.source.views:
+                if step.stage == MigrationStage.CREATE_VIEWS:
+                    view = self.source.views[step.object_name]
+                    for name in self._view_references(view):
+                        for j in by_object.get(('RELATION', name), []):
+                            predecessors[i].add(j)
+                    for name in self._view_function_calls(view):
+                        for j in by_object.get(('FUNCTION', name), []):
+                            predecessors[i].add(j)
+            elif step.object_type == 'TRIGGER':
+                if step.stage == MigrationStage.CREATE_TRIGGERS:
+                    trigger = self.source.triggers.get(step.object_name)
+                    for j in table_steps(trigger.table) if trigger else []:
+                        predecessors[i].add(j)
+                else:
+                    trigger = self.destination.triggers.get(step.object_name)
+                    for j in table_steps(trigger.table) if trigger else []:
+                        predecessors[j].add(i)
+        for i, before in enumerate(predecessors):
+            before.discard(i)
+        
+        # Kahn's algorithm, releasing ready steps by (stage, generation order)
+        successors: List[List[int]] = [[] for _ in steps]
+        for i, before in enumerate(predecessors):
+            for j in before:
+                successors[j].append(i)
+        waiting = [len(before) for before in predecessors]
+        ready = [(step.stage.value, i) for i, step in enumerate(steps) if not waiting[i]]
+        heapq.heapify(ready)
+        order: List[int] = []
+        done: Set[int] = set()
+        while len(order) < len(steps):
+            if not ready:
+                i = min((i for i in range(len(steps)) if i not in done),
+                        key=lambda i: (steps[i].stage.value, i))
+                steps[i].warnings.append(Warning(
+                    level=WarningLevel.WARNING,
+                    message=f"Circular dependency between migration steps; "
+                            f"'{steps[i].description}' is ordered by stage and may fail.",
+                    context=steps[i].table or steps[i].object_name
+                ))
+                waiting[i] = 0
+                heapq.heappush(ready, (steps[i].stage.value, i))
+            _, i = heapq.heappop(ready)
+            if i in done:
+                continue
+            done.add(i)
+            order.append(i)
+            for j in successors[i]:
+                waiting[j] -= 1
+                if waiting[j] == 0 and j not in done:
+                    heapq.heappush(ready, (steps[j].stage.value, j))
+        
+        step_ids = {i: position for position, i in enumerate(order, 1)}
+        for i in order:
+            steps[i].step_id = step_ids[i]
+            steps[i].depends_on = sorted(step_ids[j] for j in predecessors[i] if step_ids[j] < step_ids[i])
+        return [steps[i] for i in order]
+
+    @staticmethod
+    def _references_only(step: MigrationStep) -> bool:
+        """Check whether a step only adds or drops foreign keys."""
+        return bool(step.alter_clauses) and all(
+            re.match(r'(ADD\s+CONSTRAINT\s+`[^`]+`\s+FOREIGN\s+KEY|DROP\s+FOREIGN\s+KEY)\b', clause, re.I)
+            for clause in step.alter_clauses
+        )
+
+    def _added_references(self, step: MigrationStep) -> Set[str]:
+        """Return the other tables referenced by foreign keys a table step creates."""
+        if step.stage == MigrationStage.CREATE_TABLES:
+            clauses = [step.sql]
+        else:
+            clauses = step.alter_clauses
+        return {
+            name for clause in clauses
+            for name in re.findall(r'\bREFERENCES\s+`([^`]+)`', clause, re.I)
+        } - {step.table}
+
+    def _dropped_references(self, step: MigrationStep) -> Set[str]:
+        """Return the other tables referenced by foreign keys a table step drops."""
+        dest_table = self.destination.tables.get(step.table)
+        if dest_table is None:
+            return set()
+        if step.stage == MigrationStage.DROP_TABLES:
+            dropped = dest_table.foreign_keys
+        else:
+            names = {
+                name for clause in step.alter_clauses
+                for name in re.findall(r'^DROP\s+FOREIGN\s+KEY\s+`([^`]+)`', clause, re.I)
+            }
+            dropped = [fk for fk in dest_table.foreign_keys if fk.name in names]
+        return {fk.referenced_table for fk in dropped} - {step.table}
+
+    def _view_references(self, view: View) -> Set[str]:
+        """Return the source tables and views a view definition names."""
+        definition = re.sub(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"", "''", view.definition)
+        names = {quoted or bare for quoted, bare in
+                 re.findall(r'`([^`]+)`|\b([A-Za-z_][A-Za-z0-9_$]*)\b', definition)}
+        return (names & (set(self.source.tables) | set(self.source.views))) - {view.name}
+
+    def _view_function_calls(self, view: View) -> Set[str]:
+        """Return the source stored functions a view definition calls."""
+        definition = re.sub(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"", "''", view.definition)
+        names = {quoted or bare for quoted, bare in
+                 re.findall(r'`([^`]+)`\s*\(|\b([A-Za-z_][A-Za-z0-9_$]*)\s*\(', definition)}
+        return {name for name in names
+                if name in self.source.procedures and self.source.procedures[name].type == 'FUNCTION'}
+
+    def _rename_tables(self):
+        """
+        Rename tables rather than drop and re-create them.
+        
+        The rest of the comparison (including triggers and the steps'
+        dependencies) then treats the destination as already using the new
+        names.
+        """
+        source_tables = set(self.source.tables.keys())
+        dest_tables = set(self.destination.tables.keys())
+        renames = self._match_renamed_tables(source_tables - dest_tables, dest_tables - source_tables)
+        if renames:
+            self._generate_rename_tables(renames)
+            self.destination = self._with_renamed_tables(self.destination, renames)
+
+    def _compare_tables(self):
+        """Compare tables between source and destination schemas."""
+        source_tables = set(self.source.tables.keys())
+        dest_tables = set(self.destination.tables.keys())
+        
+        # Tables to drop (exist in destination but not in source)
+        if self.destructive:
+            for table_name in dest_tables - source_tables:
+                self._generate_drop_table(table_name)
+        
+        # Tables to create (exist in source but not in destination)
+        for table_name in source_tables - dest_tables:
+            self._generate_create_table(self.source.tables[table_name])
+        
+        # Tables to modify (exist in both, unless compared early)
+        for table_name in (source_tables & dest_tables) - self._early_tables:
+            self._compare_table_structure(
+                self.source.tables[table_name],
+                self.destination.tables[table_name]
+            )
+
+    def _match_renamed_tables(self, source_only: Set[str], dest_only: Set[str]) -> Dict[str, str]:
+        """
+        Find tables that were renamed.
+        
+        Rename hints in the source schema are used first. In destructive
+        mode the remaining tables found on one side only are then paired up
+        when they share at least TABLE_RENAME_THRESHOLD of their columns
+        (by name and type); the rest of the differences are migrated as
+        usual after the rename.
+        
+        Args:
+            source_only: Names of the tables only in the source
+            dest_only: Names of the tables only in the destination
+            
+        Returns:
+            Dictionary of destination table name -> source table name
+        """
+        renames = {
+            old_name: new_name for old_name, new_name in self.source.renames.tables.items()
+            if old_name in dest_only and new_name in source_only
+        }
+        if not self.destructive:
+            return renames
+        
+        def columns(table: Table) -> Set[Tuple[str, str]]:
+            return {(column.name, column.data_type.strip().lower()) for column in table.columns}
+        
+        scores = {}
+        for dest_name in dest_only - set(renames):
+            dest_columns = columns(self.destination.tables[dest_name])
+            for source_name in source_only - set(renames.values()):
+                source_columns = columns(self.source.tables[source_name])
+                score = len(source_columns & dest_columns) / max(len(source_columns | dest_columns), 1)
+                if score >= self.TABLE_RENAME_THRESHOLD:
+                    scores[(dest_name, source_name)] = score
+        return {**renames, **self._match_similar(scores)}
+
+    def _generate_rename_tables(self, renames: Dict[str, str]):
+        """Generate steps renaming tables (metadata only; foreign keys and triggers follow)."""
+        for old_name, new_name in renames.items():
+            step = MigrationStep(
+                stage=MigrationStage.RENAME_TABLES,
+                sql=f"RENAME TABLE `{old_name}` TO `{new_name}`;",
+                description=f"Rename table '{old_name}' to '{new_name}'",
+                table=new_name
+            )
+            if self.source.renames.tables.get(old_name) != new_name:
+                step.warnings.append(Warning(
+                    level=WarningLevel.INFO,
+                    message=f"Table '{old_name}' appears to have been renamed to '{new_name}'. "
+                            f"Add a rename hint to the source schema to confirm it.",
+                    context=f"Table: {old_name}"
+                ))
+            self.migration_steps.append(step)
+
+    @staticmethod
+    def _with_renamed_tables(schema: Schema, renames: Dict[str, str]) -> Schema:
+        """Return a copy of a schema with tables renamed, including in foreign keys and triggers."""
+        def rename_references(table: Table) -> Table:
+            if not any(fk.referenced_table in renames for fk in table.foreign_keys):
+                return table
+            return replace(
+                table,
+                foreign_keys=[
+                    replace(fk, referenced_table=renames.get(fk.referenced_table, fk.referenced_table))
+                    for fk in table.foreign_keys
+                ],
+                digest=None
+            )
+        
+        tables = {}
+        for name, table in schema.tables.items():
+            if name in renames:
+                table = replace(table, name=renames[name], digest=None)
+            table = rename_references(table)
+            tables[table.name] = table
+        return replace(
+            schema,
+            tables=tables,
+            triggers={
+                name: replace(trigger, table=renames.get(trigger.table, trigger.table))
+                for name, trigger in schema.triggers.items()
+            }
+        )
+
+    def _generate_drop_table(self, table_name: str):
+        """Generate step to drop a table."""
+        step = MigrationStep(
+            stage=MigrationStage.DROP_TABLES,
+            sql=f"DROP TABLE IF EXISTS `{table_name}`;",
+            description=f"Drop table '{table_name}'",
+            table=table_name
+        )
+        step.warnings.append(Warning(
+            level=WarningLevel.WARNING,
+            message=f"Dropping table '{table_name}' will delete all its data.",
+            context=f"Table: {table_name}"
+        ))
+        self.migration_steps.append(step)
+
+    def _generate_create_table(self, table: Table):
+        """
+        Generate step to create a table.
+        
+        Args:
+            table: Table object to create
+        """
+        step = MigrationStep(
+            stage=MigrationStage.CREATE_TABLES,
+            sql=self.create_table_sql(table),
+            description=f"Create table '{table.name}'",
+            table=table.name
+        )
+        
+        # Validate the table and attach warnings
+        step.warnings.extend(SchemaValidator._validate_table(table))
+        
+        self.migration_steps.append(step)
+
+    @classmethod
+    def create_table_sql(cls, table: Table) -> str:
+        """
+        Build the CREATE TABLE statement for a table.
+        
+        Args:
+            table: Table object to create
+            
+        Returns:
+            CREATE TABLE statement
+        """
+        sql_parts = [f"CREATE TABLE `{table.name}` ("]
+        
+        # Add column definitions
+        column_defs = [f"  {cls._column_definition(column)}" for column in table.columns]
+        
+        sql_parts.append(",\n".join(column_defs))
+        
+        # Add primary key
+        if table.primary_key:
+            pk_cols = ", ".join(f"`{col}`" for col in table.primary_key)
+            sql_parts.append(f",\n  PRIMARY KEY ({pk_cols})")
+        
+        # Add indexes
+        for index in table.indexes:
+            idx_cols = ", ".join(f"`{col}`" for col in index.columns)
+            unique = "UNIQUE " if index.is_unique else ""
+            sql_parts.append(f",\n  {unique}INDEX `{index.name}` ({idx_cols}) USING {index.index_type}")
+        
+        # Add foreign keys
+        for fk in table.foreign_keys:
+            fk_cols = ", ".join(f"`{col}`" for col in fk.columns)
+            ref_cols = ", ".join(f"`{col}`" for col in fk.referenced_columns)
+            sql_parts.append(
+                f",\n  CONSTRAINT `{fk.name}` FOREIGN KEY ({fk_cols}) "
+                f"REFERENCES `{fk.referenced_table}` ({ref_cols}) "
+                f"ON DELETE {fk.on_delete} ON UPDATE {fk.on_update}"
+            )
+        
+        sql_parts.append("\n)")
+        
+        # Add engine and charset
+        sql_parts.append(f" ENGINE={table.engine}")
+        # Extracted tables only know their collation (also stored as the
+        # charset), which implies the character set
+        if table.charset and table.charset != table.collation:
+            sql_parts.append(f" DEFAULT CHARSET={table.charset}")
+        if table.collation:
+            sql_parts.append(f" COLLATE={table.collation}")
+        if table.comment:
+            sql_parts.append(f" COMMENT='{table.comment}'")
+        
+        sql_parts.append(";")
+        
+        return "".join(sql_parts)
+
+    def _alter_step(self, stage: MigrationStage, table_name: str, clause: str,
+                    description: str, ddl: DDLClass) -> MigrationStep:
+        """
+        Build a step altering an existing table with a single clause.
+        
+        Args:
+            stage: Migration stage for ordering
+            table_name: Table to alter
+            clause: ALTER TABLE clause (e.g. "ADD COLUMN ...")
+            description: Human-readable description
+            ddl: Online DDL classification of the clause
+            
+        Returns:
+            MigrationStep running "ALTER TABLE `table_name` clause;"
+        """
+        return MigrationStep(
+            stage=stage,
+            sql=self._alter_sql(table_name, [clause]),
+            description=description,
+            table=table_name,
+            alter_clauses=[clause],
+            algorithm=ddl[0],
+            concurrent_dml=ddl[1]
+        )
+
+    @staticmethod
+    def _alter_sql(table_name: str, clauses: List[str]) -> str:
+        """Build an ALTER TABLE statement, one clause per line if there are several."""
+        if len(clauses) == 1:
+            return f"ALTER TABLE `{table_name}` {clauses[0]};"
+        return f"ALTER TABLE `{table_name}`\n  " + ",\n  ".join(clauses) + ";"
+
+    def _compare_table_structure(self, source_table: Table, dest_table: Table):
+        """
+        Compare the structure of two tables and generate modification steps.
+        
+        Args:
+            source_table: Source table (target state)
+            dest_table: Destination table (current state)
+        """
+        # Identical tables (the common case) need no detailed comparison
+        if self.table_digest(source_table) == self.table_digest(dest_table):
+            return
+        
+        # Rename columns rather than drop and re-add them, then compare the
+        # rest as if the destination already used the new names
+        renames = self._match_renamed_columns(source_table, dest_table)
+        if renames:
+            self._generate_rename_columns(source_table, dest_table, renames)
+            dest_table = self._with_renamed_columns(dest_table, renames, source_table)
+        
+        # First, handle foreign keys that need to be dropped
+        self._compare_foreign_keys(source_table, dest_table)
+        
+        # Then compare indexes
+        self._compare_indexes(source_table, dest_table)
+        
+        # Then compare columns
+        self._compare_columns(source_table, dest_table)
+        
+        # Update table options if needed
+        self._compare_table_options(source_table, dest_table)
+
+    @staticmethod
+    def _match_definitions(source_keys: Dict[str, Any], dest_keys: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Pair up objects with identical definitions, preferring equal names.
+        
+        Objects with the same name and definition are paired first; the
+        rest are paired by definition alone, in name order.
+        
+        Args:
+            source_keys: Name -> definition key of the source objects
+            dest_keys: Name -> definition key of the destination objects
+            
+        Returns:
+            Dictionary of source name -> destination name for every pair
+        """
+        matches = {name: name for name, key in source_keys.items() if dest_keys.get(name) == key}
+        unmatched_dest = defaultdict(list)
+        for name in sorted(dest_keys.keys() - matches.keys()):
+            unmatched_dest[dest_keys[name]].append(name)
+        for name in sorted(source_keys.keys() - matches.keys()):
+            if unmatched_dest.get(source_keys[name]):
+                matches[name] = unmatched_dest[source_keys[name]].pop(0)
+        return matches
+
+    @staticmethod
+    def _match_similar(scores: Dict[Tuple[str, str], float]) -> Dict[str, str]:
+        """
+        Pair up objects by similarity, keeping only unambiguous pairs.
+        
+        Repeatedly pairs a destination object with a source object when each
+        is the other's single best-scoring candidate, so that ties (e.g. two
+        identical columns renamed at once) are left unmatched.
+        
+        Args:
+            scores: (destination name, source name) -> similarity, for the
+                candidate pairs only
+            
+        Returns:
+            Dictionary of destination name -> source name
+        """
+        scores = dict(scores)
+        matches = {}
+        while scores:
+            best_for_dest: Dict[str, List[Tuple[float, str]]] = defaultdict(list)
+            best_for_source: Dict[str, List[Tuple[float, str]]] = defaultdict(list)
+            for (dest_name, source_name), score in scores.items():
+                best_for_dest[dest_name].append((score, source_name))
+                best_for_source[source_name].append((score, dest_name))
+            
+            def unique_best(candidates: List[Tuple[float, str]]) -> Optional[str]:
+                candidates.sort(reverse=True)
+                if len(candidates) > 1 and candidates[1][0] == candidates[0][0]:
+                    return None
+                return candidates[0][1]
+            
+            paired = {
+                dest_name: source_name
+                for dest_name, candidates in best_for_dest.items()
+                for source_name in [unique_best(candidates)]
+                if source_name is not None and unique_best(best_for_source[source_name]) == dest_name
+            }
+            if not paired:
+                break
+            matches.update(paired)
+            scores = {
+                (dest_name, source_name): score for (dest_name, source_name), score in scores.items()
+                if dest_name not in paired and source_name not in paired.values()
+            }
+        return matches
+
+    def _match_renamed_columns(self, source_table: Table, dest_table: Table) -> Dict[str, str]:
+        """
+        Find columns that were renamed.
+        
+        Rename hints for the table in the source schema are used first. In
+        destructive mode the remaining columns found on one side only are
+        then paired up by similarity: the same type (required, at least up
+        to its length or members), position, nullability, default and other
+        attributes, and membership of the same indexes and foreign keys.
+        Without destructive mode the old column would have been kept, so
+        only hinted renames are made. Generated columns are not renamed on
+        servers without RENAME COLUMN, as CHANGE COLUMN would need their
+        expression.
+        
+        Returns:
+            Dictionary of destination column name -> source column name
+        """
+        rename_syntax = self.online_ddl.supports(OnlineDDLClassifier.RENAME_COLUMN_SYNTAX)
+        source_cols = {column.name: column for column in source_table.columns}
+        dest_cols = {column.name: column for column in dest_table.columns}
+        
+        def renameable(column: Column) -> bool:
+            return rename_syntax or 'generated' not in column.extra.lower()
+        
+        source_only = {name for name, column in source_cols.items() if name not in dest_cols and renameable(column)}
+        dest_only = {name for name, column in dest_cols.items() if name not in source_cols and renameable(column)}
+        renames = {
+            old_name: new_name
+            for old_name, new_name in self.source.renames.columns.get(source_table.name, {}).items()
+            if old_name in dest_only and new_name in source_only
+        }
+        if not self.destructive:
+            return renames
+        source_only -= set(renames.values())
+        dest_only -= set(renames)
+        
+        def memberships(table: Table, name: str) -> Tuple[Set[Tuple[str, int]], Set[Tuple[str, int]]]:
+            keys = [('PRIMARY', table.primary_key)] + [(index.name, index.columns) for index in table.indexes]
+            return (
+                {(key, columns.index(name)) for key, columns in keys if name in columns},
+                {(fk.name, fk.columns.index(name)) for fk in table.foreign_keys if name in fk.columns}
+            )
+        
+        source_positions = {column.name: i for i, column in enumerate(source_table.columns)}
+        dest_positions = {column.name: i for i, column in enumerate(dest_table.columns)}
+        scores = {}
+        for dest_name in dest_only:
+            dest_col = dest_cols[dest_name]
+            dest_keys = memberships(dest_table, dest_name)
+            for source_name in source_only:
+                source_col = source_cols[source_name]
+                source_type = source_col.data_type.strip().lower()
+                dest_type = dest_col.data_type.strip().lower()
+                if source_type == dest_type:
+                    score = 3
+                elif source_type.split('(')[0] == dest_type.split('(')[0]:
+                    score = 1
+                else:
+                    continue
+                score += 2 * (source_positions[source_name] == dest_positions[dest_name])
+                score += source_col.is_nullable == dest_col.is_nullable
+                score += source_col.default == dest_col.default
+                score += (source_col.extra, source_col.character_set, source_col.collation, source_col.comment) == \
+                    (dest_col.extra, dest_col.character_set, dest_col.collation, dest_col.comment)
+                for source_keys, keys in zip(memberships(source_table, source_name), dest_keys):
+                    score += 2 * bool(source_keys and source_keys == keys)
+                if score >= self.COLUMN_RENAME_THRESHOLD:
+                    scores[(dest_name, source_name)] = score
+        
+        return {**renames, **self._match_similar(scores)}
+
+    def _generate_rename_columns(self, source_table: Table, dest_table: Table, renames: Dict[str, str]):
+        """
+        Generate steps renaming columns.
+        
+        A column renamed without other changes gets RENAME COLUMN (CHANGE
+        COLUMN on older servers). One whose definition changes too gets a
+        single CHANGE COLUMN, as a MODIFY of the new name could not be
+        combined with the rename in one ALTER TABLE.
+        """
+        source_cols = {col.name: col for col in source_table.columns}
+        dest_cols = {col.name: col for col in dest_table.columns}
+        rename_syntax = self.online_ddl.supports(OnlineDDLClassifier.RENAME_COLUMN_SYNTAX)
+        hinted = self.source.renames.columns.get(source_table.name, {})
+        
+        for old_name, new_name in renames.items():
+            source_col = source_cols[new_name]
+            dest_col = dest_cols[old_name]
+            description = f"Rename column '{old_name}' to '{new_name}' in table '{dest_table.name}'"
+            if replace(dest_col, name=new_name) != source_col:
+                step = self._alter_step(
+                    MigrationStage.MODIFY_COLUMNS, dest_table.name,
+                    f"CHANGE COLUMN `{old_name}` {self._column_definition(source_col)}",
+                    f"{description} and change its definition",
+                    self.online_ddl.modify_column(dest_table, dest_col, source_col)
+                )
+            elif rename_syntax:
+                step = self._alter_step(
+                    MigrationStage.ADD_COLUMNS, dest_table.name, f"RENAME COLUMN `{old_name}` TO `{new_name}`",
+                    description, self.online_ddl.rename_column(dest_table)
+                )
+            else:
+                step = self._alter_step(
+                    MigrationStage.ADD_COLUMNS, dest_table.name,
+                    f"CHANGE COLUMN `{old_name}` {self._column_definition(source_col)}",
+                    description, self.online_ddl.rename_column(dest_table)
+                )
+            if hinted.get(old_name) != new_name:
+                step.warnings.append(Warning(
+                    level=WarningLevel.INFO,
+                    message=f"Column '{old_name}' appears to have been renamed to '{new_name}'. "
+                            f"Add a rename hint to the source schema to confirm it.",
+                    context=f"Table: {dest_table.name}"
+                ))
+            self.migration_steps.append(step)
+
+    @staticmethod
+    def _with_renamed_columns(table: Table, renames: Dict[str, str], source_table: Table) -> Table:
+        """
+        Return a copy of a table with columns renamed, including in its keys.
+        
+        The renamed columns take their definitions from the source table, as
+        the rename steps already change them.
+        """
+        def rename(names: List[str]) -> List[str]:
+            return [renames.get(name, name) for name in names]
+        
+        source_cols = {column.name: column for column in source_table.columns}
+        return replace(
+            table,
+            columns=[source_cols[renames[column.name]] if column.name in renames else column
+                     for column in table.columns],
+            primary_key=rename(table.primary_key),
+            indexes=[replace(index, columns=rename(index.columns)) for index in table.indexes],
+            foreign_keys=[
+                replace(
+                    fk, columns=rename(fk.columns),
+                    referenced_columns=rename(fk.referenced_columns) if fk.referenced_table == table.name
+                    else fk.referenced_columns
+                )
+                for fk in table.foreign_keys
+            ],
+            digest=None
+        )
+
+    def _compare_columns(self, source_table: Table, dest_table: Table):
+        """Compare columns between two tables."""
+        source_cols = {col.name: col for col in source_table.columns}
+        dest_cols = {col.name: col for col in dest_table.columns}
+        
+        source_col_names = set(source_cols.keys())
+        dest_col_names = set(dest_cols.keys())
+        
+        # Columns to drop
+        if self.destructive:
+            for col_name in dest_col_names - source_col_names:
+                step = self._alter_step(
+                    MigrationStage.DROP_COLUMNS, source_table.name, f"DROP COLUMN `{col_name}`",
+                    f"Drop column '{col_name}' from table '{source_table.name}'",
+                    self.online_ddl.drop_column(dest_table, dest_cols[col_name])
+                )
+                step.warnings.append(Warning(
+                    level=WarningLevel.WARNING,
+                    message=f"Dropping column '{col_name}' will delete all its data.",
+                    context=f"Table: {source_table.name}"
+                ))
+                self.migration_steps.append(step)
+        
+        # Columns to add
+        for col_name in source_col_names - dest_col_names:
+            column = source_cols[col_name]
+            self._generate_add_column(dest_table, column)
+        
+        # Columns to modify
+        for col_name in source_col_names & dest_col_names:
+            source_col = source_cols[col_name]
+            dest_col = dest_cols[col_name]
+            
+            if source_col != dest_col:
+                self._generate_modify_column(dest_table, source_col, dest_col)
+
+    @staticmethod
+    def _column_definition(column: Column) -> str:
+        """Build the column definition used by ADD, MODIFY and CHANGE COLUMN."""
+        col_def = f"`{column.name}` {column.data_type}"
+        
+        if column.character_set:
+            col_def += f" CHARACTER SET {column.character_set}"
+        
+        if column.collation:
+            col_def += f" COLLATE {column.collation}"
+        
+        if not column.is_nullable:
+            col_def += " NOT NULL"
+        else:
+            col_def += " NULL"
+        
+        if column.default is not None:
+            col_def += f" DEFAULT {column.default}"
+        
+        # MySQL 8.0 marks expression defaults with DEFAULT_GENERATED in
+        # EXTRA, which is not valid in a column definition
+        extra = re.sub(r'\bDEFAULT_GENERATED\b\s*', '', column.extra, flags=re.I).strip()
+        if extra:
+            col_def += f" {extra}"
+        
+        if column.comment:
+            col_def += f" COMMENT '{column.comment}'"
+        
+        return col_def
+
+    def _generate_add_column(self, dest_table: Table, column: Column):
+        """Generate step to add a column to an existing table."""
+        table_name = dest_table.name
+        col_def = self._column_definition(column)
+        
+        # With a value to fill in, add the column as NULL, fill it and tighten it
+        value = (self.backfill or {}).get(f"{table_name}.{column.name}")
+        if value is not None and not column.is_nullable and self._can_backfill(dest_table, column):
+            nullable = replace(column, is_nullable=True, default=None)
+            self.migration_steps.append(self._alter_step(
+                MigrationStage.ADD_COLUMNS, table_name, f"ADD COLUMN {self._column_definition(nullable)}",
+                f"Add column '{column.name}' to table '{table_name}' as NULL",
+                self.online_ddl.add_column(dest_table, nullable)
+            ))
+            self._generate_backfill(dest_table, column.name, value)
+            self.migration_steps.append(self._alter_step(
+                MigrationStage.MODIFY_COLUMNS, table_name, f"MODIFY COLUMN {col_def}",
+                f"Make column '{column.name}' in table '{table_name}' NOT NULL",
+                self.online_ddl.modify_column(dest_table, nullable, column)
+            ))
+            return
+        
+        step = self._alter_step(
+            MigrationStage.ADD_COLUMNS, table_name, f"ADD COLUMN {col_def}",
+            f"Add column '{column.name}' to table '{table_name}'",
+            self.online_ddl.add_column(dest_table, column)
+        )
+        
+        # Check for potential issues
+        if not column.is_nullable and column.default is None and 'auto_increment' not in column.extra.lower():
+            step.warnings.append(Warning(
+                level=WarningLevel.WARNING,
+                message=f"Adding NOT NULL column '{column.name}' without a default value "
+                       f"will fail if the table contains data.",
+                context=f"Table: {table_name}"
+            ))
+        
+        self.migration_steps.append(step)
+
+    def _generate_modify_column(self, dest_table: Table, source_col: Column, dest_col: Column):
+        """
+        Generate step to modify a column of an existing table.
+        
+        Uses the least expensive statement form for the difference: a
+        default-only change becomes ALTER COLUMN ... SET/DROP DEFAULT, which
+        never touches table data, and everything else a MODIFY COLUMN
+        restating the full definition (so VARCHAR extensions and ENUM/SET
+        additions the server can do in place are not turned into copies).
+        """
+        table_name = dest_table.name
+        ddl = self.online_ddl.modify_column(dest_table, dest_col, source_col)
+        
+        if (replace(dest_col, default=source_col.default) == source_col
+                and dest_col.comment == source_col.comment
+                and 'default_generated' not in source_col.extra.lower()):
+            if source_col.default is not None:
+                clause = f"ALTER COLUMN `{source_col.name}` SET DEFAULT {source_col.default}"
+            elif source_col.is_nullable:
+                clause = f"ALTER COLUMN `{source_col.name}` SET DEFAULT NULL"
+            else:
+                clause = f"ALTER COLUMN `{source_col.name}` DROP DEFAULT"
+            self.migration_steps.append(self._alter_step(
+                MigrationStage.MODIFY_COLUMNS, table_name, clause,
+                f"Change default of column '{source_col.name}' in table '{table_name}'",
+                self.online_ddl.alter_default(dest_table)
+            ))
+            return
+        
+        if ddl[0] == DDLAlgorithm.INPLACE and dest_col.data_type.upper() != source_col.data_type.upper():
+            description = f"Extend column '{source_col.name}' in table '{table_name}' in place"
+        else:
+            description = f"Modify column '{source_col.name}' in table '{table_name}'"
+        step = self._alter_step(
+            MigrationStage.MODIFY_COLUMNS, table_name,
+            f"MODIFY COLUMN {self._column_definition(source_col)}", description, ddl
+        )
+        
+        # Check for potential data loss
+        if self._is_lossy_column_change(dest_col, source_col):
+            step.warnings.append(Warning(
+                level=WarningLevel.WARNING,
+                message=f"Changing column '{source_col.name}' from {dest_col.data_type} "
+                       f"to {source_col.data_type} may cause data loss.",
+                context=f"Table: {table_name}"
+            ))
+        
+        # Check for nullable to not-nullable change; fill in the NULLs first if possible
+        key = f"{table_name}.{source_col.name}"
+        value = None
+        if dest_col.is_nullable and not source_col.is_nullable and self._can_backfill(dest_table, source_col):
+            value = self.backfill.get(key) or source_col.default or self.implicit_default(source_col)
+        if value is not None:
+            backfill = self._generate_backfill(dest_table, source_col.name, value)
+            if key not in self.backfill and source_col.default is None:
+                backfill.warnings.append(Warning(
+                    level=WarningLevel.WARNING,
+                    message=f"NULLs in column '{source_col.name}' will be set to {value}, the "
+                           f"implicit default of {source_col.data_type}; use --backfill-value "
+                           f"{key}=... to choose the value.",
+                    context=f"Table: {table_name}"
+                ))
+        elif dest_col.is_nullable and not source_col.is_nullable:
+            step.warnings.append(Warning(
+                level=WarningLevel.WARNING,
+                message=f"Changing column '{source_col.name}' from NULL to NOT NULL "
+                       f"will fail if NULL values exist.",
+                context=f"Table: {table_name}"
+            ))
+        
+        self.migration_steps.append(step)
+
+    def _can_backfill(self, dest_table: Table, column: Column) -> bool:
+        """Check whether a column can be filled in chunks before it becomes NOT NULL."""
+        source_table = self.source.tables.get(dest_table.name)
+        return (self.backfill is not None and bool(dest_table.primary_key)
+                and source_table is not None and source_table.primary_key == dest_table.primary_key
+                and not any(word in column.extra.lower()
+                            for word in ('auto_increment', 'virtual generated', 'stored generated')))
+
+    def _generate_backfill(self, dest_table: Table, column_name: str, value: str) -> MigrationStep:
+        """
+        Generate step filling in a column's NULLs before it is made NOT NULL.
+        
+        The step's SQL is a single UPDATE, but it is executed in primary key
+        chunks of one transaction each (see PrimaryKeyChunker), so large
+        tables are not locked and the undo log stays small. It runs after
+        the column is added (as NULL) and before the step tightening it,
+        which is in the same stage but generated after it.
+        
+        Args:
+            dest_table: Destination table
+            column_name: Column to fill
+            value: SQL expression to fill in
+            
+        Returns:
+            The step (already added to the plan)
+        """
+        table_name = dest_table.name
+        step = MigrationStep(
+            stage=MigrationStage.MODIFY_COLUMNS,
+            sql=f"UPDATE `{table_name}` SET `{column_name}` = {value} WHERE `{column_name}` IS NULL;",
+            description=f"Fill in NULLs of column '{column_name}' in table '{table_name}'",
+            table=table_name,
+            backfill=Backfill(column=column_name, value=value, primary_key=list(dest_table.primary_key))
+        )
+        self.migration_steps.append(step)
+        return step
+
+    @staticmethod
+    def implicit_default(column: Column) -> Optional[str]:
+        """
+        Return the value MySQL uses for a NOT NULL column without a default.
+        
+        Args:
+            column: Column definition
+            
+        Returns:
+            SQL literal: 0 for numbers, '' for strings, the first member for
+            ENUM; None for other types (e.g. dates), which have no sensible one
+        """
+        data_type = column.data_type.strip().lower()
+        match = re.match(r'\w+', data_type)
+        base_type = match.group(0) if match else ''
+        if base_type in ('tinyint', 'smallint', 'mediumint', 'int', 'integer', 'bigint', 'decimal',
+                         'numeric', 'float', 'double', 'real', 'bit', 'bool', 'boolean'):
+            return "0"
+        if base_type in ('char', 'varchar', 'binary', 'varbinary', 'tinytext', 'text', 'mediumtext',
+                         'longtext', 'tinyblob', 'blob', 'mediumblob', 'longblob', 'set'):
+            return "''"
+        if base_type == 'enum':
+            match = re.match(r'enum\s*\((.*)\)', column.data_type.strip(), re.I | re.S)
+            members = DumpParser._split_top_level(match.group(1)) if match else []
+            return members[0].strip() if members else None
+        return None
+
+    def _is_lossy_column_change(self, old_col: Column, new_col: Column) -> bool:
+        """
+        Check if a column type change might cause data loss.
+        
+        Args:
+            old_col: Current column definition
+            new_col: New column definition
+            
+        Returns:
+            True if the change might be lossy
+        """
+        # Extract base types and sizes
+        old_type = old_col.data_type.upper()
+        new_type = new_col.data_type.upper()
+        
+        # Check for VARCHAR/CHAR size reduction
+        varchar_pattern = r'(VAR)?CHAR\((\d+)\)'
+        old_match = re.match(varchar_pattern, old_type)
+        new_match = re.match(varchar_pattern, new_type)
+        
+        if old_match and new_match:
+            old_size = int(old_match.group(2))
+            new_size = int(new_match.group(2))
+            if new_size < old_size:
+                return True
+        
+        # Check for numeric precision reduction
+        decimal_pattern = r'DECIMAL\((\d+),(\d+)\)'
+        old_match = re.match(decimal_pattern, old_type)
+        new_match = re.match(decimal_pattern, new_type)
+        
+        if old_match and new_match:
+            old_precision = int(old_match.group(1))
+            new_precision = int(new_match.group(1))
+            if new_precision < old_precision:
+                return True
+        
+        # Check for type conversions that might lose data
+        lossy_conversions = {
+            'TEXT': ['VARCHAR', 'CHAR'],
+            'BIGINT': ['INT', 'MEDIUMINT', 'SMALLINT', 'TINYINT'],
+            'INT': ['MEDIUMINT', 'SMALLINT', 'TINYINT'],
+            'FLOAT': ['DECIMAL'],
+            'DOUBLE': ['FLOAT', 'DECIMAL'],
+        }
+        
+        for from_type, to_types in lossy_conversions.items():
+            if from_type in old_type:
+                for to_type in to_types:
+                    if to_type in new_type:
+                        return True
+        
+        return False
 
     def _compare_indexes(self, source_table: Table, dest_table: Table):
-        """Compare indexes between two tables."""
+        """
+        Compare indexes between two tables.
+        
+        Indexes are matched by definition (columns, uniqueness and type), so
+        an index that exists under another name is not rebuilt. In
+        destructive mode it is renamed where the server supports RENAME
+        INDEX and the new name is free; otherwise it keeps its current name,
+        unless another source index needs that name, in which case it is
+        dropped and re-added.
+        """
         source_indexes = {idx.name: idx for idx in source_table.indexes}
         dest_indexes = {idx.name: idx for idx in dest_table.indexes}
         
-        source_idx_names = set(source_indexes.keys())
-        dest_idx_names = set(dest_indexes.keys())
+        def definitions(indexes: Dict[str, Index]) -> Dict[str, Any]:
+            return {
+                name: (tuple(index.columns), index.is_unique, index.index_type.upper())
+                for name, index in indexes.items()
+            }
+        
+        matches = self._match_definitions(definitions(source_indexes), definitions(dest_indexes))
+        renames = {}
+        if self.destructive and self.online_ddl.supports(OnlineDDLClassifier.RENAME_INDEX_SYNTAX):
+            renames = {
+                dest_name: source_name for source_name, dest_name in matches.items()
+                if source_name != dest_name and source_name not in dest_indexes
+            }
+        # An index kept under a name another source index is added with
+        # would make that ADD INDEX fail
+        matches = {
+            source_name: dest_name for source_name, dest_name in matches.items()
+            if source_name == dest_name or dest_name not in source_indexes or dest_name in renames
+        }
+        matched_dest = set(matches.values())
+        
+        # Indexes to drop (or to recreate with a new definition)
+        for idx_name in dest_indexes.keys() - matched_dest:
+            recreate = idx_name in source_indexes and idx_name not in matches
+            if recreate or self.destructive:
+                self.migration_steps.append(self._alter_step(
+                    MigrationStage.DROP_INDEXES, source_table.name, f"DROP INDEX `{idx_name}`",
+                    f"Drop index '{idx_name}' from table '{source_table.name}'"
+                    + (" (will be recreated)" if recreate else ""),
+                    self.online_ddl.drop_index(dest_table)
+                ))
+        
+        for old_name, new_name in renames.items():
+            self.migration_steps.append(self._alter_step(
+                MigrationStage.DROP_INDEXES, source_table.name, f"RENAME INDEX `{old_name}` TO `{new_name}`",
+                f"Rename index '{old_name}' to '{new_name}' on table '{source_table.name}'",
+                self.online_ddl.rename_index(dest_table)
+            ))
+        
+        # Indexes to create
+        for idx_name in source_indexes.keys() - matches.keys():
+            source_idx = source_indexes[idx_name]
+            idx_cols = ", ".join(f"`{col}`" for col in source_idx.columns)
+            unique = "UNIQUE " if source_idx.is_unique else ""
+            
+            self.migration_steps.append(self._alter_step(
+                MigrationStage.CREATE_INDEXES, source_table.name,
+                f"ADD {unique}INDEX `{idx_name}` ({idx_cols}) USING {source_idx.index_type}",
+                f"Create index '{idx_name}' on table '{source_table.name}'",
+                self.online_ddl.add_index(dest_table, source_idx)
+            ))
+
+    def _compare_foreign_keys(self, source_table: Table, dest_table: Table):
+        """
+        Compare foreign keys between two tables.
+        
+        Foreign keys are matched by definition (ForeignKey equality ignores
+        the name). MySQL cannot rename a foreign key, and dropping and
+        re-adding one copies and validates the whole table, so a foreign key
+        that exists under another name is left as it is, unless another
+        source foreign key needs that name, in which case it is dropped and
+        re-added.
+        """
+        source_fks = {fk.name: fk for fk in source_table.foreign_keys}
+        dest_fks = {fk.name: fk for fk in dest_table.foreign_keys}
+        
+        def definitions(fks: Dict[str, ForeignKey]) -> Dict[str, Any]:
+            return {
+                name: (tuple(fk.columns), fk.referenced_table, tuple(fk.referenced_columns),
+                       fk.on_delete, fk.on_update)
+                for name, fk in fks.items()
+            }
+        
+        matches = self._match_definitions(definitions(source_fks), definitions(dest_fks))
+        matches = {
+            source_name: dest_name for source_name, dest_name in matches.items()
+            if source_name == dest_name or dest_name not in source_fks
+        }
+        matched_dest = set(matches.values())
+        
+        # Foreign keys to drop (or to recreate with a new definition)
+        for fk_name in dest_fks.keys() - matched_dest:
+            recreate = fk_name in source_fks and fk_name not in matches
+            if recreate or self.destructive:
+                self.migration_steps.append(self._alter_step(
+                    MigrationStage.DROP_FOREIGN_KEYS, source_table.name, f"DROP FOREIGN KEY `{fk_name}`",
+                    f"Drop foreign key '{fk_name}' from table '{source_table.name}'"
+                    + (" (will be recreated)" if recreate else ""),
+                    self.online_ddl.drop_foreign_key(dest_table)
+                ))
+        
+        # Foreign keys to create
+        for fk_name in source_fks.keys() - matches.keys():
+            source_fk = source_fks[fk_name]
+            fk_cols = ", ".join(f"`{col}`" for col in source_fk.columns)
+            ref_cols = ", ".join(f"`{col}`" for col in source_fk.referenced_columns)
+            
+            self.migration_steps.append(self._alter_step(
+                MigrationStage.CREATE_FOREIGN_KEYS, source_table.name,
+                f"ADD CONSTRAINT `{fk_name}` FOREIGN KEY ({fk_cols}) "
+                f"REFERENCES `{source_fk.referenced_table}` ({ref_cols}) "
+                f"ON DELETE {source_fk.on_delete} ON UPDATE {source_fk.on_update}",
+                f"Create foreign key '{fk_name}' on table '{source_table.name}'",
+                self.online_ddl.add_foreign_key(dest_table)
+            ))
+
+    def _compare_table_options(self, source_table: Table, dest_table: Table):
+        """Compare and update table-level options like engine, charset, etc."""
+        changes = []
+        
+        if source_table.engine != dest_table.engine:
+            changes.append(f"ENGINE={source_table.engine}")
+        
+        if source_table.charset and source_table.charset != dest_table.charset:
+            changes.append(f"DEFAULT CHARSET={source_table.charset}")
+        
+        if source_table.collation and source_table.collation != dest_table.collation:
+            changes.append(f"COLLATE={source_table.collation}")
+        
+        if source_table.comment != dest_table.comment:
+            changes.append(f"COMMENT='{source_table.comment}'")
+        
+        if changes:
+            self.migration_steps.append(self._alter_step(
+                MigrationStage.MODIFY_COLUMNS, source_table.name, ' '.join(changes),
+                f"Update table options for '{source_table.name}'",
+                self.online_ddl.table_options(source_table, dest_table)
+            ))
+
+    def normalize_definition(self, definition: str) -> str:
+        """
+        Normalise a view, routine or trigger definition for comparison.
+        
+        The server rewrites definitions when it stores them, so the same
+        object can read differently depending on how it was created and
+        extracted. DEFINER, ALGORITHM and SQL SECURITY clauses are removed
+        from the header of a CREATE statement (view options are compared
+        separately). Outside string literals, qualification with either
+        schema's name and backticks are removed and whitespace is collapsed
+        (and dropped around punctuation). Letter case is kept, as
+        identifiers can be case-sensitive, and so are string literals.
+        
+        Args:
+            definition: Definition or CREATE statement
+            
+        Returns:
+            Normalised text
+        """
+        schema_names = {name for name in (self.source.database_name, self.destination.database_name) if name}
+        qualifiers = [
+            re.compile(rf'(?:`{re.escape(name)}`|(?<![\w$`]){re.escape(name)}(?![\w$`]))\s*\.\s*')
+            for name in schema_names
+        ]
+        definition = definition.strip().rstrip(';')
+        header = self.CREATE_HEADER_PATTERN.match(definition)
+        if header:
+            definition = "CREATE " + definition[header.end():]
+        parts = re.split(r"""('(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*")""", definition)
+        for i in range(0, len(parts), 2):
+            text = parts[i]
+            for qualifier in qualifiers:
+                text = qualifier.sub('', text)
+            text = re.sub(r'\s+', ' ', text.replace('`', ''))
+            parts[i] = re.sub(r' ?([(),;=<>+*/.-]) ?', r'\1', text)
+        return ''.join(parts).strip()
+
+    def _same_definition(self, source_definition: str, dest_definition: str) -> bool:
+        """Check whether two view, routine or trigger definitions are equivalent."""
+        return self.normalize_definition(source_definition) == self.normalize_definition(dest_definition)
+
+    def _compare_views(self):
+        """Compare views between source and destination schemas."""
+        source_views = set(self.source.views.keys())
+        dest_views = set(self.destination.views.keys())
+        
+        # Views to drop
+        if self.destructive:
+            for view_name in dest_views - source_views:
+                self.migration_steps.append(MigrationStep(
+                    stage=MigrationStage.DROP_VIEWS,
+                    sql=f"DROP VIEW IF EXISTS `{view_name}`;",
+                    description=f"Drop view '{view_name}'",
+                    object_type='VIEW',
+                    object_name=view_name
+                ))
+        
+        # Views to create or replace (unchanged views are left alone)
+        for view_name in source_views:
+            view = self.source.views[view_name]
+            dest_view = self.destination.views.get(view_name)
+            check_option = (view.check_option or 'NONE').upper()
+            security_type = (view.security_type or 'DEFINER').upper()
+            if (dest_view is not None
+                    and check_option == (dest_view.check_option or 'NONE').upper()
+                    and security_type == (dest_view.security_type or 'DEFINER').upper()
+                    and self._same_definition(view.definition, dest_view.definition)):
+                continue
+            
+            security = " SQL SECURITY INVOKER" if security_type == 'INVOKER' else ""
+            check = f" WITH {check_option} CHECK OPTION" if check_option != 'NONE' else ""
+            self.migration_steps.append(MigrationStep(
+                stage=MigrationStage.CREATE_VIEWS,
+                sql=f"CREATE OR REPLACE{security} VIEW `{view_name}` AS {view.definition}{check};",
+                description=f"Create or replace view '{view_name}'",
+                object_type='VIEW',
+                object_name=view_name
+            ))
+
+    def _compare_procedures(self):
+        """Compare stored procedures between source and destination schemas."""
+        source_procs = set(self.source.procedures.keys())
+        dest_procs = set(self.destination.procedures.keys())
+        
+        # Procedures to create or replace (unchanged routines are left alone)
+        for proc_name in source_procs:
+            proc = self.source.procedures[proc_name]
+            dest_proc = self.destination.procedures.get(proc_name)
+            if (dest_proc is not None and proc.type == dest_proc.type
+                    and self._same_definition(proc.definition, dest_proc.definition)):
+                continue
+            
+            # Drop if it exists in destination and we're updating it
+            if proc_name in dest_procs:
+                self.migration_steps.append(MigrationStep(
+                    stage=MigrationStage.CREATE_PROCEDURES,
+                    sql=f"DROP {proc.type} IF EXISTS `{proc_name}`;",
+                    description=f"Drop {proc.type.lower()} '{proc_name}' (will be recreated)",
+                    object_type=proc.type,
+                    object_name=proc_name
+                ))
+            
+            # Create the procedure/function
+            self.migration_steps.append(MigrationStep(
+                stage=MigrationStage.CREATE_PROCEDURES,
+                sql=proc.definition + ";",
+                description=f"Create {proc.type.lower()} '{proc_name}'",
+                object_type=proc.type,
+                object_name=proc_name
+            ))
+
+    def _compare_triggers(self):
+        """Compare triggers between source and destination schemas."""
+        source_triggers = set(self.source.triggers.keys())
+        dest_triggers = set(self.destination.triggers.keys())
+        
+        # Triggers to drop
+        if self.destructive:
+            for trigger_name in dest_triggers - source_triggers:
+                self.migration_steps.append(MigrationStep(
+                    stage=MigrationStage.DROP_TRIGGERS,
+                    sql=f"DROP TRIGGER IF EXISTS `{trigger_name}`;",
+                    description=f"Drop trigger '{trigger_name}'",
+                    object_type='TRIGGER',
+                    object_name=trigger_name
+                ))
+        
+        # Triggers to create or replace (unchanged triggers are left alone)
+        for trigger_name in source_triggers:
+            trigger = self.source.triggers[trigger_name]
+            dest_trigger = self.destination.triggers.get(trigger_name)
+            if (dest_trigger is not None
+                    and (trigger.table, trigger.timing.upper(), trigger.event.upper())
+                    == (dest_trigger.table, dest_trigger.timing.upper(), dest_trigger.event.upper())
+                    and self._same_definition(trigger.definition, dest_trigger.definition)):
+                continue
+            
+            # Drop if it exists (MySQL doesn't support CREATE OR REPLACE for triggers)
+            if trigger_name in dest_triggers:
+                self.migration_steps.append(MigrationStep(
+                    stage=MigrationStage.DROP_TRIGGERS,
+                    sql=f"DROP TRIGGER IF EXISTS `{trigger_name}`;",
+                    description=f"Drop trigger '{trigger_name}' (will be recreated)",
+                    object_type='TRIGGER',
+                    object_name=trigger_name
+                ))
+            
+            # Create the trigger
+            create_sql = (
+                f"CREATE TRIGGER `{trigger_name}` {trigger.timing} {trigger.event} "
+                f"ON `{trigger.table}` FOR EACH ROW {trigger.definition};"
+            )
+            
+            self.migration_steps.append(MigrationStep(
+                stage=MigrationStage.CREATE_TRIGGERS,
+                sql=create_sql,
+                description=f"Create trigger '{trigger_name}'",
+                object_type='TRIGGER',
+                object_name=trigger_name
+            ))
+
+
+# ============================================================================
+# JSON SCHEMA SERIALIZATION
+# ============================================================================
+
+class SchemaSerializer:
+    """
+    Handles serialization and deserialization of Schema objects to/from JSON.
+    """
+
+    @staticmethod
+    def schema_to_dict(schema: Schema, include_digests: bool = False) -> Dict[str, Any]:
+        """
+        Convert a Schema object to a JSON-compatible dictionary.
+        
+        Args:
+            schema: Schema to convert
+            include_digests: Whether to store each table's structural digest
+            
+        Returns:
+            Dictionary representation of the schema
+        """
+        def convert_to_dict(obj):
+            """Recursively convert dataclass objects to dictionaries."""
+            if hasattr(obj, '__dataclass_fields__'):
+                return {
+                    key: convert_to_dict(value)
+                    for key, value in asdict(obj).items()
+                }
+            elif isinstance(obj, dict):
+                return {key: convert_to_dict(value) for key, value in obj.items()}
+            elif isinstance(obj, list):
+                return [convert_to_dict(item) for item in obj]
+            else:
+                return obj
+        
+        result = convert_to_dict(schema)
+        for table_name, table_data in result.get('tables', {}).items():
+            if include_digests:
+                table_data['digest'] = SchemaComparator.table_digest(schema.tables[table_name])
+            else:
+                del table_data['digest']
+            if table_data['stats'] is None:
+                del table_data['stats']
+        if not (schema.renames.tables or schema.renames.columns):
+            del result['renames']
+        return result
+
+    @staticmethod
+    def schema_to_json(schema: Schema, include_digests: bool = False) -> str:
+        """
+        Convert a Schema object to JSON string.
+        
+        Args:
+            schema: Schema to serialize
+            include_digests: Whether to store each table's structural digest
+            
+        Returns:
+            JSON string representation
+        """
+        return json.dumps(SchemaSerializer.schema_to_dict(schema, include_digests), indent=2)
+
+    @staticmethod
+    def table_to_dict(table: Table) -> Dict[str, Any]:
+        """
+        Convert a Table object to a JSON-compatible dictionary.
+        
+        Args:
+            table: Table to convert
+            
+        Returns:
+            Dictionary representation of the table
+        """
+        return asdict(table)
+
+    @staticmethod
+    def dict_to_table(table_name: str, table_data: Dict[str, Any]) -> Table:
+        """
+        Convert a dictionary (as produced by table_to_dict) to a Table object.
+        
+        Args:
+            table_name: Name of the table
+            table_data: Dictionary representation of the table
+            
+        Returns:
+            Table object
+        """
+        table = Table(name=table_name)
+        
+        # Deserialize columns
+        table.columns = [
+            Column(**col_data) for col_data in table_data.get('columns', [])
+        ]
+        
+        # Deserialize other table properties
+        table.primary_key = table_data.get('primary_key', [])
+        table.engine = table_data.get('engine', 'InnoDB')
+        table.charset = table_data.get('charset')
+        table.collation = table_data.get('collation')
+        table.comment = table_data.get('comment', '')
+        if table_data.get('stats'):
+            table.stats = TableStats(**table_data['stats'])
+        
+        # Deserialize indexes
+        table.indexes = [
+            Index(**idx_data) for idx_data in table_data.get('indexes', [])
+        ]
+        
+        # Deserialize foreign keys
+        table.foreign_keys = [
+            ForeignKey(**fk_data) for fk_data in table_data.get('foreign_keys', [])
+        ]
+        
+        # A stored digest is only a check: one that no longer matches the
+        # structure (e.g. after a hand edit) would hide the changes
+        stored_digest = table_data.get('digest')
+        if stored_digest and SchemaComparator.table_digest(table) != stored_digest:
+            print(f"Warning: stored digest of table '{table_name}' does not match its definition; "
+                  f"ignoring it.", file=sys.stderr)
+        
+        return table
+
+    @staticmethod
+    def json_to_schema(json_str: str, schema_filter: Optional[SchemaFilter] = None) -> Schema:
+        """
+        Convert JSON string to Schema object.
+        
+        Args:
+            json_str: JSON string to deserialize
+            schema_filter: Only load objects whose names match this filter
+            
+        Returns:
+            Schema object
+        """
+        data = json.loads(json_str)
+        schema = Schema(
+            database_name=data.get('database_name', ''),
+            server_version=data.get('server_version'),
+            renames=RenameHints(**data.get('renames', {}))
+        )
+        schema_filter = schema_filter or SchemaFilter()
+        
+        # Deserialize tables
+        for table_name, table_data in data.get('tables', {}).items():
+            if schema_filter.tables.matches(table_name):
+                schema.tables[table_name] = SchemaSerializer.dict_to_table(table_name, table_data)
+        
+        # Deserialize views
+        for view_name, view_data in data.get('views', {}).items():
+            if schema_filter.views.matches(view_name):
+                schema.views[view_name] = View(**view_data)
+        
+        # Deserialize procedures
+        for proc_name, proc_data in data.get('procedures', {}).items():
+            if schema_filter.procedures.matches(proc_name):
+                schema.procedures[proc_name] = StoredProcedure(**proc_data)
+        
+        # Deserialize triggers
+        for trigger_name, trigger_data in data.get('triggers', {}).items():
+            if schema_filter.includes_trigger(trigger_name, trigger_data.get('table', '')):
+                schema.triggers[trigger_name] = Trigger(**trigger_data)
+        
+        return schema
+
+
+# ============================================================================
+# SCHEMA EXTRACTION CACHE
+# ============================================================================
+
+class SchemaCache:
+    """
+    Persistent on-disk cache of extracted tables.
+    
+    One JSON file is kept per host/port/database, holding each Table together
+    with the fingerprint it had when it was extracted. Entries are reused only
+    while the table's current fingerprint matches, and cache files are evicted
+    by age and by total size.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, directory: Optional[str] = None, max_age: Optional[float] = None,
+                 max_size: Optional[int] = None, refresh: bool = False):
+        """
+        Initialize the cache.
+        
+        Args:
+            directory: Cache directory (default: $XDG_CACHE_HOME/myrug or ~/.cache/myrug)
+            max_age: Maximum age of entries and cache files in seconds (None for no limit)
+            max_size: Maximum total size of the cache directory in bytes (None for no limit)
+            refresh: Ignore existing entries (they are rewritten after extraction)
+        """
+        self.directory = directory or self.default_directory()
+        self.max_age = max_age
+        self.max_size = max_size
+        self.refresh = refresh
+
+    @staticmethod
+    def default_directory() -> str:
+        """Return the default cache directory."""
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        return os.path.join(base, 'myrug')
+
+    def _path(self, host: str, port: int, database: str) -> str:
+        """Return the cache file path for a database."""
+        key = f"{host}:{port}/{database}"
+        safe = re.sub(r'[^A-Za-z0-9._-]', '_', f"{host}_{port}_{database}")
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]
+        return os.path.join(self.directory, f"{safe}-{digest}.json")
+
+    def load(self, host: str, port: int, database: str) -> Dict[str, Tuple[str, Table]]:
+        """
+        Load cached tables for a database.
+        
+        Args:
+            host: Database host
+            port: Database port
+            database: Database name
+            
+        Returns:
+            Dictionary mapping table names to (fingerprint, Table) tuples
+        """
+        if self.refresh:
+            return {}
+        
+        try:
+            with open(self._path(host, port, database), 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        
+        if data.get('version') != self.FORMAT_VERSION:
+            return {}
+        
+        now = time.time()
+        entries = {}
+        for name, entry in data.get('tables', {}).items():
+            if self.max_age is not None and now - entry.get('cached_at', 0) > self.max_age:
+                continue
+            entries[name] = (
+                entry['fingerprint'],
+                SchemaSerializer.dict_to_table(name, entry['table'])
+            )
+        
+        return entries
+
+    def store(self, host: str, port: int, database: str, entries: Dict[str, Tuple[str, Table]]):
+        """
+        Replace the cached tables for a database and evict old cache files.
+        
+        Tables no longer present in entries are dropped from the cache. Entries
+        whose fingerprint is unchanged keep their original timestamp so that
+        max_age bounds how long any table goes without being re-read.
+        
+        Args:
+            host: Database host
+            port: Database port
+            database: Database name
+            entries: Dictionary mapping table names to (fingerprint, Table) tuples
+        """
+        path = self._path(host, port, database)
+        
+        previous = {}
+        if not self.refresh:
+            try:
+                with open(path, 'r') as f:
+                    previous = json.load(f).get('tables', {})
+            except (OSError, ValueError):
+                previous = {}
         
-        # Indexes to drop
-        if self.destructive:
-            for idx_name in dest_idx_names - source_idx_names:
-                self.migration_steps.append(MigrationStep(
-                    stage=MigrationStage.DROP_INDEXES,
-                    sql=f"ALTER TABLE `{source_table.name}` DROP INDEX `{idx_name}`;",
-                    description=f"Drop index '{idx_name}' from table '{source_table.name}'"
-                ))
+        now = time.time()
+        tables = {}
+        for name, (fingerprint, table) in entries.items():
+            cached_at = now
+            if name in previous and previous[name].get('fingerprint') == fingerprint:
+                cached_at = previous[name].get('cached_at', now)
+            tables[name] = {
+                'fingerprint': fingerprint,
+                'cached_at': cached_at,
+                # Statistics change constantly, so they are re-read rather than cached
+                'table': {**SchemaSerializer.table_to_dict(table), 'stats': None}
+            }
         
-        # Indexes to create or modify
-        for idx_name in source_idx_names:
-            source_idx = source_indexes[idx_name]
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'version': self.FORMAT_VERSION, 'tables': tables}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: could not write schema cache: {e}", file=sys.stderr)
+            return
+        
+        self.evict()
+
+    def evict(self):
+        """Remove cache files older than max_age, then the oldest files until under max_size."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        
+        now = time.time()
+        files = []
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if self.max_age is not None and now - stat.st_mtime > self.max_age:
+                self._remove(path)
+            else:
+                files.append((stat.st_mtime, stat.st_size, path))
+        
+        if self.max_size is not None:
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.max_size:
+                    break
+                self._remove(path)
+                total -= size
+
+    def clear(self):
+        """Remove every cache file."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith('.json'):
+                self._remove(os.path.join(self.directory, name))
+
+    @staticmethod
+    def _remove(path: str):
+        """Remove a file, ignoring errors."""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# ============================================================================
+# MIGRATION JOURNAL
+# ============================================================================
+
+class MigrationJournal:
+    """
+    Append-only record of a migration's execution, used to resume it.
+    
+    The journal is a JSON Lines file. Executing a plan first appends a
+    "plan" record with every step (including a fingerprint of its SQL) and
+    the structural digest of each table the plan changes, as they were
+    before the first step. Each step then gets a "start" record and a
+    "finish" record with its outcome; for a completed step that changes a
+    table, the finish record also holds the table's digest afterwards.
+    Every record is flushed to disk before the migration continues, so
+    after a crash the journal shows which steps completed. A truncated last
+    line (from a crash while writing it) is ignored.
+    
+    On resume, the latest plan of each database is continued from its
+    first incomplete step, provided every table the remaining steps change
+    still has the digest the journal expects.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the journal.
+        
+        Args:
+            path: Journal file (created when the first record is written)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def step_fingerprint(step: MigrationStep) -> str:
+        """Return the fingerprint of a step's SQL."""
+        return hashlib.sha256(step.sql.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def table_digests(db: DatabaseConnection, table_names: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Read the current structural digests of tables.
+        
+        Args:
+            db: Open destination connection
+            table_names: Tables to read
             
-            # If index doesn't exist in destination or is different, create it
-            if idx_name not in dest_indexes or source_idx != dest_indexes[idx_name]:
-                # Drop the old index if it exists and is different
-                if idx_name in dest_indexes:
-                    self.migration_steps.append(MigrationStep(
-                        stage=MigrationStage.DROP_INDEXES,
-                        sql=f"ALTER TABLE `{source_table.name}` DROP INDEX `{idx_name}`;",
-                        description=f"Drop index '{idx_name}' from table '{source_table.name}' (will be recreated)"
-                    ))
-                
-                # Create the new index
-                idx_cols = ", ".join(f"`{col}`" for col in source_idx.columns)
-                unique = "UNIQUE " if source_idx.is_unique else ""
-                
-                self.migration_steps.append(MigrationStep(
-                    stage=MigrationStage.CREATE_INDEXES,
-                    sql=f"ALTER TABLE `{source_table.name}` ADD {unique}INDEX `{idx_name}` ({idx_cols}) USING {source_idx.index_type};",
-                    description=f"Create index '{idx_name}' on table '{source_table.name}'"
-                ))
+        Returns:
+            Dictionary of table name -> digest, or None for missing tables
+        """
+        table_names = sorted(set(table_names))
+        tables = db.extract_tables(table_names) if table_names else {}
+        return {
+            name: SchemaComparator.table_digest(tables[name]) if name in tables else None
+            for name in table_names
+        }
 
-    def _compare_foreign_keys(self, source_table: Table, dest_table: Table):
-        """Compare foreign keys between two tables."""
-        source_fks = {fk.name: fk for fk in source_table.foreign_keys}
-        dest_fks = {fk.name: fk for fk in dest_table.foreign_keys}
+    def _append(self, record: Dict[str, Any]):
+        """Append a record and flush it to disk."""
+        record['time'] = time.time()
+        line = json.dumps(record, separators=(',', ':')) + "\n"
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def begin(self, conn_params: Dict[str, Any], migration_steps: List[MigrationStep]):
+        """
+        Record a plan before executing it.
         
-        source_fk_names = set(source_fks.keys())
-        dest_fk_names = set(dest_fks.keys())
+        Args:
+            conn_params: Destination connection parameters
+            migration_steps: Steps in execution order
+        """
+        with DatabaseConnection(**conn_params) as db:
+            digests = self.table_digests(db, (step.table for step in migration_steps if step.table))
+        self._append({
+            'event': 'plan',
+            'database': conn_params['database'],
+            'steps': [
+                {
+                    'id': step.step_id,
+                    'fingerprint': self.step_fingerprint(step),
+                    'stage': step.stage.name,
+                    'description': step.description,
+                    'sql': step.sql,
+                    'table': step.table,
+                    'depends_on': step.depends_on,
+                    'shadow_table': (SchemaSerializer.table_to_dict(step.shadow_table)
+                                     if step.shadow_table is not None else None),
+                    'backfill': asdict(step.backfill) if step.backfill is not None else None,
+                }
+                for step in migration_steps
+            ],
+            'preconditions': digests
+        })
+
+    def start(self, database: str, step: MigrationStep):
+        """Record that a step is starting."""
+        self._append({
+            'event': 'start',
+            'database': database,
+            'step': step.step_id,
+            'fingerprint': self.step_fingerprint(step)
+        })
+
+    def finish(self, database: str, step: MigrationStep, db: DatabaseConnection,
+               error: Optional[str] = None):
+        """
+        Record the outcome of a step.
         
-        # Foreign keys to drop
-        if self.destructive:
-            for fk_name in dest_fk_names - source_fk_names:
-                self.migration_steps.append(MigrationStep(
-                    stage=MigrationStage.DROP_FOREIGN_KEYS,
-                    sql=f"ALTER TABLE `{source_table.name}` DROP FOREIGN KEY `{fk_name}`;",
-                    description=f"Drop foreign key '{fk_name}' from table '{source_table.name}'"
-                ))
+        Args:
+            database: Destination database
+            step: Step that finished
+            db: Connection the step ran on, used to read the table's new digest
+            error: Error message if the step failed
+        """
+        record = {
+            'event': 'finish',
+            'database': database,
+            'step': step.step_id,
+            'fingerprint': self.step_fingerprint(step),
+            'outcome': 'failed' if error else 'done'
+        }
+        if error:
+            record['error'] = error
+        elif step.table:
+            record['table'] = step.table
+            record['digest'] = self.table_digests(db, [step.table])[step.table]
+        self._append(record)
+
+    def _read(self) -> List[Dict[str, Any]]:
+        """Read every complete record of the journal."""
+        with open(self.path, 'r') as f:
+            lines = [line for line in f.read().split("\n") if line.strip()]
+        records = []
+        for number, line in enumerate(lines, 1):
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                if number < len(lines):
+                    raise ValueError(f"line {number} of the journal is corrupt")
+        return records
+
+    def load(self) -> Dict[str, Tuple[List[MigrationStep], Dict[str, Optional[str]]]]:
+        """
+        Load the incomplete part of the latest plan of each database.
         
-        # Foreign keys to create or modify
-        for fk_name in source_fk_names:
-            source_fk = source_fks[fk_name]
+        Returns:
+            Dictionary of database -> (remaining steps in execution order,
+            expected digest of each table they change), for databases with
+            steps left to run
             
-            # If FK doesn't exist in destination or is different, create it
-            if fk_name not in dest_fks or source_fk != dest_fks[fk_name]:
-                # Drop the old FK if it exists and is different
-                if fk_name in dest_fks:
-                    self.migration_steps.append(MigrationStep(
-                        stage=MigrationStage.DROP_FOREIGN_KEYS,
-                        sql=f"ALTER TABLE `{source_table.name}` DROP FOREIGN KEY `{fk_name}`;",
-                        description=f"Drop foreign key '{fk_name}' from table '{source_table.name}' (will be recreated)"
-                    ))
-                
-                # Create the new FK
-                fk_cols = ", ".join(f"`{col}`" for col in source_fk.columns)
-                ref_cols = ", ".join(f"`{col}`" for col in source_fk.referenced_columns)
-                
-                self.migration_steps.append(MigrationStep(
-                    stage=MigrationStage.CREATE_FOREIGN_KEYS,
-                    sql=f"ALTER TABLE `{source_table.name}` ADD CONSTRAINT `{fk_name}` "
-                        f"FOREIGN KEY ({fk_cols}) REFERENCES `{source_fk.referenced_table}` ({ref_cols}) "
-                        f"ON DELETE {source_fk.on_delete} ON UPDATE {source_fk.on_update};",
-                    description=f"Create foreign key '{fk_name}' on table '{source_table.name}'"
-                ))
+        Raises:
+            OSError: If the journal cannot be read
+            ValueError: If the journal is corrupt
+        """
+        plans: Dict[str, Dict[str, Any]] = {}
+        for record in self._read():
+            database = record.get('database')
+            if record.get('event') == 'plan':
+                plans[database] = {
+                    'steps': record['steps'],
+                    'done': set(),
+                    'digests': dict(record['preconditions'])
+                }
+            elif record.get('event') == 'finish' and record.get('outcome') == 'done' and database in plans:
+                plan = plans[database]
+                step = next((step for step in plan['steps'] if step['id'] == record['step']), None)
+                if step is None or step['fingerprint'] != record['fingerprint']:
+                    raise ValueError(f"step {record['step']} of '{database}' does not match its plan")
+                plan['done'].add(step['id'])
+                if 'table' in record:
+                    plan['digests'][record['table']] = record['digest']
+        
+        result = {}
+        for database, plan in plans.items():
+            remaining = [
+                MigrationStep(
+                    stage=MigrationStage[step['stage']],
+                    sql=step['sql'],
+                    description=step['description'],
+                    table=step['table'],
+                    step_id=step['id'],
+                    depends_on=[step_id for step_id in step['depends_on'] if step_id not in plan['done']],
+                    shadow_table=(SchemaSerializer.dict_to_table(step['table'], step['shadow_table'])
+                                  if step.get('shadow_table') else None),
+                    backfill=Backfill(**step['backfill']) if step.get('backfill') else None
+                )
+                for step in plan['steps'] if step['id'] not in plan['done']
+            ]
+            if remaining:
+                expected = {step.table: plan['digests'].get(step.table) for step in remaining if step.table}
+                result[database] = (remaining, expected)
+        return result
 
-    def _compare_table_options(self, source_table: Table, dest_table: Table):
-        """Compare and update table-level options like engine, charset, etc."""
-        changes = []
+    def changed_tables(self, conn_params: Dict[str, Any], expected: Dict[str, Optional[str]]) -> List[str]:
+        """
+        Check the preconditions of resuming a plan.
         
-        if source_table.engine != dest_table.engine:
-            changes.append(f"ENGINE={source_table.engine}")
+        Args:
+            conn_params: Destination connection parameters
+            expected: Expected digest of each table (None if it should not exist)
+            
+        Returns:
+            Names of the tables whose current structure differs
+        """
+        with DatabaseConnection(**conn_params) as db:
+            current = self.table_digests(db, expected)
+        return [name for name in sorted(expected) if current[name] != expected[name]]
+
+
+# ============================================================================
+# EXECUTION THROTTLING
+# ============================================================================
+
+class ExecutionThrottle:
+    """
+    Holds back migration steps while the destination server is under load.
+    
+    Before each step, the enabled health checks are polled. A check is
+    enabled by giving it a threshold:
+    
+    - Threads_running on the destination
+    - Replication lag (Seconds_Behind_Source) of each replica given; a
+      replica whose replication is not running counts as lagging
+    - InnoDB history list length on the destination
+    - A user-supplied SQL probe on the destination, returning one number
+    
+    While any threshold is exceeded no new step is started, and the checks
+    are polled again every interval until the server has recovered. Steps
+    already running are not interrupted. The checks may be polled from
+    several threads; they run one at a time. A check that fails for lack of
+    privileges, or because the server does not support it, is reported
+    once and then ignored. Other failures (e.g. a lost connection) count
+    as exceeding the threshold: the connection is re-opened and the check
+    polled again after the interval.
+    """
+
+    HISTORY_LENGTH_QUERY = (
+        "SELECT COUNT, STATUS FROM INFORMATION_SCHEMA.INNODB_METRICS WHERE NAME = 'trx_rseg_history_len'"
+    )
+    
+    # Errors meaning a check can never be read: access denied (1044, 1142,
+    # 1143, 1227), unknown table or column (1054, 1109, 1146), syntax (1064),
+    # unsupported (1235) or a disabled feature (3167)
+    UNAVAILABLE_ERRORS = {1044, 1054, 1064, 1109, 1142, 1143, 1146, 1227, 1235, 3167}
+
+    def __init__(self, conn_params: Dict[str, Any], replicas: Optional[List[Dict[str, Any]]] = None,
+                 max_threads_running: Optional[int] = None, max_replica_lag: Optional[float] = None,
+                 max_history_length: Optional[int] = None, probe: Optional[str] = None,
+                 max_probe_value: float = 0, interval: float = 5.0):
+        """
+        Initialize the throttle.
         
-        if source_table.charset and source_table.charset != dest_table.charset:
-            changes.append(f"DEFAULT CHARSET={source_table.charset}")
+        Args:
+            conn_params: Destination connection parameters
+            replicas: Connection parameters of replicas to check the lag of
+            max_threads_running: Highest acceptable Threads_running
+            max_replica_lag: Highest acceptable replica lag in seconds
+            max_history_length: Highest acceptable InnoDB history list length
+            probe: SQL query returning a single number
+            max_probe_value: Highest acceptable probe result
+            interval: Seconds between polls while throttled
+        """
+        self.conn_params = conn_params
+        self.replicas = list(replicas or []) if max_replica_lag is not None else []
+        self.max_threads_running = max_threads_running
+        self.max_replica_lag = max_replica_lag
+        self.max_history_length = max_history_length
+        self.probe = probe
+        self.max_probe_value = max_probe_value
+        self.interval = interval
+        self._connections: Dict[str, DatabaseConnection] = {}
+        self._failed_checks: Set[str] = set()
+        self._stack: Optional[ExitStack] = None
+        # Chunked copies in --parallel workers poll the same connections
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any health check is enabled."""
+        return bool(self.max_threads_running is not None or self.replicas
+                    or self.max_history_length is not None or self.probe)
+
+    def __enter__(self):
+        """Open the monitoring connections."""
+        self._stack = ExitStack()
+        if not self.enabled:
+            return self
+        if self.max_threads_running is not None or self.max_history_length is not None or self.probe:
+            self._connections['destination'] = self._stack.enter_context(DatabaseConnection(**self.conn_params))
+        for replica in self.replicas:
+            name = f"{replica['host']}:{replica['port']}"
+            self._connections[name] = self._stack.enter_context(DatabaseConnection(**replica))
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Close the monitoring connections."""
+        self._stack.close()
+        self._connections = {}
+
+    @staticmethod
+    def threads_running(db: DatabaseConnection) -> int:
+        """Read the server's Threads_running status."""
+        rows = db.execute_query("SHOW GLOBAL STATUS LIKE 'Threads_running'")
+        return int(rows[0][1])
+
+    @staticmethod
+    def replica_lag(db: DatabaseConnection) -> Optional[float]:
+        """
+        Read a replica's lag behind its source.
         
-        if source_table.collation and source_table.collation != dest_table.collation:
-            changes.append(f"COLLATE={source_table.collation}")
+        Returns:
+            Seconds_Behind_Source (Seconds_Behind_Master before MySQL
+            8.0.22), or None if replication is not running or not configured
+        """
+        cursor = db.connection.cursor(dictionary=True)
+        try:
+            try:
+                cursor.execute("SHOW REPLICA STATUS")
+            except MySQLError as e:
+                if e.errno != 1064:
+                    raise
+                cursor.execute("SHOW SLAVE STATUS")
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+        lags = [row.get('Seconds_Behind_Source', row.get('Seconds_Behind_Master')) for row in rows]
+        if not lags or any(lag is None for lag in lags):
+            return None
+        return float(max(lags))
+
+    @classmethod
+    def history_length(cls, db: DatabaseConnection) -> int:
+        """
+        Read the InnoDB history list length (purge backlog).
         
-        if source_table.comment != dest_table.comment:
-            changes.append(f"COMMENT='{source_table.comment}'")
+        Uses the trx_rseg_history_len InnoDB metric if it is enabled, which
+        is cheaper than SHOW ENGINE INNODB STATUS (the fallback).
+        """
+        try:
+            rows = db.execute_query(cls.HISTORY_LENGTH_QUERY)
+            if rows and str(rows[0][1]).lower() == 'enabled':
+                return int(rows[0][0])
+        except MySQLError as e:
+            if e.errno not in cls.UNAVAILABLE_ERRORS:
+                raise
+        status = db.execute_query("SHOW ENGINE INNODB STATUS")[0][2]
+        match = re.search(r'History list length (\d+)', status)
+        if not match:
+            raise ValueError("history list length not found in SHOW ENGINE INNODB STATUS")
+        return int(match.group(1))
+
+    def _read(self, check: str, reasons: List[str], db: DatabaseConnection, reader):
+        """
+        Run one health check.
         
-        if changes:
-            sql = f"ALTER TABLE `{source_table.name}` {' '.join(changes)};"
-            self.migration_steps.append(MigrationStep(
-                stage=MigrationStage.MODIFY_COLUMNS,
-                sql=sql,
-                description=f"Update table options for '{source_table.name}'"
-            ))
+        Args:
+            check: Description of the check, e.g. 'Threads_running'
+            reasons: Throttling reasons, extended if the check failed
+                transiently
+            db: Connection the check reads from
+            reader: Callable reading the value from db
+            
+        Returns:
+            The value, or None if the check could not be read
+        """
+        if check in self._failed_checks:
+            return None
+        try:
+            return reader(db)
+        except MySQLError as e:
+            if e.errno not in self.UNAVAILABLE_ERRORS:
+                reasons.append(f"cannot read {check} ({e})")
+                try:
+                    db.connection.reconnect(attempts=1, delay=0)
+                except MySQLError:
+                    pass
+                return None
+            error = e
+        except (ValueError, TypeError, IndexError) as e:
+            error = e
+        self._failed_checks.add(check)
+        print(f"  Warning: cannot read {check} ({error}); no longer throttling on it.", file=sys.stderr)
+        return None
 
-    def _compare_views(self):
-        """Compare views between source and destination schemas."""
-        source_views = set(self.source.views.keys())
-        dest_views = set(self.destination.views.keys())
+    def check(self) -> List[str]:
+        """
+        Poll the health checks once.
         
-        # Views to drop
-        if self.destructive:
-            for view_name in dest_views - source_views:
-                self.migration_steps.append(MigrationStep(
-                    stage=MigrationStage.DROP_VIEWS,
-                    sql=f"DROP VIEW IF EXISTS `{view_name}`;",
-                    description=f"Drop view '{view_name}'"
-                ))
+        Returns:
+            Descriptions of the exceeded thresholds and of the checks that
+            could not be read this time (empty if healthy)
+        """
+        with self._lock:
+            return self._check()
+
+    def _check(self) -> List[str]:
+        """Poll the health checks once, holding the lock."""
+        reasons = []
+        destination = self._connections.get('destination')
+        if self.max_threads_running is not None:
+            value = self._read('Threads_running', reasons, destination, self.threads_running)
+            if value is not None and value > self.max_threads_running:
+                reasons.append(f"Threads_running {value} > {self.max_threads_running}")
+        
+        for replica in self.replicas:
+            name = f"{replica['host']}:{replica['port']}"
+            # Wrapped, as a lag of None means replication is not running
+            value = self._read(f"the lag of replica {name}", reasons, self._connections[name],
+                               lambda db: [self.replica_lag(db)])
+            if value is None:
+                continue
+            lag = value[0]
+            if lag is None:
+                reasons.append(f"replica {name} is not replicating")
+            elif lag > self.max_replica_lag:
+                reasons.append(f"replica {name} lag {lag:.0f}s > {self.max_replica_lag:g}s")
+        
+        if self.max_history_length is not None:
+            value = self._read('the InnoDB history list length', reasons, destination, self.history_length)
+            if value is not None and value > self.max_history_length:
+                reasons.append(f"history list length {value} > {self.max_history_length}")
+        
+        if self.probe:
+            value = self._read('the throttle probe', reasons, destination,
+                               lambda db: float(db.execute_query(self.probe)[0][0]))
+            if value is not None and value > self.max_probe_value:
+                reasons.append(f"probe {value:g} > {self.max_probe_value:g}")
+        return reasons
+
+    @classmethod
+    def from_args(cls, args, conn_params: Dict[str, Any]) -> 'ExecutionThrottle':
+        """
+        Create a throttle from the migrate command's throttling options.
         
-        # Views to create or replace
-        for view_name in source_views:
-            view = self.source.views[view_name]
-            
-            # Always use CREATE OR REPLACE for views
-            self.migration_steps.append(MigrationStep(
-                stage=MigrationStage.CREATE_VIEWS,
-                sql=f"CREATE OR REPLACE VIEW `{view_name}` AS {view.definition};",
-                description=f"Create or replace view '{view_name}'"
-            ))
+        Args:
+            args: Parsed command-line arguments
+            conn_params: Destination connection parameters
+        
+        Returns:
+            ExecutionThrottle object (disabled if no threshold was given)
+        """
+        if args.max_replica_lag is not None and not args.replica:
+            print("Error: --max-replica-lag needs at least one --replica to check.", file=sys.stderr)
+            sys.exit(1)
+        if args.throttle_interval <= 0:
+            print("Error: --throttle-interval must be positive.", file=sys.stderr)
+            sys.exit(1)
+        defaults = connection_defaults(args)
+        try:
+            replicas = [parse_connection_string(replica, defaults) for replica in args.replica or []]
+        except ValueError as e:
+            print(f"Error: invalid --replica: {e}", file=sys.stderr)
+            sys.exit(1)
+        return cls(
+            conn_params,
+            replicas=replicas,
+            max_threads_running=args.max_threads_running,
+            max_replica_lag=args.max_replica_lag,
+            max_history_length=args.max_history_length,
+            probe=args.throttle_probe,
+            max_probe_value=args.max_probe_value,
+            interval=args.throttle_interval
+        )
 
-    def _compare_procedures(self):
-        """Compare stored procedures between source and destination schemas."""
-        source_procs = set(self.source.procedures.keys())
-        dest_procs = set(self.destination.procedures.keys())
+    def wait(self):
+        """Block until every enabled health check is within its threshold."""
+        if not self.enabled:
+            return
+        reasons = self.check()
+        if not reasons:
+            return
+        started = time.monotonic()
+        reported = None
+        while reasons:
+            if reasons != reported:
+                print(f"  Throttling: {'; '.join(reasons)}. Waiting...", file=sys.stderr)
+                reported = reasons
+            time.sleep(self.interval)
+            reasons = self.check()
+        print(f"  Server recovered after {format_duration(time.monotonic() - started)}; continuing.",
+              file=sys.stderr)
+
+
+# ============================================================================
+# METADATA LOCK HANDLING
+# ============================================================================
+
+@dataclass
+class LockBlocker:
+    """
+    A connection that may keep a migration step from getting its metadata lock.
+    
+    Attributes:
+        connection_id: Processlist id (as used by KILL)
+        user: Connection user
+        host: Client host
+        command: Current command, e.g. 'Query' or 'Sleep' (idle in a transaction)
+        seconds: Age of its open transaction, or time in its current state
+        query: Statement it is running, if any
+        lock_type: Metadata lock it holds on the object, or None if it was
+            only found as a long-running transaction (the lock could not be seen)
+    """
+    connection_id: int
+    user: str = ""
+    host: str = ""
+    command: str = ""
+    seconds: int = 0
+    query: Optional[str] = None
+    lock_type: Optional[str] = None
+
+    def describe(self) -> str:
+        """Describe the blocker in one line."""
+        what = f"holds {self.lock_type}" if self.lock_type else "long-running transaction"
+        query = ' '.join(self.query.split())[:100] if self.query else "idle"
+        return (f"connection {self.connection_id} ({self.user}@{self.host}, {what}, "
+                f"{self.command or 'unknown'} for {self.seconds}s): {query}")
+
+
+class MetadataLockGuard:
+    """
+    Runs DDL so that it cannot stall the server behind a metadata lock.
+    
+    An ALTER TABLE needs an exclusive metadata lock on its table. While it
+    waits for a long-running transaction that has used the table, every
+    new query on the table queues behind the ALTER, which can take an
+    application down. Under the guard, each statement runs with a short
+    session lock_wait_timeout instead, so it gives up quickly and lets the
+    queued queries through. It is then retried after an exponential backoff
+    with jitter, up to a number of retries.
+    
+    Before each statement, the connections holding metadata locks on the
+    object are read from performance_schema.metadata_locks, together with
+    their transactions from information_schema.INNODB_TRX, and those that
+    have held on for longer than the timeout are reported.
+    Where metadata locks cannot be seen (no privileges, or the instrument
+    is disabled), transactions open for longer than the timeout are
+    reported as possible blockers. After a timeout the blockers are
+    reported again and, with kill_blockers, the connections that have held
+    metadata locks on the object (or their transactions open) for at
+    least the timeout are killed, rolling back their transactions.
+    Possible blockers are never killed. The session's lock_wait_timeout is
+    restored after the statement.
+    """
+
+    # ER_LOCK_WAIT_TIMEOUT, raised for metadata lock as well as row lock timeouts
+    LOCK_WAIT_TIMEOUT = 1205
+
+    METADATA_LOCKS_QUERY = """
+        SELECT t.PROCESSLIST_ID, t.PROCESSLIST_USER, t.PROCESSLIST_HOST, t.PROCESSLIST_COMMAND,
+               COALESCE(TIMESTAMPDIFF(SECOND, x.trx_started, NOW()), t.PROCESSLIST_TIME),
+               COALESCE(t.PROCESSLIST_INFO, x.trx_query), m.LOCK_TYPE
+        FROM performance_schema.metadata_locks m
+        JOIN performance_schema.threads t ON t.THREAD_ID = m.OWNER_THREAD_ID
+        LEFT JOIN INFORMATION_SCHEMA.INNODB_TRX x ON x.trx_mysql_thread_id = t.PROCESSLIST_ID
+        WHERE m.OBJECT_SCHEMA = DATABASE() AND m.OBJECT_NAME = %s AND m.LOCK_STATUS = 'GRANTED'
+          AND t.PROCESSLIST_ID IS NOT NULL AND t.PROCESSLIST_ID <> CONNECTION_ID()
+        ORDER BY 5 DESC
+    """
+
+    LONG_TRANSACTIONS_QUERY = """
+        SELECT x.trx_mysql_thread_id, p.USER, p.HOST, p.COMMAND,
+               TIMESTAMPDIFF(SECOND, x.trx_started, NOW()), x.trx_query
+        FROM INFORMATION_SCHEMA.INNODB_TRX x
+        LEFT JOIN INFORMATION_SCHEMA.PROCESSLIST p ON p.ID = x.trx_mysql_thread_id
+        WHERE x.trx_mysql_thread_id <> CONNECTION_ID()
+          AND x.trx_started < NOW() - INTERVAL %s SECOND
+        ORDER BY x.trx_started
+    """
+
+    def __init__(self, lock_wait_timeout: int = 5, retries: int = 10, kill_blockers: bool = False,
+                 backoff: float = 1.0, max_backoff: float = 60.0):
+        """
+        Initialize the guard.
         
-        # Procedures to create or replace
-        for proc_name in source_procs:
-            proc = self.source.procedures[proc_name]
-            
-            # Drop if it exists in destination and we're updating it
-            if proc_name in dest_procs:
-                self.migration_steps.append(MigrationStep(
-                    stage=MigrationStage.CREATE_PROCEDURES,
-                    sql=f"DROP {proc.type} IF EXISTS `{proc_name}`;",
-                    description=f"Drop {proc.type.lower()} '{proc_name}' (will be recreated)"
-                ))
-            
-            # Create the procedure/function
-            self.migration_steps.append(MigrationStep(
-                stage=MigrationStage.CREATE_PROCEDURES,
-                sql=proc.definition + ";",
-                description=f"Create {proc.type.lower()} '{proc_name}'"
-            ))
+        Args:
+            lock_wait_timeout: Seconds each attempt may wait for a metadata lock
+            retries: Attempts after the first one before giving up
+            kill_blockers: Whether to kill the connections holding a
+                metadata lock a statement timed out on
+            backoff: Seconds to wait before the first retry, doubled for each
+                further one
+            max_backoff: Longest wait between retries
+        """
+        self.lock_wait_timeout = lock_wait_timeout
+        self.retries = retries
+        self.kill_blockers = kill_blockers
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        # Connections of the migration itself, never reported or killed
+        self._own_connections: Set[int] = set()
+        self._instrumented: Optional[bool] = None
 
-    def _compare_triggers(self):
-        """Compare triggers between source and destination schemas."""
-        source_triggers = set(self.source.triggers.keys())
-        dest_triggers = set(self.destination.triggers.keys())
+    @classmethod
+    def from_args(cls, args) -> Optional['MetadataLockGuard']:
+        """
+        Create a guard from the migrate command's options.
         
-        # Triggers to drop
-        if self.destructive:
-            for trigger_name in dest_triggers - source_triggers:
-                self.migration_steps.append(MigrationStep(
-                    stage=MigrationStage.DROP_TRIGGERS,
-                    sql=f"DROP TRIGGER IF EXISTS `{trigger_name}`;",
-                    description=f"Drop trigger '{trigger_name}'"
-                ))
+        Returns:
+            MetadataLockGuard, or None without --lock-wait-timeout
+        """
+        if args.lock_wait_timeout is None:
+            if args.kill_blockers:
+                print("Error: --kill-blockers needs --lock-wait-timeout.", file=sys.stderr)
+                sys.exit(1)
+            return None
+        if args.lock_wait_timeout < 1 or args.lock_retries < 0:
+            print("Error: --lock-wait-timeout must be at least 1 and --lock-retries not negative.",
+                  file=sys.stderr)
+            sys.exit(1)
+        return cls(args.lock_wait_timeout, args.lock_retries, args.kill_blockers)
+
+    def blockers(self, db: DatabaseConnection, object_name: str) -> List[LockBlocker]:
+        """
+        Find the connections that may block a metadata lock on an object.
+        
+        Args:
+            db: Connection to the destination database
+            object_name: Table, view, trigger or routine
+            
+        Returns:
+            Connections holding metadata locks on the object or, if those
+            cannot be seen, with transactions open longer than the timeout
+        """
+        try:
+            if self._metadata_locks_visible(db):
+                rows = db.execute_query(self.METADATA_LOCKS_QUERY, (object_name,))
+            else:
+                rows = db.execute_query(self.LONG_TRANSACTIONS_QUERY, (self.lock_wait_timeout,))
+        except MySQLError:
+            return []
+        # A connection has a row per lock it holds; keep its oldest
+        blockers: Dict[int, LockBlocker] = {}
+        for row in rows:
+            if row[0] not in self._own_connections and row[0] not in blockers:
+                blockers[row[0]] = LockBlocker(*row)
+        return list(blockers.values())
+
+    def _metadata_locks_visible(self, db: DatabaseConnection) -> bool:
+        """Check (once) whether performance_schema records metadata locks."""
+        if self._instrumented is None:
+            try:
+                rows = db.execute_query(
+                    "SELECT ENABLED FROM performance_schema.setup_instruments "
+                    "WHERE NAME = 'wait/lock/metadata/sql/mdl'"
+                )
+                self._instrumented = bool(rows) and rows[0][0] == 'YES'
+            except MySQLError:
+                self._instrumented = False
+        return self._instrumented
+
+    def _kill(self, db: DatabaseConnection, blockers: List[LockBlocker]):
+        """Kill connections."""
+        for blocker in blockers:
+            try:
+                db.execute_statement(f"KILL {int(blocker.connection_id)}")
+                print(f"    Killed connection {blocker.connection_id}.", file=sys.stderr)
+            except MySQLError as e:
+                print(f"    Could not kill connection {blocker.connection_id}: {e}", file=sys.stderr)
+
+    @staticmethod
+    def _report(message: str, blockers: List[LockBlocker]):
+        print(f"    {message}:", file=sys.stderr)
+        for blocker in blockers:
+            print(f"      {blocker.describe()}", file=sys.stderr)
+
+    def run(self, db: DatabaseConnection, object_name: Optional[str], action):
+        """
+        Run a DDL statement under the guard.
         
-        # Triggers to create or replace
-        for trigger_name in source_triggers:
-            trigger = self.source.triggers[trigger_name]
+        Args:
+            db: Connection the statement runs on
+            object_name: Object the statement locks, for finding blockers
+            action: Callable running the statement
             
-            # Drop if it exists (MySQL doesn't support CREATE OR REPLACE for triggers)
-            if trigger_name in dest_triggers:
-                self.migration_steps.append(MigrationStep(
-                    stage=MigrationStage.DROP_TRIGGERS,
-                    sql=f"DROP TRIGGER IF EXISTS `{trigger_name}`;",
-                    description=f"Drop trigger '{trigger_name}' (will be recreated)"
-                ))
+        Returns:
+            The action's result
             
-            # Create the trigger
-            create_sql = (
-                f"CREATE TRIGGER `{trigger_name}` {trigger.timing} {trigger.event} "
-                f"ON `{trigger.table}` FOR EACH ROW {trigger.definition};"
-            )
+        Raises:
+            MySQLError: If the statement failed, or timed out on every attempt
+        """
+        self._own_connections.add(db.connection.connection_id)
+        previous_timeout = db.execute_query("SELECT @@SESSION.lock_wait_timeout")[0][0]
+        db.execute_statement("SET SESSION lock_wait_timeout = %s", (self.lock_wait_timeout,))
+        try:
+            return self._attempt(db, object_name, action)
+        finally:
+            # Later statements on the connection (chunk copies, the journal)
+            # keep their usual timeout; a lost connection resets it anyway
+            try:
+                db.execute_statement("SET SESSION lock_wait_timeout = %s", (previous_timeout,))
+            except MySQLError:
+                pass
+
+    def _attempt(self, db: DatabaseConnection, object_name: Optional[str], action):
+        """Run the action until it does not time out, or the retries are used up."""
+        if object_name:
+            # Only those already holding on longer than one attempt may wait
+            blockers = [blocker for blocker in self.blockers(db, object_name)
+                        if (blocker.seconds or 0) >= self.lock_wait_timeout]
+            if blockers:
+                self._report(f"'{object_name}' is in use; the step may have to wait for", blockers)
+        
+        for attempt in range(self.retries + 1):
+            try:
+                return action()
+            except MySQLError as e:
+                if e.errno != self.LOCK_WAIT_TIMEOUT or attempt == self.retries:
+                    raise
             
-            self.migration_steps.append(MigrationStep(
-                stage=MigrationStage.CREATE_TRIGGERS,
-                sql=create_sql,
-                description=f"Create trigger '{trigger_name}'"
-            ))
+            print(f"    Metadata lock wait timed out after {self.lock_wait_timeout}s "
+                  f"(attempt {attempt + 1} of {self.retries + 1}).", file=sys.stderr)
+            if object_name:
+                blockers = self.blockers(db, object_name)
+                if blockers:
+                    self._report("Blocked by", blockers)
+                    if self.kill_blockers:
+                        # Only a lock held through the whole attempt blocked
+                        # it; short queries on a busy table come and go
+                        self._kill(db, [
+                            blocker for blocker in blockers
+                            if blocker.lock_type is not None and (blocker.seconds or 0) >= self.lock_wait_timeout
+                        ])
+            delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+            delay = delay / 2 + random.uniform(0, delay / 2)
+            print(f"    Retrying in {delay:.1f}s...", file=sys.stderr)
+            time.sleep(delay)
 
 
 # ============================================================================
-# JSON SCHEMA SERIALIZATION
+# ONLINE SCHEMA CHANGE
 # ============================================================================
 
-class SchemaSerializer:
+@dataclass
+class ChunkOptions:
     """
-    Handles serialization and deserialization of Schema objects to/from JSON.
+    How to work through a table in primary key order.
+    
+    Attributes:
+        chunk_size: Rows in the first chunk
+        chunk_time: Seconds each chunk should take; the chunk size is
+            adjusted after every chunk to match (0 keeps it fixed)
+        sleep: Seconds to pause between chunks
+        max_chunk_size: Most rows in one chunk, bounding transaction size
     """
+    chunk_size: int = 1000
+    chunk_time: float = 0.5
+    sleep: float = 0.0
+    max_chunk_size: int = 100000
 
-    @staticmethod
-    def schema_to_json(schema: Schema) -> str:
+    @classmethod
+    def from_args(cls, args) -> 'ChunkOptions':
+        """Create chunk options from the migrate command's options."""
+        if args.chunk_size < 1 or args.max_chunk_size < 1 or args.chunk_time < 0 or args.chunk_sleep < 0:
+            print("Error: --chunk-size and --max-chunk-size must be positive, --chunk-time and "
+                  "--chunk-sleep not negative.", file=sys.stderr)
+            sys.exit(1)
+        return cls(chunk_size=min(args.chunk_size, args.max_chunk_size), chunk_time=args.chunk_time,
+                   sleep=args.chunk_sleep, max_chunk_size=args.max_chunk_size)
+
+
+class PrimaryKeyChunker:
+    """
+    Runs a statement over a table in primary key ranges, one transaction each.
+    
+    Each chunk's upper bound is found by reading ahead chunk_size keys from
+    the previous bound, so chunks stay the same size however the keys are
+    distributed. After every chunk the size is scaled towards the target
+    chunk time (by at most a factor of 2 at a time), keeping transactions,
+    undo logs and row lock durations short on a busy server while using
+    the capacity of an idle one. Between chunks the throttle, if any, is
+    waited on and progress is reported every PROGRESS_INTERVAL seconds.
+    """
+
+    PROGRESS_INTERVAL = 10.0
+
+    def __init__(self, db: DatabaseConnection, table_name: str, primary_key: List[str],
+                 options: Optional[ChunkOptions] = None, throttle: Optional[ExecutionThrottle] = None):
         """
-        Convert a Schema object to JSON string.
+        Initialize the chunker.
         
         Args:
-            schema: Schema to serialize
-            
-        Returns:
-            JSON string representation
+            db: Connection to run the chunks on
+            table_name: Table to work through
+            primary_key: The table's primary key columns
+            options: Chunk size, target time and sleep
+            throttle: Throttle to wait on between chunks
         """
-        def convert_to_dict(obj):
-            """Recursively convert dataclass objects to dictionaries."""
-            if hasattr(obj, '__dataclass_fields__'):
-                return {
-                    key: convert_to_dict(value)
-                    for key, value in asdict(obj).items()
-                }
-            elif isinstance(obj, dict):
-                return {key: convert_to_dict(value) for key, value in obj.items()}
-            elif isinstance(obj, list):
-                return [convert_to_dict(item) for item in obj]
-            else:
-                return obj
-        
-        schema_dict = convert_to_dict(schema)
-        return json.dumps(schema_dict, indent=2)
+        self.db = db
+        self.table_name = table_name
+        self.primary_key = primary_key
+        self.options = options or ChunkOptions()
+        self.throttle = throttle
 
-    @staticmethod
-    def json_to_schema(json_str: str) -> Schema:
+    def execute(self, sql: str, params: tuple = ()) -> int:
+        """Execute a statement on the chunker's connection and return the affected row count."""
+        return self.db.execute_statement(sql, params)
+
+    def _key_list(self, prefix: str = '') -> str:
+        return ", ".join(f"{prefix}`{column}`" for column in self.primary_key)
+
+    def _key_compare(self, operator: str) -> str:
+        """Compare the primary key with a key value given as parameters."""
+        placeholders = ", ".join("%s" for _ in self.primary_key)
+        if len(self.primary_key) == 1:
+            return f"`{self.primary_key[0]}` {operator} {placeholders}"
+        return f"({self._key_list()}) {operator} ({placeholders})"
+
+    def _upper_bound(self, lower: Optional[tuple], size: int) -> Optional[tuple]:
+        """Find the key `size` rows after `lower`, or None if fewer rows remain."""
+        where = f" WHERE {self._key_compare('>')}" if lower is not None else ""
+        rows = self.db.execute_query(
+            f"SELECT {self._key_list()} FROM `{self.table_name}` FORCE INDEX (PRIMARY){where} "
+            f"ORDER BY {self._key_list()} LIMIT 1 OFFSET %s",
+            (lower or ()) + (size - 1,)
+        )
+        return tuple(rows[0]) if rows else None
+
+    def estimated_rows(self) -> int:
+        """Return the table's estimated row count from INFORMATION_SCHEMA.TABLES."""
+        rows = self.db.execute_query(
+            "SELECT TABLE_ROWS FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            (self.table_name,)
+        )
+        return int(rows[0][0] or 0) if rows else 0
+
+    def run(self, process, label: str) -> int:
         """
-        Convert JSON string to Schema object.
+        Process the whole table chunk by chunk.
         
         Args:
-            json_str: JSON string to deserialize
+            process: Called as process(where, params) for each chunk, with a
+                condition selecting the chunk's rows (using the table's
+                column names unqualified) and its parameters; returns the
+                number of rows processed
+            label: Progress message prefix, e.g. "Copying 'orders'"
             
         Returns:
-            Schema object
+            Number of rows processed
         """
-        data = json.loads(json_str)
-        schema = Schema(database_name=data.get('database_name', ''))
-        
-        # Deserialize tables
-        for table_name, table_data in data.get('tables', {}).items():
-            table = Table(name=table_name)
+        total = self.estimated_rows()
+        size = self.options.chunk_size
+        lower = None
+        done = 0
+        started = last_report = time.monotonic()
+        while True:
+            if self.throttle:
+                self.throttle.wait()
+            upper = self._upper_bound(lower, size)
+            conditions, params = [], ()
+            if lower is not None:
+                conditions.append(self._key_compare('>'))
+                params += lower
+            if upper is not None:
+                conditions.append(self._key_compare('<='))
+                params += upper
             
-            # Deserialize columns
-            table.columns = [
-                Column(**col_data) for col_data in table_data.get('columns', [])
-            ]
-            
-            # Deserialize other table properties
-            table.primary_key = table_data.get('primary_key', [])
-            table.engine = table_data.get('engine', 'InnoDB')
-            table.charset = table_data.get('charset')
-            table.collation = table_data.get('collation')
-            table.comment = table_data.get('comment', '')
+            chunk_started = time.monotonic()
+            processed = process(" AND ".join(conditions) or "1 = 1", params)
+            self.db.connection.commit()
+            elapsed = time.monotonic() - chunk_started
+            done += size if upper is not None else processed
             
-            # Deserialize indexes
-            table.indexes = [
-                Index(**idx_data) for idx_data in table_data.get('indexes', [])
-            ]
+            if upper is None:
+                break
+            lower = upper
+            now = time.monotonic()
+            if now - last_report >= self.PROGRESS_INTERVAL:
+                last_report = now
+                print(f"    {label}: {self._progress(done, total, now - started)}", file=sys.stderr)
+            if self.options.chunk_time > 0:
+                factor = min(2.0, max(0.5, self.options.chunk_time / max(elapsed, 0.001)))
+                size = max(1, min(self.options.max_chunk_size, int(size * factor)))
+            if self.options.sleep > 0:
+                time.sleep(self.options.sleep)
+        
+        print(f"    {label}: {done} rows in {format_duration(time.monotonic() - started)}", file=sys.stderr)
+        return done
+
+    @staticmethod
+    def _progress(done: int, total: int, elapsed: float) -> str:
+        """Describe progress against the (estimated) total row count."""
+        if total <= done:
+            return f"{done} rows"
+        remaining = elapsed * (total - done) / done if done else 0
+        return f"{done}/~{total} rows ({100 * done // total}%), about {format_duration(remaining)} left"
+
+
+class ShadowTableCopy:
+    """
+    Changes a table without blocking writes by copying it into a new table.
+    
+    The approach of pt-online-schema-change:
+    
+    1. The target definition is created as the shadow table _<name>_new.
+    2. Triggers on the original table apply every insert, update and delete
+       to the shadow table as well, from then on.
+    3. The existing rows are copied in primary key chunks (PrimaryKeyChunker),
+       skipping rows the triggers have already copied.
+    4. RENAME TABLE atomically swaps the tables, so the application sees the
+       new table from one statement to the next.
+    5. The triggers and the old table (now _<name>_old) are dropped.
+    
+    Columns are copied by name; columns only in the target definition get
+    their defaults and generated columns are computed. The table needs the
+    same primary key before and after, no new or changed unique keys, and
+    no foreign keys or triggers of its own (see
+    SchemaComparator.use_shadow_copies). Any warning from copying a chunk
+    fails the copy. If anything fails, or
+    the copy is interrupted, before the swap, the triggers and the shadow
+    table are dropped again and the original table is left as it was.
+    """
+
+    # Longest table name leaving room for the _<name>_new style names
+    MAX_NAME_LENGTH = 59
+
+    def __init__(self, db: DatabaseConnection, table: Table, options: Optional[ChunkOptions] = None,
+                 throttle: Optional[ExecutionThrottle] = None, lock_guard: Optional[MetadataLockGuard] = None):
+        """
+        Initialize the copy.
+        
+        Args:
+            db: Connection to the destination database
+            table: Target definition of the table
+            options: Chunking of the row copy
+            throttle: Throttle to wait on between chunks
+            lock_guard: Guard to create the triggers and swap the tables under
+        """
+        self.db = db
+        self.table = table
+        self.lock_guard = lock_guard
+        self.shadow_name = f"_{table.name}_new"
+        self.old_name = f"_{table.name}_old"
+        self.trigger_names = {event: f"_{table.name}_{event[:3].lower()}" for event in ('INSERT', 'UPDATE', 'DELETE')}
+        self.chunker = PrimaryKeyChunker(db, table.name, table.primary_key, options, throttle)
+
+    def run(self):
+        """
+        Carry out the change.
+        
+        Raises:
+            MySQLError: If the change failed (the original table is intact
+                unless the error says otherwise)
+        """
+        name = self.table.name
+        current = self.db.extract_tables([name]).get(name)
+        if current is None:
+            raise MySQLError(msg=f"table '{name}' does not exist")
+        if current.primary_key != self.table.primary_key:
+            raise MySQLError(msg=f"table '{name}' does not have the expected primary key")
+        existing = self.db.execute_query(
+            "SELECT TABLE_NAME FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = DATABASE() "
+            "AND TABLE_NAME IN (%s, %s)",
+            (self.shadow_name, self.old_name)
+        )
+        if existing:
+            raise MySQLError(msg=f"table '{existing[0][0]}' already exists; it may be left over from "
+                                 f"an earlier online copy of '{name}' and has to be dropped first")
+        
+        current_columns = {column.name for column in current.columns}
+        columns = [
+            column.name for column in self.table.columns
+            if column.name in current_columns
+            and not any(word in column.extra.lower() for word in ('virtual generated', 'stored generated'))
+        ]
+        try:
+            print(f"    Creating shadow table '{self.shadow_name}'...", file=sys.stderr)
+            self.chunker.execute(SchemaComparator.create_table_sql(replace(self.table, name=self.shadow_name)))
+            for event in ('INSERT', 'UPDATE', 'DELETE'):
+                self._lock_table(self._trigger_sql(event, columns))
             
-            # Deserialize foreign keys
-            table.foreign_keys = [
-                ForeignKey(**fk_data) for fk_data in table_data.get('foreign_keys', [])
-            ]
+            self.chunker.run(lambda where, params: self._copy_chunk(columns, where, params), f"Copying '{name}'")
             
-            schema.tables[table_name] = table
+            print(f"    Swapping '{self.shadow_name}' in for '{name}'...", file=sys.stderr)
+            self._lock_table(f"RENAME TABLE `{name}` TO `{self.old_name}`, `{self.shadow_name}` TO `{name}`")
+        except BaseException:
+            self.abort()
+            raise
         
-        # Deserialize views
-        for view_name, view_data in data.get('views', {}).items():
-            schema.views[view_name] = View(**view_data)
+        try:
+            self._drop_triggers()
+            self.chunker.execute(f"DROP TABLE IF EXISTS `{self.old_name}`")
+        except MySQLError as e:
+            print(f"    Warning: '{name}' was changed, but cleaning up failed ({e}); drop the triggers "
+                  f"{', '.join(self.trigger_names.values())} and the table '{self.old_name}' by hand.",
+                  file=sys.stderr)
+
+    def abort(self):
+        """Drop the shadow table and triggers, leaving the original table as it was."""
+        try:
+            self._drop_triggers()
+            self.chunker.execute(f"DROP TABLE IF EXISTS `{self.shadow_name}`")
+            print(f"    Online copy of '{self.table.name}' aborted; the shadow table and triggers were removed.",
+                  file=sys.stderr)
+        except MySQLError as e:
+            print(f"    Online copy of '{self.table.name}' aborted, but cleaning up failed ({e}); drop the "
+                  f"triggers {', '.join(self.trigger_names.values())} and the table '{self.shadow_name}' "
+                  f"by hand.", file=sys.stderr)
+
+    def _copy_chunk(self, columns: List[str], where: str, params: tuple) -> int:
+        """
+        Copy one chunk of rows into the shadow table.
         
-        # Deserialize procedures
-        for proc_name, proc_data in data.get('procedures', {}).items():
-            schema.procedures[proc_name] = StoredProcedure(**proc_data)
+        Rows the triggers have already copied are skipped by a no-op
+        ON DUPLICATE KEY UPDATE rather than INSERT IGNORE, which would also
+        turn errors (truncated or invalid values) into warnings. Any
+        warning (left by a non-strict sql_mode) still fails the copy, as
+        does one the server did not keep (beyond max_error_count).
         
-        # Deserialize triggers
-        for trigger_name, trigger_data in data.get('triggers', {}).items():
-            schema.triggers[trigger_name] = Trigger(**trigger_data)
+        Raises:
+            MySQLError: If the chunk raised a warning
+        """
+        column_list = ", ".join(f"`{column}`" for column in columns)
+        key = self.table.primary_key[0]
+        copied = self.chunker.execute(
+            f"INSERT INTO `{self.shadow_name}` ({column_list}) "
+            f"SELECT {column_list} FROM `{self.table.name}` FORCE INDEX (PRIMARY) WHERE {where} "
+            f"LOCK IN SHARE MODE "
+            f"ON DUPLICATE KEY UPDATE `{self.shadow_name}`.`{key}` = `{self.shadow_name}`.`{key}`",
+            params
+        )
+        count = int(self.db.execute_query("SELECT @@warning_count")[0][0])
+        if count:
+            warnings = self.db.execute_query("SHOW WARNINGS")
+            detail = "; ".join(f"{level.lower()} {code}: {message}" for level, code, message in warnings[:3])
+            raise MySQLError(msg=f"copying '{self.table.name}' raised {count} warning(s)"
+                                 + (f" ({detail})" if detail else ""))
+        return copied
+
+    def _lock_table(self, statement: str):
+        """Run a statement needing an exclusive metadata lock on the original table."""
+        if self.lock_guard:
+            self.lock_guard.run(self.db, self.table.name, lambda: self.chunker.execute(statement))
+        else:
+            self.chunker.execute(statement)
+
+    def _drop_triggers(self):
+        for trigger_name in self.trigger_names.values():
+            self.chunker.execute(f"DROP TRIGGER IF EXISTS `{trigger_name}`")
+
+    def _trigger_sql(self, event: str, columns: List[str]) -> str:
+        """Build the trigger replaying one kind of change on the shadow table."""
+        shadow = f"`{self.shadow_name}`"
+        column_list = ", ".join(f"`{column}`" for column in columns)
+        values = ", ".join(f"NEW.`{column}`" for column in columns)
+        replace_row = f"REPLACE INTO {shadow} ({column_list}) VALUES ({values})"
+        old_row = " AND ".join(f"{shadow}.`{column}` <=> OLD.`{column}`" for column in self.table.primary_key)
+        
+        if event == 'INSERT':
+            body = replace_row
+        elif event == 'DELETE':
+            body = f"DELETE IGNORE FROM {shadow} WHERE {old_row}"
+        else:
+            # An update changing the primary key moves the row
+            key_changed = " OR ".join(
+                f"NOT (OLD.`{column}` <=> NEW.`{column}`)" for column in self.table.primary_key
+            )
+            body = f"BEGIN DELETE IGNORE FROM {shadow} WHERE ({key_changed}) AND {old_row}; {replace_row}; END"
+        return (f"CREATE TRIGGER `{self.trigger_names[event]}` AFTER {event} ON `{self.table.name}` "
+                f"FOR EACH ROW {body}")
+
+
+# ============================================================================
+# CLI INTERFACE
+# ============================================================================
+
+def parse_connection_string(conn_str: str, defaults: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Parse a MySQL connection string.
+    
+    Format: user:password@host:port/database[?option=value&...]
+    
+    See parse_connection_options() for the supported options.
+    
+    Args:
+        conn_str: Connection string
+        defaults: Connector options to use where the string sets none
+                  (e.g. from command-line flags)
         
-        return schema
+    Returns:
+        Dictionary with connection parameters
+    """
+    pattern = r'(?:([^:@]+)(?::([^@]+))?@)?([^:/@]+)(?::(\d+))?/([^?]*)(?:\?(.*))?$'
+    match = re.match(pattern, conn_str)
+    
+    if not match:
+        print(f"Error: Invalid connection string format: {conn_str}", file=sys.stderr)
+        print("Expected format: user:password@host:port/database[?option=value&...]", file=sys.stderr)
+        sys.exit(1)
+    
+    user, password, host, port, database, query = match.groups()
+    
+    options = dict(defaults or {})
+    if query:
+        items = {}
+        for item in query.split('&'):
+            key, _, value = item.partition('=')
+            items[key] = value
+        try:
+            options.update(parse_connection_options(items))
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    
+    return {
+        'user': user or 'root',
+        'password': password or '',
+        'host': host,
+        'port': int(port) if port else 3306,
+        'database': database,
+        'options': options
+    }
+
+
+# First mysql-connector-python release accepting read_timeout and write_timeout
+NETWORK_TIMEOUTS_CONNECTOR_VERSION = (9, 3)
+
+
+def connector_version() -> Tuple[int, ...]:
+    """Return the installed mysql-connector-python version as a tuple of integers."""
+    version_info = getattr(mysql.connector, '__version_info__', None) or ()
+    return tuple(part for part in version_info if isinstance(part, int))
+
+
+def parse_connection_options(items: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Translate transport options into mysql.connector.connect() arguments.
+    
+    Supported options:
+        socket / unix_socket: Unix socket path (host and port are then ignored)
+        compress: Use the compressed protocol (1/0, true/false, yes/no, on/off)
+        driver: 'c' for the C extension or 'pure' for the pure Python driver
+        connect_timeout: Connection timeout in seconds
+        read_timeout / write_timeout: Network read/write timeouts in seconds
+            (mysql-connector-python 9.3+)
+    
+    Options with a value of None are ignored.
+    
+    Args:
+        items: Option names and values (strings, or typed values from the CLI)
+        
+    Returns:
+        Dictionary of connector arguments
+        
+    Raises:
+        ValueError: If an option is unknown or has an invalid value
+    """
+    options = {}
+    
+    for key, value in items.items():
+        if value is None:
+            continue
+        
+        if key in ('socket', 'unix_socket'):
+            options['unix_socket'] = str(value)
+        elif key == 'compress':
+            if isinstance(value, bool):
+                options['compress'] = value
+            elif str(value).lower() in ('1', 'true', 'yes', 'on', ''):
+                options['compress'] = True
+            elif str(value).lower() in ('0', 'false', 'no', 'off'):
+                options['compress'] = False
+            else:
+                raise ValueError(f"Invalid value for compress: {value}")
+        elif key == 'driver':
+            if value == 'pure':
+                options['use_pure'] = True
+            elif value == 'c':
+                if not getattr(mysql.connector, 'HAVE_CEXT', False):
+                    raise ValueError("The C extension driver is not available "
+                                     "(install mysql-connector-python with its C extension)")
+                options['use_pure'] = False
+            else:
+                raise ValueError(f"Invalid driver: {value} (expected 'c' or 'pure')")
+        elif key in ('connect_timeout', 'read_timeout', 'write_timeout'):
+            try:
+                seconds = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid value for {key}: {value}")
+            if seconds <= 0:
+                raise ValueError(f"Invalid value for {key}: {value}")
+            if key != 'connect_timeout' and connector_version() < NETWORK_TIMEOUTS_CONNECTOR_VERSION:
+                raise ValueError(
+                    f"{key} needs mysql-connector-python "
+                    f"{'.'.join(map(str, NETWORK_TIMEOUTS_CONNECTOR_VERSION))} or later "
+                    f"(installed: {getattr(mysql.connector, '__version__', 'unknown')})"
+                )
+            options['connection_timeout' if key == 'connect_timeout' else key] = seconds
+        else:
+            raise ValueError(f"Unknown connection option: {key}")
+    
+    return options
+
+
+def connection_defaults(args) -> Dict[str, Any]:
+    """
+    Build connector options from the command-line transport flags.
+    
+    Args:
+        args: Parsed command-line arguments
+        
+    Returns:
+        Dictionary of connector arguments
+    """
+    try:
+        return parse_connection_options({
+            'socket': args.socket,
+            'compress': True if args.compress else None,
+            'driver': args.driver,
+            'connect_timeout': args.connect_timeout,
+            'read_timeout': args.read_timeout,
+            'write_timeout': args.write_timeout
+        })
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+# mysqldump --no-data files accepted in place of a database
+DUMP_FILE_SUFFIXES = ('.sql', '.sql.gz')
+
+
+def make_schema_cache(args) -> Optional[SchemaCache]:
+    """
+    Build the schema cache requested on the command line.
+    
+    Args:
+        args: Parsed command-line arguments
+        
+    Returns:
+        SchemaCache object, or None if caching is disabled
+    """
+    if not args.cache:
+        return None
+    
+    return SchemaCache(
+        directory=args.cache_dir,
+        max_age=args.cache_max_age * 86400 if args.cache_max_age is not None else None,
+        max_size=args.cache_max_size * 1024 * 1024 if args.cache_max_size is not None else None,
+        refresh=args.refresh_cache
+    )
+
+
+def make_schema_filter(args) -> SchemaFilter:
+    """
+    Build the object name filter requested on the command line.
+    
+    Each --include-*/--exclude-* option may be repeated and may hold a
+    comma-separated list of globs; a value starting with 're:' is a single
+    regular expression and is not split.
+    
+    Args:
+        args: Parsed command-line arguments
+        
+    Returns:
+        SchemaFilter object
+    """
+    def patterns(values: Optional[List[str]]) -> List[str]:
+        result = []
+        for value in values or []:
+            result.extend([value] if value.startswith('re:') else
+                          [item.strip() for item in value.split(',') if item.strip()])
+        return result
+    
+    return SchemaFilter(**{
+        object_type: NameFilter(
+            include=patterns(getattr(args, f"{object_type}_include")),
+            exclude=patterns(getattr(args, f"{object_type}_exclude"))
+        )
+        for object_type in ('tables', 'views', 'procedures', 'triggers')
+    })
+
+
+def open_database(conn_params: Dict[str, Any], args) -> DatabaseConnection:
+    """
+    Create a DatabaseConnection for schema extraction using command-line options.
+    
+    Args:
+        conn_params: Connection parameters from parse_connection_string
+        args: Parsed command-line arguments
+        
+    Returns:
+        Unconnected DatabaseConnection object
+    """
+    return DatabaseConnection(**conn_params, bulk=args.bulk, cache=make_schema_cache(args),
+                              schema_filter=make_schema_filter(args), stats=args.with_stats)
+
+
+def is_schema_file(location: str) -> bool:
+    """
+    Check whether a source/destination names a schema file rather than a database.
+    
+    Args:
+        location: Command-line source or destination
+        
+    Returns:
+        True for JSON and mysqldump (.sql, .sql.gz) files
+    """
+    return location.endswith(('.json',) + DUMP_FILE_SUFFIXES)
 
 
-# ============================================================================
-# CLI INTERFACE
-# ============================================================================
+def load_schema(location: str, args, description: str) -> Schema:
+    """
+    Load a schema from a JSON file, a mysqldump file or a database.
+    
+    Args:
+        location: JSON/dump file path or database connection string
+        args: Parsed command-line arguments
+        description: What the schema is for messages (e.g. 'source')
+        
+    Returns:
+        Schema object
+    """
+    if location.endswith('.json'):
+        print(f"Loading {description} schema from JSON file: {location}", file=sys.stderr)
+        with open(location, 'r') as f:
+            return SchemaSerializer.json_to_schema(f.read(), make_schema_filter(args))
+    
+    if location.endswith(DUMP_FILE_SUFFIXES):
+        print(f"Parsing {description} schema from dump file: {location}", file=sys.stderr)
+        parser = DumpParser(
+            include_tables=args.include_tables,
+            include_views=args.include_views,
+            include_procedures=args.include_procedures,
+            include_triggers=args.include_triggers,
+            schema_filter=make_schema_filter(args)
+        )
+        return parser.parse_file(location)
+    
+    conn_params = parse_connection_string(location, connection_defaults(args))
+    print(f"Extracting {description} schema from database '{conn_params['database']}'...", file=sys.stderr)
+    with open_database(conn_params, args) as db:
+        return db.extract_schema(
+            include_tables=args.include_tables,
+            include_views=args.include_views,
+            include_procedures=args.include_procedures,
+            include_triggers=args.include_triggers,
+            jobs=args.jobs
+        )
+
 
-def parse_connection_string(conn_str: str) -> Dict[str, Any]:
+def parse_database_list(spec: str) -> List[str]:
     """
-    Parse a MySQL connection string.
-    
-    Format: user:password@host:port/database
+    Split a comma-separated list of database names and LIKE patterns.
     
     Args:
-        conn_str: Connection string
+        spec: Database part of a connection string (e.g. 'tenant_%,shared')
         
     Returns:
-        Dictionary with connection parameters
+        List of database names/patterns
     """
-    pattern = r'(?:([^:@]+)(?::([^@]+))?@)?([^:/@]+)(?::(\d+))?/(.+)'
-    match = re.match(pattern, conn_str)
-    
-    if not match:
-        print(f"Error: Invalid connection string format: {conn_str}", file=sys.stderr)
-        print("Expected format: user:password@host:port/database", file=sys.stderr)
-        sys.exit(1)
-    
-    user, password, host, port, database = match.groups()
+    return [item.strip() for item in spec.split(',') if item.strip()]
+
+
+def print_warnings(warnings: List[Warning]):
+    """
+    Print a list of warnings to stderr.
     
-    return {
-        'user': user or 'root',
-        'password': password or '',
-        'host': host,
-        'port': int(port) if port else 3306,
-        'database': database
-    }
+    Args:
+        warnings: Warnings to print
+    """
+    print(f"\nFound {len(warnings)} warning(s):", file=sys.stderr)
+    for warning in warnings:
+        print(f"  [{warning.level.value}] {warning.message}", file=sys.stderr)
+        if warning.context:
+            print(f"    Context: {warning.context}", file=sys.stderr)
 
 
-def export_command(args):
+def export_multi(args, conn_params: Dict[str, Any]):
     """
-    Handle the export command.
+    Export every database matching the connection string in a single pass.
+    
+    With -o the output is treated as a directory and one <database>.json file
+    is written per database; otherwise a JSON object keyed by database name is
+    printed.
     
     Args:
         args: Parsed command-line arguments
+        conn_params: Connection parameters (database holds names/patterns)
     """
-    # Parse connection string
-    conn_params = parse_connection_string(args.source)
-    
-    # Connect to database and extract schema
-    print(f"Connecting to database '{conn_params['database']}' on {conn_params['host']}...", file=sys.stderr)
+    databases = parse_database_list(conn_params['database'])
+    print(f"Connecting to {conn_params['host']} to export databases matching "
+          f"{', '.join(databases)}...", file=sys.stderr)
     
-    with DatabaseConnection(**conn_params) as db:
-        schema = db.extract_schema(
+    with open_database({**conn_params, 'database': ''}, args) as db:
+        schemas = db.extract_schemas(
+            databases,
             include_tables=args.include_tables,
             include_views=args.include_views,
             include_procedures=args.include_procedures,
             include_triggers=args.include_triggers
         )
     
+    if not schemas:
+        print("Error: no databases matched.", file=sys.stderr)
+        sys.exit(1)
+    
+    print(f"Extracted {len(schemas)} schema(s) successfully.", file=sys.stderr)
+    
+    for name, schema in schemas.items():
+        warnings = SchemaValidator.validate_schema(schema)
+        if warnings:
+            print(f"\nDatabase '{name}':", file=sys.stderr)
+            print_warnings(warnings)
+    
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+        for name, schema in schemas.items():
+            with open(os.path.join(args.output, f"{name}.json"), 'w') as f:
+                f.write(SchemaSerializer.schema_to_json(schema, args.with_digests))
+        print(f"\nSchemas exported to: {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(
+            {name: SchemaSerializer.schema_to_dict(schema, args.with_digests)
+             for name, schema in schemas.items()},
+            indent=2
+        ))
+
+
+def export_command(args):
+    """
+    Handle the export command.
+    
+    Args:
+        args: Parsed command-line arguments
+    """
+    if args.source.endswith(DUMP_FILE_SUFFIXES):
+        schema = load_schema(args.source, args, 'source')
+    else:
+        # Parse connection string
+        conn_params = parse_connection_string(args.source, connection_defaults(args))
+        
+        if args.multi:
+            export_multi(args, conn_params)
+            return
+        
+        # Connect to database and extract schema
+        print(f"Connecting to database '{conn_params['database']}' on {conn_params['host']}...", file=sys.stderr)
+        
+        with open_database(conn_params, args) as db:
+            schema = db.extract_schema(
+                include_tables=args.include_tables,
+                include_views=args.include_views,
+                include_procedures=args.include_procedures,
+                include_triggers=args.include_triggers,
+                jobs=args.jobs
+            )
+    
     print(f"Schema extracted successfully.", file=sys.stderr)
     
     # Validate schema and show warnings
     warnings = SchemaValidator.validate_schema(schema)
     if warnings:
-        print(f"\nFound {len(warnings)} warning(s):", file=sys.stderr)
-        for warning in warnings:
-            print(f"  [{warning.level.value}] {warning.message}", file=sys.stderr)
-            if warning.context:
-                print(f"    Context: {warning.context}", file=sys.stderr)
+        print_warnings(warnings)
     
     # Serialize to JSON
-    json_output = SchemaSerializer.schema_to_json(schema)
+    json_output = SchemaSerializer.schema_to_json(schema, args.with_digests)
     
     # Output to file or stdout
     if args.output:
@@ -1537,68 +6791,189 @@ def export_command(args):
         print(json_output)
 
 
-def migrate_command(args):
+def parse_backfill_values(args) -> Optional[Dict[str, str]]:
     """
-    Handle the migrate command.
+    Read the --backfill and --backfill-value options.
     
     Args:
         args: Parsed command-line arguments
+        
+    Returns:
+        Dictionary of "table.column" to SQL expression, or None without --backfill
     """
-    # Load source schema (from database or JSON)
-    if args.source.endswith('.json'):
-        print(f"Loading source schema from JSON file: {args.source}", file=sys.stderr)
-        with open(args.source, 'r') as f:
-            source_schema = SchemaSerializer.json_to_schema(f.read())
-    else:
-        source_conn = parse_connection_string(args.source)
-        print(f"Extracting source schema from database '{source_conn['database']}'...", file=sys.stderr)
-        with DatabaseConnection(**source_conn) as db:
-            source_schema = db.extract_schema(
+    if not args.backfill:
+        if args.backfill_value:
+            print("Error: --backfill-value is only used with --backfill.", file=sys.stderr)
+            sys.exit(1)
+        return None
+    values = {}
+    for item in args.backfill_value or []:
+        key, _, value = item.partition('=')
+        if not value.strip() or not re.fullmatch(r'[^.\s]+\.[^.\s]+', key.strip()):
+            print(f"Error: invalid --backfill-value '{item}' (expected TABLE.COLUMN=SQL).", file=sys.stderr)
+            sys.exit(1)
+        values[key.strip()] = value.strip()
+    return values
+
+
+def report_unused_backfill_values(args, plans: Dict[str, List[MigrationStep]]):
+    """
+    Warn about --backfill-value columns that no migration step fills in.
+    
+    Args:
+        args: Parsed command-line arguments
+        plans: Dictionary of destination database to its migration steps
+    """
+    filled = {f"{step.table}.{step.backfill.column}"
+              for migration_steps in plans.values() for step in migration_steps if step.backfill}
+    for key in parse_backfill_values(args) or {}:
+        if key not in filled:
+            print(f"Warning: --backfill-value {key} was not used. The column is not being made NOT NULL, "
+                  f"or cannot be filled in chunks (its table needs a primary key, the same in both "
+                  f"schemas, and it must not be generated or auto_increment).", file=sys.stderr)
+
+
+def plan_migrations(args) -> Tuple[Optional[Dict[str, Any]], Dict[str, List[MigrationStep]]]:
+    """
+    Load the source and destination schemas and plan the migration(s).
+    
+    Args:
+        args: Parsed command-line arguments
+        
+    Returns:
+        Tuple of (destination connection parameters or None for a file
+        destination, dictionary of destination database to its non-empty
+        list of migration steps)
+    """
+    backfill = parse_backfill_values(args)
+    
+    # Pipelined: extract both sides concurrently and diff tables as they arrive
+    if args.pipeline and not args.multi and not is_schema_file(args.destination):
+        dest_conn = parse_connection_string(args.destination, connection_defaults(args))
+        if is_schema_file(args.source):
+            source = load_schema(args.source, args, 'source')
+        else:
+            source = open_database(parse_connection_string(args.source, connection_defaults(args)), args)
+        print("Extracting and comparing schemas concurrently...", file=sys.stderr)
+        _, dest_schema, migration_steps = plan_migration_pipelined(
+            source,
+            open_database(dest_conn, args),
+            destructive=args.destructive,
+            include_tables=args.include_tables,
+            include_views=args.include_views,
+            include_procedures=args.include_procedures,
+            include_triggers=args.include_triggers,
+            coalesce=args.coalesce,
+            target_version=args.target_version,
+            explicit_algorithm=args.explicit_algorithm,
+            shadow_copy=args.shadow_copy,
+            backfill=backfill
+        )
+        target = OnlineDDLClassifier(args.target_version or dest_schema.server_version)
+        print(f"Online DDL classified for {target.describe()}.", file=sys.stderr)
+        estimate_migration(args, migration_steps, dest_schema)
+        return dest_conn, ({dest_conn['database']: migration_steps} if migration_steps else {})
+    
+    # Load source schema (from database, JSON or dump file)
+    source_schema = load_schema(args.source, args, 'source')
+    
+    # Load destination schema(s); execution needs a real database
+    if is_schema_file(args.destination):
+        if args.multi or args.execute:
+            print("Error: --multi and --execute need a destination database, not a file.", file=sys.stderr)
+            sys.exit(1)
+        dest_conn = None
+        dest_schemas = {args.destination: load_schema(args.destination, args, 'destination')}
+    elif args.multi:
+        dest_conn = parse_connection_string(args.destination, connection_defaults(args))
+        databases = parse_database_list(dest_conn['database'])
+        print(f"Extracting destination schemas matching {', '.join(databases)}...", file=sys.stderr)
+        with open_database({**dest_conn, 'database': ''}, args) as db:
+            dest_schemas = db.extract_schemas(
+                databases,
                 include_tables=args.include_tables,
                 include_views=args.include_views,
                 include_procedures=args.include_procedures,
                 include_triggers=args.include_triggers
             )
+        if not dest_schemas:
+            print("Error: no destination databases matched.", file=sys.stderr)
+            sys.exit(1)
+    else:
+        dest_conn = parse_connection_string(args.destination, connection_defaults(args))
+        dest_schemas = {dest_conn['database']: load_schema(args.destination, args, 'destination')}
     
-    # Load destination schema (always from database)
-    dest_conn = parse_connection_string(args.destination)
-    print(f"Extracting destination schema from database '{dest_conn['database']}'...", file=sys.stderr)
-    with DatabaseConnection(**dest_conn) as db:
-        dest_schema = db.extract_schema(
+    # Generate migration plan(s)
+    print("Analyzing schema differences...", file=sys.stderr)
+    target = OnlineDDLClassifier(args.target_version or next(iter(dest_schemas.values())).server_version)
+    print(f"Online DDL classified for {target.describe()}.", file=sys.stderr)
+    plans = {}
+    for database, dest_schema in dest_schemas.items():
+        comparator = SchemaComparator(source_schema, dest_schema, destructive=args.destructive,
+                                      coalesce=args.coalesce, target_version=args.target_version,
+                                      explicit_algorithm=args.explicit_algorithm,
+                                      shadow_copy=args.shadow_copy, backfill=backfill)
+        migration_steps = comparator.generate_migration_plan(
             include_tables=args.include_tables,
             include_views=args.include_views,
             include_procedures=args.include_procedures,
             include_triggers=args.include_triggers
         )
+        if migration_steps:
+            estimate_migration(args, migration_steps, comparator.destination)
+            plans[database] = migration_steps
+        elif args.multi:
+            print(f"  {database}: no migration steps needed.", file=sys.stderr)
     
-    # Generate migration plan
-    print("Analyzing schema differences...", file=sys.stderr)
-    comparator = SchemaComparator(source_schema, dest_schema, destructive=args.destructive)
-    migration_steps = comparator.generate_migration_plan(
-        include_tables=args.include_tables,
-        include_views=args.include_views,
-        include_procedures=args.include_procedures,
-        include_triggers=args.include_triggers
-    )
+    return dest_conn, plans
+
+
+def migrate_command(args):
+    """
+    Handle the migrate command.
+    
+    Args:
+        args: Parsed command-line arguments
+    """
+    if args.resume or args.journal:
+        if not args.journal:
+            print("Error: --resume needs the --journal of the migration to resume.", file=sys.stderr)
+            sys.exit(1)
+        if not (args.resume or args.execute):
+            print("Error: --journal is only used with --execute or --resume.", file=sys.stderr)
+            sys.exit(1)
+    if args.resume:
+        resume_migration(args)
+        return
     
-    if not migration_steps:
+    dest_conn, plans = plan_migrations(args)
+    report_unused_backfill_values(args, plans)
+    
+    if not plans:
         print("\nNo migration steps needed. Schemas are identical.", file=sys.stderr)
         return
     
-    print(f"\nGenerated {len(migration_steps)} migration step(s).", file=sys.stderr)
+    for database, migration_steps in plans.items():
+        prefix = f"{database}: " if args.multi else ""
+        print(f"\n{prefix}Generated {len(migration_steps)} migration step(s).", file=sys.stderr)
+        if any(step.estimate for step in migration_steps):
+            print(f"{prefix}Estimated cost: {describe_estimate(CostModel.total(migration_steps))}", file=sys.stderr)
     
     # Collect all warnings
     all_warnings = []
-    for step in migration_steps:
-        all_warnings.extend(step.warnings)
+    for database, migration_steps in plans.items():
+        for step in migration_steps:
+            if args.multi:
+                all_warnings.extend(
+                    Warning(w.level, w.message, f"Database: {database}" + (f", {w.context}" if w.context else ""))
+                    for w in step.warnings
+                )
+            else:
+                all_warnings.extend(step.warnings)
     
     # Display warnings
     if all_warnings:
-        print(f"\nFound {len(all_warnings)} warning(s):", file=sys.stderr)
-        for warning in all_warnings:
-            print(f"  [{warning.level.value}] {warning.message}", file=sys.stderr)
-            if warning.context:
-                print(f"    Context: {warning.context}", file=sys.stderr)
+        print_warnings(all_warnings)
         
         # Stop if warnings exist and --force not specified
         if not args.force:
@@ -1611,13 +6986,36 @@ def migrate_command(args):
     if args.plan:
         sql_lines = ["-- MySQL Schema Migration Script", "-- Generated by MySQL Schema Migrator\n"]
         
-        for step in migration_steps:
-            sql_lines.append(f"-- {step.description}")
-            if step.warnings:
-                for warning in step.warnings:
-                    sql_lines.append(f"-- WARNING: {warning.message}")
-            sql_lines.append(step.sql)
-            sql_lines.append("")
+        for database, migration_steps in plans.items():
+            if args.multi:
+                sql_lines.append(f"-- Database '{database}'")
+                sql_lines.append(f"USE `{database}`;")
+                sql_lines.append("")
+            
+            estimated = any(step.estimate for step in migration_steps)
+            if estimated:
+                sql_lines.append(f"-- Estimated total: {describe_estimate(CostModel.total(migration_steps))}")
+                sql_lines.append("")
+            
+            for step in migration_steps:
+                sql_lines.append(f"-- [{step.step_id}] {step.description}")
+                if step.depends_on:
+                    sql_lines.append(f"-- After: {', '.join(str(step_id) for step_id in step.depends_on)}")
+                if step.shadow_table is not None:
+                    sql_lines.append("-- Online copy: --execute copies the table into a shadow table "
+                                     "and swaps it in; the ALTER TABLE below blocks writes instead")
+                elif step.backfill is not None:
+                    sql_lines.append("-- Backfill: --execute updates the rows in primary key chunks; "
+                                     "the UPDATE below does it in one transaction instead")
+                elif step.algorithm is not None:
+                    sql_lines.append(f"-- Online DDL: {describe_online_ddl(step)}")
+                if estimated:
+                    sql_lines.append(f"-- Estimate: {describe_estimate(step.estimate)}")
+                if step.warnings:
+                    for warning in step.warnings:
+                        sql_lines.append(f"-- WARNING: {warning.message}")
+                sql_lines.append(step.sql)
+                sql_lines.append("")
         
         sql_script = "\n".join(sql_lines)
         
@@ -1631,25 +7029,536 @@ def migrate_command(args):
     
     # Execute migration if --execute specified
     if args.execute:
-        print("\nExecuting migration...", file=sys.stderr)
+        journal = MigrationJournal(args.journal) if args.journal else None
+        chunk_options = ChunkOptions.from_args(args)
+        lock_guard = MetadataLockGuard.from_args(args)
+        with ExecutionThrottle.from_args(args, dest_conn) as throttle:
+            for database, migration_steps in plans.items():
+                if args.multi:
+                    print(f"\nExecuting migration on '{database}'...", file=sys.stderr)
+                else:
+                    print("\nExecuting migration...", file=sys.stderr)
+                conn_params = {**dest_conn, 'database': database}
+                if journal:
+                    journal.begin(conn_params, migration_steps)
+                execute_migration(conn_params, migration_steps, args.parallel, journal, throttle,
+                                  chunk_options, lock_guard)
+
+
+def estimate_migration(args, migration_steps: List[MigrationStep], dest_schema: Schema):
+    """
+    Estimate the cost of each migration step if table statistics are available.
+    
+    Statistics come from --with-stats or from an exported JSON destination
+    that includes them; throughputs from --cost-profile.
+    
+    Args:
+        args: Parsed command-line arguments
+        migration_steps: Steps to estimate
+        dest_schema: Destination schema
+    """
+    if not (args.with_stats or any(table.stats for table in dest_schema.tables.values())):
+        return
+    try:
+        cost_model = CostModel.load(args.cost_profile) if args.cost_profile else CostModel()
+    except (OSError, ValueError) as e:
+        print(f"Error: cannot use cost profile {args.cost_profile}: {e}", file=sys.stderr)
+        sys.exit(1)
+    cost_model.estimate_plan(migration_steps, dest_schema)
+
+
+def format_duration(seconds: float) -> str:
+    """Format a duration as e.g. "45s", "12m 30s" or "3h 05m"."""
+    seconds = int(round(seconds))
+    if seconds < 1:
+        return "<1s"
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+
+
+def format_bytes(size: float) -> str:
+    """Format a byte count as e.g. "512 B", "1.5 MB" or "20.1 GB"."""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def describe_estimate(estimate: Optional[CostEstimate]) -> str:
+    """
+    Describe a cost estimate for the migration script.
+    
+    Args:
+        estimate: Step or plan estimate (None if it could not be estimated)
+        
+    Returns:
+        Description such as "~12m 30s, 40.2 GB I/O, 20.1 GB temporary disk"
+    """
+    if estimate is None:
+        return "unknown (no statistics for some tables)"
+    description = f"~{format_duration(estimate.seconds)}"
+    if estimate.io_bytes:
+        description += f", {format_bytes(estimate.io_bytes)} I/O"
+    if estimate.temp_bytes:
+        description += f", {format_bytes(estimate.temp_bytes)} temporary disk"
+    return description
+
+
+def describe_online_ddl(step: MigrationStep) -> str:
+    """
+    Describe a step's expected online DDL behaviour for the migration script.
+    
+    Args:
+        step: ALTER TABLE migration step
+        
+    Returns:
+        Description such as "INPLACE (table rebuild), concurrent DML allowed"
+    """
+    algorithm = {
+        DDLAlgorithm.INSTANT: "INSTANT",
+        DDLAlgorithm.INPLACE: "INPLACE",
+        DDLAlgorithm.INPLACE_REBUILD: "INPLACE (table rebuild)",
+        DDLAlgorithm.COPY: "COPY (table rebuild)",
+    }[step.algorithm]
+    return f"{algorithm}, {'concurrent DML allowed' if step.concurrent_dml else 'writes blocked'}"
+
+
+def plan_migration_pipelined(source, destination: DatabaseConnection, destructive: bool = False,
+                             include_tables: bool = True, include_views: bool = True,
+                             include_procedures: bool = True, include_triggers: bool = True,
+                             coalesce: bool = False, target_version: Optional[str] = None,
+                             explicit_algorithm: bool = False, shadow_copy: bool = False,
+                             backfill: Optional[Dict[str, str]] = None) -> Tuple[Schema, Schema, List[MigrationStep]]:
+    """
+    Extract both schemas concurrently and diff each table as soon as both copies arrive.
+    
+    Each database side is extracted on its own thread, streaming tables in
+    chunks (DatabaseConnection.iter_tables) to the calling thread, which
+    pairs them up by name and runs the per-table comparison immediately.
+    Views, routines, triggers and the remaining create/drop steps are
+    planned once both sides are complete.
+    
+    Args:
+        source: Source DatabaseConnection, or an already loaded source Schema
+        destination: Destination DatabaseConnection (unconnected)
+        destructive: Whether to generate destructive operations
+        include_tables: Whether to include table migrations
+        include_views: Whether to include view migrations
+        include_procedures: Whether to include procedure migrations
+        include_triggers: Whether to include trigger migrations
+        coalesce: Whether to merge each table's changes into one ALTER TABLE
+        target_version: Server version to classify online DDL for
+            (default: the destination's)
+        explicit_algorithm: Whether to add ALGORITHM=/LOCK= clauses
+        shadow_copy: Whether to change write-blocking tables through shadow table copies
+        backfill: Values to fill in before tightening columns to NOT NULL, or None
+        
+    Returns:
+        Tuple of (source schema, destination schema, migration steps)
+    """
+    sides = [source, destination]
+    schemas = [
+        side if isinstance(side, Schema) else Schema(database_name=side.database)
+        for side in sides
+    ]
+    arrived = [{}, {}]
+    arrivals = queue.Queue()
+    comparator = SchemaComparator(schemas[0], schemas[1], destructive=destructive, coalesce=coalesce,
+                                  target_version=target_version, explicit_algorithm=explicit_algorithm,
+                                  shadow_copy=shadow_copy, backfill=backfill)
+    
+    def extract(index: int):
+        """Extract one side, posting (index, table) pairs and a final (index, None)."""
+        try:
+            side = sides[index]
+            if isinstance(side, Schema):
+                if include_tables:
+                    for table in list(side.tables.values()):
+                        arrivals.put((index, table))
+            else:
+                with side:
+                    schemas[index].server_version = side.server_version()
+                    if include_tables:
+                        for table in side.iter_tables():
+                            arrivals.put((index, table))
+                    if include_views:
+                        schemas[index].views = side.extract_views()
+                    if include_procedures:
+                        schemas[index].procedures = side.extract_procedures()
+                    if include_triggers:
+                        schemas[index].triggers = side.extract_triggers()
+            arrivals.put((index, None))
+        except BaseException as e:
+            arrivals.put((index, e))
+    
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for index in range(2):
+            executor.submit(extract, index)
+        
+        remaining = 2
+        while remaining:
+            index, item = arrivals.get()
+            if item is None:
+                remaining -= 1
+                continue
+            if isinstance(item, BaseException):
+                raise item
+            
+            schemas[index].tables[item.name] = item
+            arrived[index][item.name] = item
+            other = arrived[1 - index].get(item.name)
+            if other is not None:
+                pair = (item, other) if index == 0 else (other, item)
+                comparator.compare_table_early(*pair)
+    
+    migration_steps = comparator.generate_migration_plan(
+        include_tables=include_tables,
+        include_views=include_views,
+        include_procedures=include_procedures,
+        include_triggers=include_triggers
+    )
+    return schemas[0], schemas[1], migration_steps
+
+
+def calibrate_command(args):
+    """
+    Handle the calibrate command: measure DDL throughput for the cost model.
+    
+    A scratch table is filled with --rows rows in the given database and
+    timed through a metadata-only change, a secondary index build, an
+    in-place rebuild and a copying ALTER TABLE, then dropped again. The
+    resulting profile is used by migrate --cost-profile.
+    
+    Args:
+        args: Parsed command-line arguments
+    """
+    conn_params = parse_connection_string(args.database, connection_defaults(args))
+    table = '_myrug_calibration'
+    
+    with DatabaseConnection(**conn_params) as db:
+        cursor = db.connection.cursor()
+        
+        def timed(sql: str) -> float:
+            start = time.monotonic()
+            cursor.execute(sql)
+            return max(time.monotonic() - start, 0.001)
+        
+        def table_stats() -> TableStats:
+            cursor.execute(f"ANALYZE TABLE `{table}`")
+            cursor.fetchall()
+            cursor.execute(
+                "SELECT TABLE_ROWS, DATA_LENGTH, INDEX_LENGTH FROM INFORMATION_SCHEMA.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", (table,)
+            )
+            rows, data_length, index_length = cursor.fetchone()
+            return TableStats(int(rows or 0), int(data_length or 0), int(index_length or 0))
         
-        with DatabaseConnection(**dest_conn) as db:
-            cursor = db.connection.cursor()
+        try:
+            try:
+                # MySQL 8.0 otherwise serves table sizes from a cache
+                cursor.execute("SET SESSION information_schema_stats_expiry = 0")
+            except MySQLError:
+                pass
+            
+            print(f"Creating {args.rows} rows in scratch table '{table}'...", file=sys.stderr)
+            cursor.execute(f"DROP TABLE IF EXISTS `{table}`")
+            cursor.execute(
+                f"CREATE TABLE `{table}` (id BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY, "
+                f"a INT NOT NULL, b VARCHAR(64) NOT NULL, c DATETIME NOT NULL) ENGINE=InnoDB"
+            )
+            row = "(FLOOR(RAND() * 1000000), MD5(RAND()), NOW())"
+            cursor.execute(f"INSERT INTO `{table}` (a, b, c) VALUES " + ", ".join([row] * 1000))
+            rows = 1000
+            while rows < args.rows:
+                cursor.execute(
+                    f"INSERT INTO `{table}` (a, b, c) "
+                    f"SELECT FLOOR(RAND() * 1000000), MD5(RAND()), NOW() FROM `{table}` "
+                    f"LIMIT {args.rows - rows}"
+                )
+                rows += cursor.rowcount
+            db.connection.commit()
+            
+            print("Timing DDL operations...", file=sys.stderr)
+            metadata_seconds = timed(f"ALTER TABLE `{table}` ALTER COLUMN a SET DEFAULT 0")
+            
+            stats = table_stats()
+            seconds = timed(f"ALTER TABLE `{table}` ADD INDEX idx_b (b), ALGORITHM=INPLACE, LOCK=NONE")
+            index_build = stats.data_length / seconds
             
+            stats = table_stats()
+            seconds = timed(f"ALTER TABLE `{table}` ENGINE=InnoDB, ALGORITHM=INPLACE, LOCK=NONE")
+            rebuild = (stats.data_length + stats.index_length) / seconds
+            
+            seconds = timed(f"ALTER TABLE `{table}` MODIFY a BIGINT NOT NULL, ALGORITHM=COPY")
+            copy_rows = rows / seconds
+        except MySQLError as e:
+            print(f"\nError during calibration: {e}", file=sys.stderr)
+            sys.exit(1)
+        finally:
             try:
-                for i, step in enumerate(migration_steps, 1):
-                    print(f"  [{i}/{len(migration_steps)}] {step.description}...", file=sys.stderr)
-                    cursor.execute(step.sql)
-                
-                db.connection.commit()
-                print("\nMigration completed successfully!", file=sys.stderr)
+                cursor.execute(f"DROP TABLE IF EXISTS `{table}`")
+            except MySQLError:
+                pass
+            cursor.close()
+    
+    profile = {
+        'metadata_seconds': round(metadata_seconds, 3),
+        'rebuild_bytes_per_second': round(rebuild),
+        'index_build_bytes_per_second': round(index_build),
+        'copy_rows_per_second': round(copy_rows),
+    }
+    print(f"  Metadata-only change: {metadata_seconds:.3f}s", file=sys.stderr)
+    print(f"  Index build: {format_bytes(index_build)}/s", file=sys.stderr)
+    print(f"  In-place rebuild: {format_bytes(rebuild)}/s", file=sys.stderr)
+    print(f"  Table copy: {copy_rows:.0f} rows/s", file=sys.stderr)
+    
+    profile_json = json.dumps(profile, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(profile_json + "\n")
+        print(f"\nCost profile saved to: {args.output}", file=sys.stderr)
+    else:
+        print(profile_json)
+
+
+def run_step(db: DatabaseConnection, cursor, step: MigrationStep,
+             chunk_options: Optional[ChunkOptions] = None, throttle: Optional[ExecutionThrottle] = None,
+             lock_guard: Optional[MetadataLockGuard] = None):
+    """
+    Run one migration step: its SQL, or a shadow table copy or chunked backfill if it has one.
+    
+    Args:
+        db: Destination connection
+        cursor: Cursor of that connection
+        step: Step to run
+        chunk_options: Chunking of shadow table copies and backfills
+        throttle: Throttle to wait on between chunks
+        lock_guard: Guard to run DDL under
+    """
+    if step.shadow_table is not None:
+        ShadowTableCopy(db, step.shadow_table, chunk_options, throttle, lock_guard).run()
+    elif step.backfill is not None:
+        column = step.backfill.column
+        value = step.backfill.value.replace('%', '%%')
+        chunker = PrimaryKeyChunker(db, step.table, step.backfill.primary_key, chunk_options, throttle)
+        chunker.run(
+            lambda where, params: chunker.execute(
+                f"UPDATE `{step.table}` SET `{column}` = {value} WHERE `{column}` IS NULL AND {where}", params
+            ),
+            f"Filling in '{step.table}.{column}'"
+        )
+    elif lock_guard:
+        lock_guard.run(db, step.table or step.object_name, lambda: cursor.execute(step.sql))
+    else:
+        cursor.execute(step.sql)
+
+
+def execute_migration(conn_params: Dict[str, Any], migration_steps: List[MigrationStep],
+                      parallel: int = 1, journal: Optional[MigrationJournal] = None,
+                      throttle: Optional[ExecutionThrottle] = None,
+                      chunk_options: Optional[ChunkOptions] = None,
+                      lock_guard: Optional[MetadataLockGuard] = None):
+    """
+    Execute migration steps against a database, exiting on error.
+    
+    Args:
+        conn_params: Destination connection parameters
+        migration_steps: Steps to execute in order
+        parallel: Number of connections to run independent steps on
+        journal: Journal to record each step's start and outcome in
+        throttle: Throttle to wait on before each step
+        chunk_options: Chunking of shadow table copies and backfills
+        lock_guard: Guard to run DDL under
+    """
+    if parallel > 1 and len(migration_steps) > 1:
+        execute_migration_parallel(conn_params, migration_steps, parallel, journal, throttle, chunk_options,
+                                   lock_guard)
+        return
+    
+    database = conn_params['database']
+    total = max(step.step_id for step in migration_steps)
+    with DatabaseConnection(**conn_params) as db:
+        cursor = db.connection.cursor()
+        
+        try:
+            for step in migration_steps:
+                if throttle:
+                    throttle.wait()
+                print(f"  [{step.step_id}/{total}] {step.description}...", file=sys.stderr)
+                if journal:
+                    journal.start(database, step)
+                try:
+                    run_step(db, cursor, step, chunk_options, throttle, lock_guard)
+                except MySQLError as e:
+                    if journal:
+                        journal.finish(database, step, db, error=str(e))
+                    raise
+                if journal:
+                    journal.finish(database, step, db)
+            
+            db.connection.commit()
+            print("\nMigration completed successfully!", file=sys.stderr)
+            
+        except MySQLError as e:
+            db.connection.rollback()
+            print(f"\nError during migration: {e}", file=sys.stderr)
+            print_resume_hint(journal)
+            sys.exit(1)
+        finally:
+            cursor.close()
+
+
+def execute_migration_parallel(conn_params: Dict[str, Any], migration_steps: List[MigrationStep],
+                               parallel: int, journal: Optional[MigrationJournal] = None,
+                               throttle: Optional[ExecutionThrottle] = None,
+                               chunk_options: Optional[ChunkOptions] = None,
+                               lock_guard: Optional[MetadataLockGuard] = None):
+    """
+    Execute migration steps over several connections, exiting on error.
+    
+    A step starts as soon as every step it depends on (MigrationStep.depends_on)
+    has completed, so steps on unrelated tables run concurrently while steps
+    on the same table, and foreign key, view and trigger dependencies, keep
+    their order. The migration then takes about as long as its slowest chain
+    of dependent steps rather than the sum of all steps. When several steps
+    are ready they start in plan order. Once a step fails no further steps
+    are started, but those already running are allowed to finish.
+    
+    Args:
+        conn_params: Destination connection parameters
+        migration_steps: Steps in execution order, as returned by
+            SchemaComparator.generate_migration_plan()
+        parallel: Maximum number of steps to run at once
+        journal: Journal to record each step's start and outcome in
+        throttle: Throttle to wait on before starting each step
+        chunk_options: Chunking of shadow table copies and backfills
+        lock_guard: Guard to run DDL under
+    """
+    database = conn_params['database']
+    total = max(step.step_id for step in migration_steps)
+    steps_by_id = {step.step_id: step for step in migration_steps}
+    waiting = {step.step_id: len(step.depends_on) for step in migration_steps}
+    dependents: Dict[int, List[int]] = {step.step_id: [] for step in migration_steps}
+    for step in migration_steps:
+        for step_id in step.depends_on:
+            dependents[step_id].append(step.step_id)
+    
+    with ExitStack() as stack:
+        connections = [
+            stack.enter_context(DatabaseConnection(**conn_params))
+            for _ in range(min(parallel, len(migration_steps)))
+        ]
+        pool = queue.Queue()
+        for db in connections:
+            pool.put(db)
+        
+        def run(step: MigrationStep):
+            """Run one step on the next free connection."""
+            db = pool.get()
+            try:
+                if journal:
+                    journal.start(database, step)
+                cursor = db.connection.cursor()
+                try:
+                    run_step(db, cursor, step, chunk_options, throttle, lock_guard)
+                    db.connection.commit()
+                except MySQLError as e:
+                    if journal:
+                        journal.finish(database, step, db, error=str(e))
+                    raise
+                finally:
+                    cursor.close()
+                if journal:
+                    journal.finish(database, step, db)
+            finally:
+                pool.put(db)
+        
+        ready = [step_id for step_id, count in waiting.items() if not count]
+        heapq.heapify(ready)
+        running = {}
+        failures = []
+        completed = 0
+        with ThreadPoolExecutor(max_workers=len(connections)) as executor:
+            while running or (ready and not failures):
+                while ready and not failures:
+                    if throttle:
+                        throttle.wait()
+                    step = steps_by_id[heapq.heappop(ready)]
+                    print(f"  [{step.step_id}/{total}] {step.description}...", file=sys.stderr)
+                    running[executor.submit(run, step)] = step
                 
-            except MySQLError as e:
-                db.connection.rollback()
-                print(f"\nError during migration: {e}", file=sys.stderr)
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    try:
+                        future.result()
+                    except MySQLError as e:
+                        failures.append((step, e))
+                        continue
+                    completed += 1
+                    for step_id in dependents[step.step_id]:
+                        waiting[step_id] -= 1
+                        if not waiting[step_id]:
+                            heapq.heappush(ready, step_id)
+    
+    if failures:
+        for step, e in failures:
+            print(f"\nError during migration step [{step.step_id}] {step.description}: {e}", file=sys.stderr)
+        print(f"{completed} of {len(migration_steps)} step(s) completed; the remaining steps were not run.",
+              file=sys.stderr)
+        print_resume_hint(journal)
+        sys.exit(1)
+    print("\nMigration completed successfully!", file=sys.stderr)
+
+
+def print_resume_hint(journal: Optional[MigrationJournal]):
+    """Tell the user how to resume a failed migration, if it was journalled."""
+    if journal:
+        print(f"Progress was recorded in {journal.path}; once the problem is fixed, "
+              f"run the same command with --resume to continue.", file=sys.stderr)
+
+
+def resume_migration(args):
+    """
+    Resume the migrations recorded in a journal from their first incomplete steps.
+    
+    The source schema is not read: the remaining steps come from the
+    journal. Each database's remaining steps only run if every table they
+    change still has the structure the journal expects.
+    
+    Args:
+        args: Parsed command-line arguments
+    """
+    journal = MigrationJournal(args.journal)
+    try:
+        plans = journal.load()
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: cannot resume from journal {args.journal}: {e}", file=sys.stderr)
+        sys.exit(1)
+    if not plans:
+        print("Nothing to resume: every step in the journal has completed.", file=sys.stderr)
+        return
+    
+    dest_conn = parse_connection_string(args.destination, connection_defaults(args))
+    chunk_options = ChunkOptions.from_args(args)
+    lock_guard = MetadataLockGuard.from_args(args)
+    with ExecutionThrottle.from_args(args, dest_conn) as throttle:
+        for database, (migration_steps, expected) in plans.items():
+            conn_params = {**dest_conn, 'database': database}
+            changed = journal.changed_tables(conn_params, expected)
+            if changed:
+                print(f"Error: cannot resume '{database}': table(s) {', '.join(changed)} no longer match "
+                      f"the journal (a step may have been applied without being recorded, or the "
+                      f"schema was changed since). Plan the migration again instead.", file=sys.stderr)
                 sys.exit(1)
-            finally:
-                cursor.close()
+            print(f"\nResuming migration on '{database}' at step {migration_steps[0].step_id} "
+                  f"({len(migration_steps)} step(s) remaining)...", file=sys.stderr)
+            execute_migration(conn_params, migration_steps, args.parallel, journal, throttle,
+                              chunk_options, lock_guard)
 
 
 def main():
@@ -1668,6 +7577,13 @@ Examples:
   # Execute migration from JSON to database
   %(prog)s migrate schema.json user:pass@localhost:3306/dest_db --execute --force
 
+  # Generate migration plan from a mysqldump --no-data file (no server needed)
+  %(prog)s migrate schema.sql user:pass@localhost:3306/dest_db --plan
+
+  # Only migrate app_* tables, ignoring archive tables
+  %(prog)s migrate schema.json user:pass@localhost:3306/dest_db --plan \\
+    --include-tables 'app_*' --exclude-tables '*_archive'
+
   # Non-destructive migration (won't drop anything)
   %(prog)s migrate source.json user:pass@localhost:3306/dest_db --execute
 
@@ -1678,9 +7594,60 @@ Examples:
     
     subparsers = parser.add_subparsers(dest='command', help='Command to execute')
     
+    # Options shared by every command that extracts schemas from a database
+    extract_options = argparse.ArgumentParser(add_help=False)
+    extract_options.add_argument('--no-cache', dest='cache', action='store_false',
+                                 help='Do not use the on-disk schema extraction cache')
+    extract_options.add_argument('--cache-dir',
+                                 help=f'Schema cache directory (default: {SchemaCache.default_directory()})')
+    extract_options.add_argument('--cache-max-age', type=float, default=7,
+                                 help='Re-read cached tables and evict cache files older than this many days (default: 7)')
+    extract_options.add_argument('--cache-max-size', type=float, default=256,
+                                 help='Maximum schema cache size in MB (default: 256)')
+    extract_options.add_argument('--refresh-cache', action='store_true',
+                                 help='Ignore cached tables and re-read everything (the cache is rewritten)')
+    extract_options.add_argument('--clear-cache', action='store_true',
+                                 help='Delete all schema cache files before running')
+    extract_options.add_argument('--with-stats', action='store_true',
+                                 help='Also read each table\'s row count and data/index size '
+                                      '(used to estimate migration cost)')
+    
+    # Transport options shared by every command that connects to a database
+    connection_options = argparse.ArgumentParser(add_help=False)
+    connection_options.add_argument('--socket', metavar='PATH',
+                                    help='Connect through this Unix socket instead of TCP')
+    connection_options.add_argument('--compress', action='store_true',
+                                    help='Use the MySQL compressed protocol')
+    connection_options.add_argument('--driver', choices=['c', 'pure'],
+                                    help='Use the C extension or the pure Python driver '
+                                         '(default: C extension if installed)')
+    connection_options.add_argument('--connect-timeout', type=int, metavar='SECONDS',
+                                    help='Connection timeout in seconds')
+    connection_options.add_argument('--read-timeout', type=int, metavar='SECONDS',
+                                    help='Network read timeout in seconds '
+                                         '(needs mysql-connector-python 9.3+)')
+    connection_options.add_argument('--write-timeout', type=int, metavar='SECONDS',
+                                    help='Network write timeout in seconds '
+                                         '(needs mysql-connector-python 9.3+)')
+    
+    # Name filters shared by every command that loads schemas
+    filter_options = argparse.ArgumentParser(add_help=False)
+    for object_type, label in (('tables', 'table'), ('views', 'view'),
+                               ('procedures', 'procedure/function'), ('triggers', 'trigger')):
+        filter_options.add_argument(f'--include-{object_type}', dest=f'{object_type}_include',
+                                    action='append', metavar='PATTERNS',
+                                    help=f'Only include {label}s matching these comma-separated globs '
+                                         f'or re:regexes (repeatable)')
+        filter_options.add_argument(f'--exclude-{object_type}', dest=f'{object_type}_exclude',
+                                    action='append', metavar='PATTERNS',
+                                    help=f'Skip {label}s matching these comma-separated globs '
+                                         f'or re:regexes (repeatable)')
+    
     # Export command
-    export_parser = subparsers.add_parser('export', help='Export database schema to JSON')
-    export_parser.add_argument('source', help='Database connection string (user:pass@host:port/database)')
+    export_parser = subparsers.add_parser('export', help='Export database schema to JSON',
+                                          parents=[extract_options, filter_options, connection_options])
+    export_parser.add_argument('source', help='Database connection string (user:pass@host:port/database) '
+                                              'or mysqldump --no-data file (.sql, .sql.gz)')
     export_parser.add_argument('-o', '--output', help='Output JSON file (default: stdout)')
     export_parser.add_argument('--no-tables', dest='include_tables', action='store_false', 
                               help='Exclude tables from export')
@@ -1690,17 +7657,51 @@ Examples:
                               help='Exclude stored procedures from export')
     export_parser.add_argument('--no-triggers', dest='include_triggers', action='store_false',
                               help='Exclude triggers from export')
+    export_parser.add_argument('--no-bulk', dest='bulk', action='store_false',
+                              help='Extract tables and routines one at a time with SHOW statements')
+    export_parser.add_argument('-j', '--jobs', type=int, default=1,
+                              help='Number of parallel connections for extraction (default: 1)')
+    export_parser.add_argument('--multi', action='store_true',
+                              help='Treat the database as a comma-separated list of names/LIKE patterns '
+                                   'and export them all in one pass (-o is then a directory)')
+    export_parser.add_argument('--with-digests', action='store_true',
+                              help='Store a structural digest per table, checked against the '
+                                   'table definition when the file is loaded')
     
     # Migrate command
-    migrate_parser = subparsers.add_parser('migrate', help='Migrate schema from source to destination')
+    migrate_parser = subparsers.add_parser('migrate', help='Migrate schema from source to destination',
+                                           parents=[extract_options, filter_options, connection_options])
     migrate_parser.add_argument('source', 
-                               help='Source: database connection string or JSON file')
+                               help='Source: database connection string, JSON file or mysqldump file')
     migrate_parser.add_argument('destination',
-                               help='Destination: database connection string')
+                               help='Destination: database connection string, JSON file or mysqldump file '
+                                    '(files cannot be used with --execute)')
     migrate_parser.add_argument('--plan', action='store_true',
                                help='Generate SQL migration script')
     migrate_parser.add_argument('--execute', action='store_true',
                                help='Execute the migration')
+    migrate_parser.add_argument('--journal', metavar='FILE',
+                               help='Record each executed step in FILE so that an interrupted migration '
+                                    'can be resumed')
+    migrate_parser.add_argument('--resume', action='store_true',
+                               help='Resume the migration recorded in --journal from its first incomplete '
+                                    'step instead of planning a new one (the source is not read)')
+    migrate_parser.add_argument('--parallel', type=int, default=1, metavar='N',
+                               help='Execute independent steps over N connections at once (default: 1)')
+    migrate_parser.add_argument('--max-threads-running', type=int, metavar='N',
+                               help='Pause between steps while the destination has more than N Threads_running')
+    migrate_parser.add_argument('--replica', action='append', metavar='CONNECTION',
+                               help='Replica to check the lag of (user:pass@host:port/; repeatable)')
+    migrate_parser.add_argument('--max-replica-lag', type=float, metavar='SECONDS',
+                               help='Pause between steps while any --replica lags more than SECONDS behind')
+    migrate_parser.add_argument('--max-history-length', type=int, metavar='N',
+                               help='Pause between steps while the InnoDB history list length exceeds N')
+    migrate_parser.add_argument('--throttle-probe', metavar='SQL',
+                               help='Query returning one number, checked against --max-probe-value between steps')
+    migrate_parser.add_argument('--max-probe-value', type=float, default=0, metavar='X',
+                               help='Pause between steps while --throttle-probe returns more than X (default: 0)')
+    migrate_parser.add_argument('--throttle-interval', type=float, default=5, metavar='SECONDS',
+                               help='Seconds between health checks while paused (default: 5)')
     migrate_parser.add_argument('--force', action='store_true',
                                help='Proceed even if warnings are generated')
     migrate_parser.add_argument('--destructive', action='store_true',
@@ -1714,6 +7715,64 @@ Examples:
                                help='Exclude stored procedures from migration')
     migrate_parser.add_argument('--no-triggers', dest='include_triggers', action='store_false',
                                help='Exclude triggers from migration')
+    migrate_parser.add_argument('--no-bulk', dest='bulk', action='store_false',
+                               help='Extract tables and routines one at a time with SHOW statements')
+    migrate_parser.add_argument('-j', '--jobs', type=int, default=1,
+                               help='Number of parallel connections for extraction (default: 1)')
+    migrate_parser.add_argument('--pipeline', action='store_true',
+                               help='Extract source and destination concurrently and compare tables as '
+                                    'soon as both copies arrive (ignores --jobs; no effect with --multi '
+                                    'or a schema file destination)')
+    migrate_parser.add_argument('--multi', action='store_true',
+                               help='Treat the destination database as a comma-separated list of '
+                                    'names/LIKE patterns and migrate every match')
+    migrate_parser.add_argument('--target-version', metavar='VERSION',
+                               help='Server version to classify online DDL for, e.g. 8.0.36 or '
+                                    '10.6.12-MariaDB (default: the destination\'s)')
+    migrate_parser.add_argument('--explicit-algorithm', action='store_true',
+                               help='Add ALGORITHM=/LOCK= to every ALTER TABLE so the server fails '
+                                    'instead of falling back to a more blocking algorithm')
+    migrate_parser.add_argument('--shadow-copy', action='store_true',
+                               help='Change tables whose ALTER TABLE would block writes by copying them '
+                                    'into a shadow table kept in sync by triggers, then swapping it in')
+    migrate_parser.add_argument('--lock-wait-timeout', type=int, metavar='SECONDS',
+                               help='Run DDL with this session lock_wait_timeout and retry it with backoff '
+                                    'when a metadata lock is not granted in time, reporting the blockers')
+    migrate_parser.add_argument('--lock-retries', type=int, default=10, metavar='N',
+                               help='Retries after a metadata lock wait timeout (default: 10)')
+    migrate_parser.add_argument('--kill-blockers', action='store_true',
+                               help='Kill the connections holding the metadata lock a step timed out on')
+    migrate_parser.add_argument('--backfill', action='store_true',
+                               help='Fill in NULLs in primary key chunks before making a column NOT NULL, '
+                                    'instead of letting the ALTER TABLE fail on them')
+    migrate_parser.add_argument('--backfill-value', action='append', metavar='TABLE.COLUMN=SQL',
+                               help='Value to fill in for a column with --backfill (repeatable; default: '
+                                    'the column default, else 0 or an empty string)')
+    migrate_parser.add_argument('--chunk-size', type=int, default=1000, metavar='ROWS',
+                               help='Rows per chunk when copying or backfilling tables (initial size; '
+                                    'default: 1000)')
+    migrate_parser.add_argument('--max-chunk-size', type=int, default=100000, metavar='ROWS',
+                               help='Most rows per chunk, bounding each transaction (default: 100000)')
+    migrate_parser.add_argument('--chunk-time', type=float, default=0.5, metavar='SECONDS',
+                               help='Adjust the chunk size so each chunk takes about SECONDS '
+                                    '(0 keeps it fixed; default: 0.5)')
+    migrate_parser.add_argument('--chunk-sleep', type=float, default=0, metavar='SECONDS',
+                               help='Pause between chunks (default: 0)')
+    migrate_parser.add_argument('--cost-profile', metavar='FILE',
+                               help='Calibration profile (from the calibrate command) used to '
+                                    'estimate step durations')
+    migrate_parser.add_argument('--no-coalesce', dest='coalesce', action='store_false',
+                               help='Emit one ALTER TABLE per change instead of merging each '
+                                    'table\'s changes into a single statement')
+    
+    # Calibrate command
+    calibrate_parser = subparsers.add_parser('calibrate', help='Measure DDL throughput for migration cost estimates',
+                                             parents=[connection_options])
+    calibrate_parser.add_argument('database', help='Connection string of a scratch database '
+                                                   '(user:pass@host:port/database)')
+    calibrate_parser.add_argument('-o', '--output', help='Output profile file (default: stdout)')
+    calibrate_parser.add_argument('--rows', type=int, default=200000,
+                                  help='Rows in the scratch table (default: 200000)')
     
     args = parser.parse_args()
     
@@ -1721,11 +7780,16 @@ Examples:
         parser.print_help()
         sys.exit(1)
     
+    if getattr(args, 'clear_cache', False):
+        SchemaCache(directory=args.cache_dir).clear()
+    
     # Execute the appropriate command
     if args.command == 'export':
         export_command(args)
     elif args.command == 'migrate':
         migrate_command(args)
+    elif args.command == 'calibrate':
+        calibrate_command(args)
 
 
 if __name__ == '__main__':